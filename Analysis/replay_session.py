@@ -0,0 +1,132 @@
+"""
+Load an HMI telemetry session (HMI --record FILE) into NumPy arrays and
+summarise it: command rates, motor auto-stops and FSM transitions.
+
+The file layout is documented in HMI/flexibot/telemetry.py; this script
+only needs NumPy, so it can run on any analysis machine.
+
+    python replay_session.py session.fbtl
+    python replay_session.py session.fbtl --csv session.csv
+    python replay_session.py session.fbtl --replay       # print lines with original timing
+"""
+import argparse
+import re
+import sys
+import time
+
+import numpy as np
+
+HEADER_DTYPE = np.dtype([
+    ("magic", "S4"), ("version", "<u2"), ("record_size", "<u2"),
+    ("capacity", "<u4"), ("pad", "V4"), ("written", "<u8"), ("created", "<f8"),
+])
+HEADER_SIZE = 64
+RECORD_DTYPE = np.dtype([
+    ("t", "<f8"), ("kind", "u1"), ("flags", "u1"), ("length", "<u2"), ("text", "S116"),
+])
+KIND_TX, KIND_RX = 1, 2
+
+AUTO_STOP_RE = re.compile(r"\[Timer\] Motor (\d+) auto-stopped")
+FSM_RE = re.compile(r"\[FSM\] => STATE_(\w+)")
+
+
+def load_session(path):
+    """Returns a structured array (t, kind, flags, length, text) in time order."""
+    header = np.fromfile(path, dtype=HEADER_DTYPE, count=1)[0]
+    if header["magic"] != b"FBTL":
+        raise ValueError(f"{path} is not a telemetry file")
+    capacity, written = int(header["capacity"]), int(header["written"])
+    ring = np.memmap(path, dtype=RECORD_DTYPE, mode="r", offset=HEADER_SIZE, shape=(capacity,))
+    if written <= capacity:
+        records = np.array(ring[:written])
+    else:
+        start = written % capacity
+        records = np.concatenate([ring[start:], ring[:start]])
+    return records
+
+
+def texts(records):
+    return np.array([r["text"][:r["length"]].decode("utf-8", "replace") for r in records], dtype=object)
+
+
+def command_rate(records, bin_s=1.0):
+    """(bin start times, commands sent per second) relative to session start."""
+    tx = records["t"][records["kind"] == KIND_TX]
+    if tx.size == 0:
+        return np.array([]), np.array([])
+    t0 = records["t"][0]
+    edges = np.arange(0.0, tx[-1] - t0 + bin_s, bin_s)
+    counts, edges = np.histogram(tx - t0, bins=edges if edges.size > 1 else 1)
+    return edges[:-1], counts / bin_s
+
+
+def auto_stops(records, lines):
+    """Structured array of (t, motor) for every '[Timer] Motor N auto-stopped'."""
+    rows = [(records["t"][i], int(m.group(1)))
+            for i, line in enumerate(lines) if (m := AUTO_STOP_RE.match(line))]
+    return np.array(rows, dtype=[("t", "<f8"), ("motor", "<i4")])
+
+
+def fsm_transitions(records, lines):
+    rows = [(records["t"][i], m.group(1))
+            for i, line in enumerate(lines) if (m := FSM_RE.match(line))]
+    return np.array(rows, dtype=[("t", "<f8"), ("state", "U16")])
+
+
+def replay(records, lines, speed=1.0):
+    """Print the session with its original timing (speed > 1 = faster)."""
+    t_prev = records["t"][0] if len(records) else 0.0
+    for r, line in zip(records, lines):
+        time.sleep(max(0.0, (r["t"] - t_prev) / speed))
+        t_prev = r["t"]
+        print(("TX " if r["kind"] == KIND_TX else "RX ") + line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Summarise / replay an HMI telemetry session")
+    parser.add_argument("path")
+    parser.add_argument("--csv", help="export t,kind,text to CSV")
+    parser.add_argument("--replay", action="store_true")
+    parser.add_argument("--speed", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    records = load_session(args.path)
+    lines = texts(records)
+    if len(records) == 0:
+        print("Empty session.")
+        return 0
+
+    if args.replay:
+        replay(records, lines, args.speed)
+        return 0
+
+    duration = records["t"][-1] - records["t"][0]
+    n_tx = int(np.count_nonzero(records["kind"] == KIND_TX))
+    n_rx = int(np.count_nonzero(records["kind"] == KIND_RX))
+    print(f"{len(records)} records over {duration:.1f} s: {n_tx} sent, {n_rx} received")
+
+    _, rate = command_rate(records)
+    if rate.size:
+        print(f"command rate: mean {rate.mean():.1f}/s, peak {rate.max():.0f}/s")
+
+    stops = auto_stops(records, lines)
+    if stops.size:
+        motors, counts = np.unique(stops["motor"], return_counts=True)
+        print("auto-stops: " + ", ".join(f"M{m + 1}={c}" for m, c in zip(motors, counts)))
+
+    fsm = fsm_transitions(records, lines)
+    for t, state in fsm:
+        print(f"  {t - records['t'][0]:8.3f} s  -> {state}")
+
+    if args.csv:
+        with open(args.csv, "w") as f:
+            f.write("t,kind,text\n")
+            for r, line in zip(records, lines):
+                kind = "tx" if r["kind"] == KIND_TX else "rx"
+                f.write(f"{r['t']:.6f},{kind},\"{line.replace(chr(34), chr(39))}\"\n")
+        print(f"wrote {args.csv}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,183 @@
+"""
+Transport throughput / latency benchmark for RobotBackend.
+
+Runs RobotBackend against local stand-ins (benchmarks/fake_robot.py):
+a pty that answers like the board on serial, and HTTP and raw-TCP servers
+that behave like WebServerControl ("http-legacy" is the old HTTP port
+that sent the whole control page for every command). For each transport and workload it
+reports commands/sec, ack round-trip p50/p99, peak thread count and
+process CPU time, and writes everything as JSON.
+
+Workloads:
+    burst      - N commands as fast as send_command() accepts them
+    sustained  - fixed command rate for a few seconds
+    slider     - SET_SPEED at slider-drag rate through send_coalesced()
+
+    cd HMI && python benchmarks/bench_transport.py --json bench.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks.fake_robot import FakeSerialDevice, FakeTcpRobot, FakeWebServer  # noqa: E402
+from flexibot.backend import RobotBackend  # noqa: E402
+from flexibot.transports import HttpTransport, SerialTransport, TcpTransport  # noqa: E402
+
+
+class ThreadSampler:
+    """Samples threading.active_count() in the background; keeps the peak."""
+
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.peak = threading.active_count()
+        self._running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running:
+            self.peak = max(self.peak, threading.active_count())
+            time.sleep(self.interval)
+
+    def stop(self):
+        self._running = False
+        self._thread.join()
+        return self.peak
+
+
+# --------------------------------------------------------------------
+# Workloads: each takes a backend and returns the number of commands issued
+# --------------------------------------------------------------------
+def burst(backend, n=200):
+    futures = [backend.send_command(f"ROTATE_M{i % 8 + 1}_CW:{500 + i}") for i in range(n)]
+    for f in futures:
+        try:
+            f.result(timeout=30)
+        except Exception:
+            pass
+    return n
+
+
+def sustained(backend, rate=50, seconds=3.0):
+    period = 1.0 / rate
+    n = int(rate * seconds)
+    t_next = time.perf_counter()
+    for i in range(n):
+        backend.send_command(f"ROTATE_M{i % 8 + 1}_CCW:{500 + i % 1000}")
+        t_next += period
+        delay = t_next - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    return n
+
+
+def slider(backend, rate=200, seconds=2.0):
+    period = 1.0 / rate
+    n = int(rate * seconds)
+    t_next = time.perf_counter()
+    for i in range(n):
+        backend.send_coalesced(f"SET_SPEED:{i % 256}")
+        t_next += period
+        delay = t_next - time.perf_counter()
+        if delay > 0:
+            time.sleep(delay)
+    backend.coalescer.flush()
+    return n
+
+
+WORKLOADS = {"burst": burst, "sustained": sustained, "slider": slider}
+
+
+# --------------------------------------------------------------------
+def make_standin(kind):
+    """Returns (transport, stand-in)."""
+    if kind == "serial":
+        dev = FakeSerialDevice()
+        return SerialTransport(dev.port, 115200), dev
+    if kind == "serial-binary":
+        dev = FakeSerialDevice()
+        return SerialTransport(dev.port, 115200, binary=True), dev
+    if kind in ("http", "http-legacy"):
+        srv = FakeWebServer(legacy=(kind == "http-legacy"))
+        return HttpTransport(srv.host, srv.port, queue_limit=1024, overflow="block"), srv
+    if kind in ("tcp", "tcp-binary"):
+        srv = FakeTcpRobot()
+        return TcpTransport(srv.host, srv.port, binary=(kind == "tcp-binary")), srv
+    raise ValueError(kind)
+
+
+def run_one(transport_kind, workload, drain_timeout=10.0):
+    transport, standin = make_standin(transport_kind)
+    quiet = io.StringIO()
+    with contextlib.redirect_stdout(quiet):
+        backend = RobotBackend(transport=transport)
+        backend.connect().result(timeout=5)
+        backend.start_reader()
+
+        sampler = ThreadSampler()
+        cpu0, wall0 = time.process_time(), time.perf_counter()
+        issued = WORKLOADS[workload](backend)
+
+        # Wait for the acks to come back
+        deadline = time.perf_counter() + drain_timeout
+        while backend.latency.in_flight() and time.perf_counter() < deadline:
+            time.sleep(0.005)
+        wall = time.perf_counter() - wall0
+        cpu = time.process_time() - cpu0
+        peak_threads = sampler.stop()
+
+        backend.latency.expire(now=float("inf"))
+        summary = backend.latency.summary(by="transport").get(transport.name, {})
+        counters = dict(backend.latency.counters)
+        backend.close()
+    standin.close()
+
+    return {
+        "transport": transport_kind,
+        "workload": workload,
+        "issued": issued,
+        "sent": counters["sent"],
+        "acked": counters["acked"],
+        "lost": counters["lost"],
+        "wall_s": wall,
+        "cmds_per_s": counters["acked"] / wall if wall else 0.0,
+        "p50_ms": summary.get("p50_ms"),
+        "p99_ms": summary.get("p99_ms"),
+        "peak_threads": peak_threads,
+        "cpu_s": cpu,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="RobotBackend transport benchmark")
+    parser.add_argument("--transports", default="serial,serial-binary,http-legacy,http,tcp,tcp-binary")
+    parser.add_argument("--workloads", default="burst,sustained,slider")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    results = []
+    for kind in args.transports.split(","):
+        for workload in args.workloads.split(","):
+            r = run_one(kind, workload)
+            results.append(r)
+            p50 = f"{r['p50_ms']:.2f}" if r["p50_ms"] is not None else "-"
+            p99 = f"{r['p99_ms']:.2f}" if r["p99_ms"] is not None else "-"
+            print(f"{kind:14s} {workload:10s} {r['cmds_per_s']:9.1f} cmd/s  "
+                  f"p50 {p50:>7s} ms  p99 {p99:>7s} ms  threads {r['peak_threads']:3d}  "
+                  f"cpu {r['cpu_s']:.2f}s  lost {r['lost']}")
+
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"created": time.time(), "results": results}, f, indent=2)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
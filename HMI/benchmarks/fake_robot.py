@@ -0,0 +1,292 @@
+"""
+Local stand-ins for the robot, for benchmarks and tests without hardware.
+
+FakeWebServer   - mimics WebServerControl's HTTP port: one client at a time,
+                  command taken from "GET /<cmd> ", a 3-byte "OK" body with
+                  "Connection: close", socket closed. legacy=True reads the
+                  request byte by byte and sends the full HTML control page
+                  for every command, like the firmware before the TCP channel.
+FakeTcpRobot    - WebServerControl's raw TCP command channel: one long-lived
+                  client, serial framing in, ACK:/[processCommand] lines out.
+FakeSerialDevice - a pty that answers like the firmware on serial: echoes
+                  "[processCommand] <cmd>" and acks tagged commands
+                  (ASCII lines and 9-byte binary frames).
+
+All ack with ACK:<id>:<t_us> (X-Ack header over HTTP) like the firmware,
+and drop commands longer than WebServerControl.h's line buffers whole.
+"""
+import os
+import socket
+import threading
+import time
+
+from flexibot import binary_protocol
+from flexibot.latency import split_tag
+
+# WebServerControl.h line buffers
+MAX_COMMAND_LEN = 240
+ACK_TAG_MAX = 4
+TCP_LINE_MAX = MAX_COMMAND_LEN + ACK_TAG_MAX + 2
+HTTP_LINE_MAX = MAX_COMMAND_LEN + ACK_TAG_MAX + 16
+LINE_MAX = TCP_LINE_MAX - 1  # longest serial/TCP line kept, "\r" included
+
+# Same lines WebServerControl::sendWebPage prints (println -> CRLF)
+_PAGE_LINES = [
+    "<!DOCTYPE html>",
+    "<html><head><title>Robot Control</title>",
+    "<style>",
+    "button { padding: 10px 20px; margin: 5px; }",
+    "#INDIVIDUAL { background-color: lightgreen; }",
+    "#GAIT { background-color: lightblue; }",
+    "</style>",
+    "<script>",
+    "function sendCommand(command) {",
+    "    var xhr = new XMLHttpRequest();",
+    "    xhr.open('GET', '/' + command, true);",
+    "    xhr.send();",
+    "    highlightButton(command);",
+    "}",
+    "function highlightButton(command) {",
+    "    document.getElementById('INDIVIDUAL').style.backgroundColor = 'lightgrey';",
+    "    document.getElementById('GAIT').style.backgroundColor = 'lightgrey';",
+    "    if(document.getElementById(command)) {",
+    "        document.getElementById(command).style.backgroundColor = 'lightgreen';",
+    "    }",
+    "}",
+    "</script>",
+    "</head><body>",
+    "<h1>Robot Control</h1>",
+    "<button id='INDIVIDUAL' onclick=\"sendCommand('INDIVIDUAL')\">Individual Mode</button>",
+    "<button id='GAIT' onclick=\"sendCommand('GAIT')\">Gait Mode</button>",
+    "<h2>Motor Controls</h2>",
+    "<button onclick=\"sendCommand('ROTATE_M1_CW')\">Rotate M1 CW</button>",
+    "<button onclick=\"sendCommand('ROTATE_M1_CCW')\">Rotate M1 CCW</button>",
+    "<button onclick=\"sendCommand('STOP_MOTORS')\">Stop All Motors</button>",
+    "<h2>Gait Controls</h2>",
+    "<button onclick=\"sendCommand('START_CRAWLING')\">Start Crawling</button>",
+    "<button onclick=\"sendCommand('START_WALKING')\">Start Walking</button>",
+    "<button onclick=\"sendCommand('START_FASTCRAWL')\">Start Fast Crawl</button>",
+    "<button onclick=\"sendCommand('STOP_GAIT')\">Stop Gait</button>",
+    "</body></html>",
+]
+HTML_PAGE = ("\r\n".join(_PAGE_LINES) + "\r\n").encode()
+
+
+def process_command(command: str, processing_s=0.0):
+    """Firmware-like handling: returns (output lines, ack string or None)."""
+    t0 = time.perf_counter()
+    text, seq = split_tag(command.strip())
+    if processing_s:
+        time.sleep(processing_s)
+    lines = [f"[processCommand] {text}"]
+    ack = None
+    if seq is not None:
+        ack = f"{seq}:{int((time.perf_counter() - t0) * 1e6)}"
+        lines.append(f"ACK:{ack}")
+    return lines, ack
+
+
+def process_stream(buf: bytearray, processing_s=0.0):
+    """
+    Serial framing: consume complete ASCII lines and binary frames from the
+    front of `buf`; returns (output lines, commands handled).
+    """
+    out, handled = [], 0
+    while buf:
+        if buf[0] == binary_protocol.SYNC:
+            if len(buf) < binary_protocol.FRAME_LEN:
+                break
+            frame = bytes(buf[:binary_protocol.FRAME_LEN])
+            del buf[:binary_protocol.FRAME_LEN]
+            try:
+                cmd = binary_protocol.decode_frame(frame)
+            except ValueError:
+                out.append("[ERROR] Bad binary frame")
+                continue
+            out += process_command(f"{binary_protocol.to_text(cmd)}@{cmd.seq}", processing_s)[0]
+        else:
+            nl = buf.find(b"\n")
+            if nl < 0:
+                break
+            line = bytes(buf[:nl])
+            del buf[:nl + 1]
+            if len(line) > LINE_MAX:
+                out.append("[ERROR] Command too long")
+                continue
+            out += process_command(line.decode("utf-8", "replace"), processing_s)[0]
+        handled += 1
+    return out, handled
+
+
+# ====================================================================
+class FakeWebServer:
+    def __init__(self, host="127.0.0.1", port=0, processing_s=0.0, legacy=False):
+        self.processing_s = processing_s
+        self.legacy = legacy
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen(8)
+        self.host, self.port = self.sock.getsockname()
+        self.requests = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name="fake-web", daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while self._running:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                return
+            with client:
+                self._handle(client)
+
+    def _handle(self, client):
+        # Old handleClient(): one byte at a time until "\r\n\r\n"
+        request = bytearray()
+        while not request.endswith(b"\r\n\r\n"):
+            c = client.recv(1 if self.legacy else 1024)
+            if not c:
+                return
+            request += c
+        self.requests += 1
+
+        ack = None
+        line = request.split(b"\r\n", 1)[0].decode("latin-1")
+        too_long = not self.legacy and len(line) > HTTP_LINE_MAX - 1
+        if line.startswith("GET /") and not too_long:
+            space = line.find(" ", 5)
+            command = line[5:space] if space > 0 else ""
+            if command:
+                _, ack = process_command(command, self.processing_s)
+
+        if self.legacy:
+            head = "HTTP/1.1 200 OK\r\nContent-Type: text/html\r\nConnection: close\r\n"
+            body = HTML_PAGE
+        else:
+            body = b"ERR Command too long\n" if too_long else b"OK\n"
+            head = ("HTTP/1.1 200 OK\r\nContent-Type: text/plain\r\n"
+                    f"Access-Control-Allow-Origin: *\r\nConnection: close\r\nContent-Length: {len(body)}\r\n")
+        if ack:
+            head += f"X-Ack: {ack}\r\n"
+        client.sendall(head.encode() + b"\r\n" + body)
+
+    def close(self):
+        self._running = False
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)  # wakes the blocked accept()
+        except OSError:
+            pass
+        self.sock.close()
+
+
+# ====================================================================
+class FakeTcpRobot:
+    """Listens like the firmware's port 8081; a new client replaces the old one."""
+
+    def __init__(self, host="127.0.0.1", port=0, processing_s=0.0):
+        self.processing_s = processing_s
+        self.sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+        self.sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.sock.bind((host, port))
+        self.sock.listen(2)
+        self.host, self.port = self.sock.getsockname()
+        self.commands = 0
+        self.clients = 0
+        self._client = None
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name="fake-tcp", daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        while self._running:
+            try:
+                client, _ = self.sock.accept()
+            except OSError:
+                return
+            if self._client is not None:
+                self._client.close()
+            self._client = client
+            self.clients += 1
+            client.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            threading.Thread(target=self._handle, args=(client,), name="fake-tcp-client", daemon=True).start()
+
+    def _handle(self, client):
+        buf = bytearray()
+        with client:
+            client.sendall(b"STATUS: STATE_IDLE\n")
+            while self._running:
+                try:
+                    data = client.recv(4096)
+                except OSError:
+                    return
+                if not data:
+                    return
+                buf += data
+                out, handled = process_stream(buf, self.processing_s)
+                self.commands += handled
+                if out:
+                    try:
+                        client.sendall(("\n".join(out) + "\n").encode())
+                    except OSError:
+                        return
+
+    def drop_client(self):
+        """Close the current connection, like a Wi-Fi dropout."""
+        if self._client is not None:
+            try:
+                self._client.shutdown(socket.SHUT_RDWR)
+            except OSError:
+                pass
+
+    def close(self):
+        self._running = False
+        self.drop_client()
+        try:
+            self.sock.shutdown(socket.SHUT_RDWR)
+        except OSError:
+            pass
+        self.sock.close()
+
+
+# ====================================================================
+class FakeSerialDevice:
+    """pty pair; open `self.port` with pyserial as if it were the board."""
+
+    def __init__(self, processing_s=0.0):
+        import pty  # POSIX only
+        import tty
+        self.processing_s = processing_s
+        self.master, slave = pty.openpty()
+        tty.setraw(slave)  # no echo / line discipline, like a USB CDC port
+        self.port = os.ttyname(slave)
+        self._slave = slave
+        self.commands = 0
+        self._running = True
+        self._thread = threading.Thread(target=self._serve, name="fake-serial", daemon=True)
+        self._thread.start()
+
+    def _serve(self):
+        buf = bytearray()
+        while self._running:
+            try:
+                data = os.read(self.master, 4096)
+            except OSError:
+                return
+            if not data:
+                return
+            buf += data
+            out, handled = process_stream(buf, self.processing_s)
+            self.commands += handled
+            if out:
+                os.write(self.master, ("\r\n".join(out) + "\r\n").encode())
+
+    def close(self):
+        self._running = False
+        # Closing the slave first makes the blocked read on the master fail with EIO
+        for fd in (self._slave, self.master):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
@@ -0,0 +1,20 @@
+"""
+Host-side link code for the FlexiBot HMI (transports, dispatch, helpers).
+
+Nothing in here imports Kivy, so it can be used from scripts and tools
+as well as from robotControlGUI_wireless_V2.py:
+
+    from flexibot import RobotBackend, SimTransport, script
+    backend = RobotBackend(transport=SimTransport(speed=None))
+    backend.connect().result()
+    script.run(backend, "crawl_test.motion")
+
+`python -m flexibot` does the same from the shell (see flexibot.cli).
+"""
+from flexibot.backend import RobotBackend
+from flexibot.calibration import CalibrationCache
+from flexibot.fleet import Fleet
+from flexibot.pose import Pose
+from flexibot.script import ScriptError, ScriptRunner
+from flexibot.simulator import MorphBotSim, SimTransport
+from flexibot.transports import HttpTransport, SerialTransport, TcpTransport, Transport, make_transport
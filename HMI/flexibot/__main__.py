@@ -0,0 +1,5 @@
+import sys
+
+from flexibot.cli import main
+
+sys.exit(main())
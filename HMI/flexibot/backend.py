@@ -0,0 +1,441 @@
+"""
+RobotBackend: the HMI's link to the robot, independent of any UI toolkit.
+"""
+import asyncio
+import threading
+from concurrent.futures import Future, InvalidStateError
+
+from flexibot import log
+from flexibot.calibration import blocking_ms
+from flexibot.coalesce import CommandCoalescer
+from flexibot.latency import LatencyTracker, command_type, tag_command
+from flexibot.metrics import DEFAULT_METRICS_PORT, MetricsServer, Registry
+from flexibot.pose import Pose, pack_batch
+from flexibot.scheduler import CommandDropped, CommandScheduler
+from flexibot.serial_events import (AckEvent, FsmEvent, LineEvent, LinkEvent, SerialReader,
+                                    StatusEvent, parse_line)
+from flexibot.status_queue import StatusQueue
+from flexibot.telemetry import TelemetryRecorder
+from flexibot.transports import (HttpTransport, LinkLoop, SerialTransport, Transport, TransportError,
+                                 TransportTimeout)
+
+# -----------------------------
+# Serial
+# -----------------------------
+#DEFAULT_SERIAL_PORT = '/dev/cu.usbmodem2101'
+DEFAULT_SERIAL_PORT = '/dev/cu.usbmodem211401'
+DEFAULT_BAUD_RATE = 115200
+SERIAL_SETTLE = 2.0  # board resets when the port opens; wait before the first command
+
+# -----------------------------
+# Wireless (HTTP)
+# -----------------------------
+DEFAULT_IP_ADDRESS = "192.168.3.1"
+HTTP_WORKERS = 1              # 1 keeps commands in press order
+HTTP_QUEUE_LIMIT = 16         # pending commands before the overflow policy kicks in
+HTTP_OVERFLOW = "drop_oldest" # "drop_oldest" | "drop_newest" | "block"
+HTTP_TIMEOUT = 2              # a supervised link retries elsewhere; waiting longer only delays that
+
+# Slider-driven commands (SET_SPEED, pulse): at most one per target per interval
+COALESCE_INTERVAL = 0.05  # seconds
+
+# Teleop stream (flexibot/teleop.py): target updates per second
+TELEOP_RATE_HZ = 50
+
+# Commands handed to the transport at once; the rest wait in priority order
+# (stops always go straight out, see flexibot/scheduler.py)
+SEND_WINDOW = 1
+
+def _settle(fut: Future, result=None, exc=None):
+    """Resolve `fut` unless something else got there first."""
+    try:
+        if exc is not None:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(result)
+    except InvalidStateError:
+        pass
+
+
+# --------------------------------------------------------------------
+class RobotBackend:
+    """
+    Owns the link to one robot. All I/O runs on a background asyncio loop
+    (LinkLoop); send_command() returns a concurrent Future that callers can
+    wait on, or ignore for fire-and-forget. Pass `link` to share one loop
+    between several backends (see flexibot.fleet); it is then left running
+    by close().
+    """
+    def __init__(self, use_wireless=False, transport: Transport = None, link: LinkLoop = None,
+                 name: str = None, ip_address=DEFAULT_IP_ADDRESS):
+        self.use_wireless = use_wireless
+        self.ip_address = ip_address
+        self.name = name
+        self._tag = f"[RobotBackend {name}]" if name else "[RobotBackend]"
+        self.status_callback = None
+        # UIs drain this once per frame on their own thread (fields: status, fsm)
+        self.status = StatusQueue()
+        self._owns_link = link is None
+        self.link = link if link is not None else LinkLoop()
+        if transport is None:
+            transport = self._default_transport()
+        if isinstance(transport, HttpTransport) and transport.on_result is None:
+            transport.on_result = self._on_http_result
+        self.transport = transport
+        self.transport.on_line = self._on_link_line
+        self.supervisor = None  # LinkSupervisor, see supervise()
+        self._sent_on = {}      # seq -> transport, while supervised
+        self.scheduler = CommandScheduler(self.link, self.send_async, max_in_flight=SEND_WINDOW,
+                                          requeue=self._requeue)
+        self._coalescer = None  # its flush thread only starts on first use
+        self.latency = LatencyTracker()
+        self._ack_waiters = {}  # seq -> Future of a send_command(..., ack=True)
+        self._line_listeners = []
+        self._link_listeners = []
+
+        # Firmware output -> typed events (STATUS:, [FSM], [Timer], [Cmd], [ERROR], ACK:)
+        self.reader = SerialReader(self.serial_port)
+        self.reader.subscribe(self._on_serial_line, LineEvent)
+        self.reader.subscribe(self._on_serial_status, StatusEvent)
+        self.reader.subscribe(self._on_serial_link, LinkEvent)
+        self.reader.subscribe(self._on_ack, AckEvent)
+        self.reader.subscribe(self._on_fsm, FsmEvent)
+        self.reader.on_raw_line = self._on_raw_line
+
+        self.recorder = None  # TelemetryRecorder, see enable_recording()
+
+        self.metrics = Registry()
+        self.metrics_server = None  # see serve_metrics()
+        self._init_metrics()
+
+    def enable_recording(self, path, capacity=65536):
+        """Log every sent command and received line to a memory-mapped ring file."""
+        self.recorder = TelemetryRecorder(path, capacity)
+        print(f"[RobotBackend] recording session to {path} ({capacity} records)")
+
+    def _init_metrics(self):
+        m = self.metrics
+        self._m_sent = m.counter("flexibot_commands_sent_total", "Commands handed to the transport",
+                                 ("type", "transport"))
+        self._m_errors = m.counter("flexibot_transport_errors_total", "Sends that failed", ("kind",))
+        self._m_dropped = m.counter("flexibot_commands_dropped_total", "Commands the scheduler dropped",
+                                    ("reason",))
+        m.counter("flexibot_bytes_written_total", "Bytes written to the current link",
+                  fn=lambda: self.transport.bytes_out)
+        m.counter("flexibot_bytes_read_total", "Bytes read from the robot",
+                  fn=lambda: self.transport.bytes_in + self.reader.bytes_in)
+        m.gauge("flexibot_queue_depth", "Commands waiting to be sent", fn=self.queue_depth)
+        m.gauge("flexibot_in_flight", "Commands handed to the transport, not finished",
+                fn=self.scheduler.in_flight)
+        m.gauge("flexibot_acks_pending", "Sent commands still waiting for ACK", fn=self.latency.in_flight)
+        m.gauge("flexibot_link_up", "1 when the transport is connected",
+                fn=lambda: int(self.transport.connected))
+        m.gauge("flexibot_threads", "Live Python threads", fn=threading.active_count)
+        m.counter("flexibot_serial_reader_wakeups_total", "Serial reader returns from read()",
+                  fn=lambda: self.reader.wakeups)
+        m.counter("flexibot_serial_lines_total", "Lines received on serial", fn=lambda: self.reader.lines)
+
+    def serve_metrics(self, port=DEFAULT_METRICS_PORT, host="127.0.0.1"):
+        """Expose self.metrics at http://host:port/metrics (Prometheus text format)."""
+        self.metrics_server = MetricsServer(self.metrics, port, host)
+        return self.metrics_server
+
+    def queue_depth(self) -> int:
+        """Scheduler queue plus anything already inside the HTTP dispatcher."""
+        depth = self.scheduler.queue_depth()
+        dispatcher = getattr(self.transport, "dispatcher", None)
+        if dispatcher is not None:
+            depth += dispatcher.queue_depth()
+        return depth
+
+    def _default_transport(self) -> Transport:
+        if self.use_wireless:
+            return HttpTransport(self.ip_address, 80,
+                                 workers=HTTP_WORKERS,
+                                 queue_limit=HTTP_QUEUE_LIMIT,
+                                 overflow=HTTP_OVERFLOW,
+                                 timeout=HTTP_TIMEOUT)
+        return SerialTransport(DEFAULT_SERIAL_PORT, DEFAULT_BAUD_RATE, settle=SERIAL_SETTLE)
+
+    def connect(self):
+        """Open the link in the background; returns a concurrent Future."""
+        fut = self.link.submit(self.transport.connect())
+        fut.add_done_callback(self._on_connected)
+        return fut
+
+    def _on_connected(self, fut):
+        exc = fut.exception()
+        if exc is not None:
+            print(f"{self._tag} connect failed on {self.transport}: {exc}")
+            self.update_status(f"Error: {exc}")
+        else:
+            print(f"{self._tag} connected via {self.transport}")
+            self.update_status(f"Connected ({self.transport.name})")
+            self.link.call_soon(self._link_up, self.transport)
+
+    def set_transport(self, transport: Transport):
+        """Swap the link (e.g. to a local stand-in); the old one is closed."""
+        old, self.transport = self.transport, transport
+        transport.on_line = self._on_link_line
+        self.link.submit(old.close())
+
+    def supervise(self, fallbacks=(), **opts):
+        """
+        Keep the link healthy: probe it, reconnect with backoff and fail over
+        to `fallbacks` (transports, in order of preference) when it drops.
+        Replaces connect(); see flexibot.supervisor for `opts`.
+        """
+        from flexibot.supervisor import LinkSupervisor
+        for transport in fallbacks:
+            if isinstance(transport, HttpTransport) and transport.on_result is None:
+                transport.on_result = self._on_http_result
+        self.supervisor = LinkSupervisor(self, [self.transport, *fallbacks], **opts)
+        self.supervisor.start()
+        return self.supervisor
+
+    def use_link(self, transport: Transport):
+        """Make `transport` the active link, leaving the old one open (supervisor failover)."""
+        self.transport = transport
+        transport.on_line = self._on_link_line
+
+    def set_status_callback(self, callback):
+        """
+        Called with every status message, on whatever thread produced it.
+        UI code should drain self.status on its own thread instead.
+        """
+        self.status_callback = callback
+
+    def send_command(self, command: str, priority: int = None, deadline_s: float = None, ack=False):
+        """
+        Queue a command by priority (stop > mode > motion > tuning, see
+        flexibot.scheduler); stale or superseded motion is dropped.
+        With ack=True the future resolves once the firmware has acked the
+        command (to its processing time in us) rather than once it is sent.
+        """
+        log.debug("[RobotBackend] send_command: %s", command)
+        if not ack:
+            fut = self.scheduler.submit(command, priority, deadline_s)
+            fut.add_done_callback(self._on_sent)
+            return fut
+        acked = Future()
+        fut = self.scheduler.submit(command, priority, deadline_s,
+                                    send=lambda cmd: self.send_async(cmd, acked))
+        fut.add_done_callback(self._on_sent)
+        fut.add_done_callback(lambda f: f.exception() and _settle(acked, exc=f.exception()))
+        return acked
+
+    async def send_async(self, command: str, acked: Future = None, transport: Transport = None):
+        """
+        Coroutine form of send_command, for code already running on the link
+        loop. `transport` overrides the active link (supervisor probes).
+        """
+        transport = transport or self.transport
+        if not transport.connected:
+            if self.supervisor is not None:
+                # The supervisor owns reconnecting; the scheduler keeps the command queued
+                exc = TransportError(f"{transport.name} link is down")
+                self.supervisor.link_failed(transport, exc)
+                raise exc
+            await transport.connect()
+        seq = self.latency.next_seq()
+        if acked is not None:
+            stale = self._ack_waiters.pop(seq, None)
+            if stale is not None:  # sequence IDs wrapped around
+                _settle(stale, exc=TransportTimeout(f"ACK {seq} never came"))
+            self._ack_waiters[seq] = acked
+        tagged = tag_command(command, seq)
+        t_sent = self.latency.sent(seq, command, transport.name)
+        busy_ms = blocking_ms(command)
+        if self.supervisor is not None:
+            self._sent_on[seq] = transport
+            if busy_ms:
+                self.supervisor.robot_busy(busy_ms / 1000)
+        # Nothing else expires unanswered sends when no UI is polling latency
+        asyncio.get_running_loop().call_later(self.latency.ack_timeout + busy_ms / 1000,
+                                              self._ack_overdue, seq, t_sent, acked)
+        if self.recorder is not None:
+            self.recorder.record_tx(tagged)
+        try:
+            result = await transport.send(tagged)
+        except TransportError as e:
+            if self.supervisor is not None:
+                self.supervisor.link_failed(transport, e)
+            # A requeued command waits on its next seq instead
+            if acked is not None and self._ack_waiters.get(seq) is acked:
+                self._ack_waiters.pop(seq, None)
+            raise
+        self._m_sent.inc(type=command_type(command), transport=transport.name)
+        ack = getattr(result, "ack", None)
+        if ack:
+            # HTTP carries the ack in the X-Ack response header
+            ack_seq, _, robot_us = ack.partition(":")
+            self.latency.acked(int(ack_seq), int(robot_us or 0))
+            self._resolve_ack(int(ack_seq), int(robot_us or 0))
+        return result
+
+    def send_commands(self, commands):
+        """
+        Send several commands as few link frames as possible (BATCH:/POSE:),
+        so the robot applies them in one loop() pass. Items may be command
+        strings or Pose objects. Returns one Future per frame.
+        """
+        frames, plain = [], []
+        for item in commands:
+            if isinstance(item, Pose):
+                frames += pack_batch(plain)
+                plain = []
+                frames.append(item.to_command())
+            else:
+                plain.append(item)
+        frames += pack_batch(plain)
+        return [self.send_command(frame) for frame in frames]
+
+    def send_pose(self, pose: Pose):
+        """All motor targets in `pose` go out in a single POSE frame."""
+        return self.send_command(pose.to_command())
+
+    @property
+    def coalescer(self) -> CommandCoalescer:
+        if self._coalescer is None:
+            self._coalescer = CommandCoalescer(self.send_command, interval=COALESCE_INTERVAL)
+        return self._coalescer
+
+    def send_coalesced(self, command: str, key: str = None):
+        """For slider drags: intermediate values are dropped, the final one always goes out."""
+        self.coalescer.submit(command, key)
+
+    def _requeue(self, exc, command):
+        """
+        Scheduler hook: with a supervisor, link failures keep the command queued.
+        Not calibrations: a timeout there usually means the robot is busy running it.
+        """
+        return self.supervisor is not None and isinstance(exc, TransportError) and not blocking_ms(command)
+
+    def _on_sent(self, fut):
+        exc = fut.exception()
+        if isinstance(exc, CommandDropped):
+            self._m_dropped.inc(reason=exc.reason)
+            return
+        if exc is not None:
+            self._m_errors.inc(kind="timeout" if isinstance(exc, TransportTimeout) else "error")
+            self.update_status(f"Error: {exc}")
+        elif isinstance(self.transport, HttpTransport):
+            self.update_status("Command Sent Successfully (HTTP)")
+
+    def _on_http_result(self, timing):
+        log.debug("[HTTP] %s: queued %.1f ms, round-trip %.1f ms",
+                  timing.command, timing.queued_s * 1000, timing.elapsed_s * 1000)
+
+    def serial_port(self):
+        """The open serial object to read from: the active link, or a supervised serial standby."""
+        links = [self.transport] + (self.supervisor.transports if self.supervisor is not None else [])
+        for transport in links:
+            if isinstance(transport, SerialTransport) and transport.connected:
+                return transport.ser
+        return None
+
+    def close(self):
+        self.reader.stop()
+        if self.supervisor is not None:
+            self.supervisor.stop()
+            print(f"{self._tag} links: {self.supervisor.stats()}")
+        if self._coalescer is not None:
+            self._coalescer.close()
+            print(f"{self._tag} coalescer: {self._coalescer.stats()}")
+        self.scheduler.close()
+        print(f"{self._tag} scheduler: {self.scheduler.stats()}")
+        links = self.supervisor.transports if self.supervisor is not None else [self.transport]
+        for transport in links:
+            try:
+                self.link.submit(transport.close()).result(timeout=2)
+            except Exception as e:
+                print(f"{self._tag} close: {e}")
+        self.reader.join(timeout=2)
+        if self._owns_link:
+            self.link.stop()
+        if self.recorder is not None:
+            self.recorder.close()
+        if self.metrics_server is not None:
+            self.metrics_server.close()
+
+    def update_status(self, message):
+        log.info("%s update_status -> %s", self._tag, message)
+        self.status.put("status", message)
+        if self.status_callback:
+            self.status_callback(message)
+
+    def start_reader(self):
+        """Start the event-driven serial reader (it idles while the link is not serial)."""
+        self.reader.start()
+
+    def _on_serial_line(self, event):
+        log.debug("Received from serial: %s", event.text)
+
+    def _on_serial_status(self, event):
+        self.update_status(event.text)
+
+    def _on_ack(self, event):
+        self.latency.acked(event.seq, event.robot_us)
+        self._resolve_ack(event.seq, event.robot_us)
+
+    def _resolve_ack(self, seq, robot_us):
+        if self.supervisor is not None:
+            transport = self._sent_on.pop(seq, None)
+            if transport is not None:
+                self.link.call_soon(self.supervisor.acked, transport)
+        waiter = self._ack_waiters.pop(seq, None)
+        if waiter is not None:
+            _settle(waiter, robot_us)
+
+    def _ack_overdue(self, seq, t_sent, acked):
+        """Link loop, ack_timeout after a send: stop tracking and waiting for an ACK that never came."""
+        if self.latency.lost(seq, t_sent):
+            self._sent_on.pop(seq, None)
+        if acked is not None and self._ack_waiters.get(seq) is acked:
+            self._ack_waiters.pop(seq, None)
+            _settle(acked, exc=TransportTimeout(f"ACK {seq} never came"))
+
+    def _on_fsm(self, event):
+        self.status.put("fsm", event.state, log_line=False)
+
+    def add_line_listener(self, callback):
+        """Call `callback(line)` with every line of robot output, on the thread that read it."""
+        self._line_listeners = self._line_listeners + [callback]
+
+    def remove_line_listener(self, callback):
+        self._line_listeners = [cb for cb in self._line_listeners if cb is not callback]
+
+    def add_link_listener(self, callback):
+        """Call `callback(transport)` on the link loop whenever a link (re)connects; must not block."""
+        self._link_listeners = self._link_listeners + [callback]
+
+    def remove_link_listener(self, callback):
+        self._link_listeners = [cb for cb in self._link_listeners if cb is not callback]
+
+    def _link_up(self, transport):
+        for callback in self._link_listeners:
+            try:
+                callback(transport)
+            except Exception as e:
+                print(f"{self._tag} link listener error: {e}")
+
+    def _on_raw_line(self, line):
+        """Every line of robot output, before parsing: scrollback and recording."""
+        for callback in self._line_listeners:
+            callback(line)
+        if self.recorder is not None:
+            self.recorder.record_rx(line)
+        if not line.startswith("ACK:"):  # one per command; the latency overlay covers them
+            self.status.append(line)
+
+    def _on_link_line(self, line):
+        """Robot output arriving on a non-serial link (TCP) goes through the same parser."""
+        self._on_raw_line(line)
+        self.reader.publish(parse_line(line))
+
+    def _on_serial_link(self, event):
+        if not event.up:
+            self.update_status("Error: Serial connection lost.")
+            print(f"Serial connection lost: {event.reason}")
+            if self.supervisor is not None:
+                self.link.call_soon(self.supervisor.serial_lost, event.reason)
@@ -0,0 +1,179 @@
+"""
+Compact binary command frames (optional alternative to ASCII lines).
+
+Frame layout, 9 bytes, little endian:
+
+    0  sync      0xA5 (never appears in ASCII commands)
+    1  opcode    OP_*
+    2  target    bits 0-6: motor / limb / mode / gait index, bit 7: direction (1 = CCW)
+    3  pulse     uint16, microseconds (0 = firmware default for the direction)
+    5  duration  uint16, milliseconds
+    7  seq       uint8, wraps
+    8  crc       CRC-8 (poly 0x07) over bytes 1..7
+
+The text -> (opcode, target, direction) table is built once from the motor
+map, so encoding a button press is a dict lookup plus one Struct.pack.
+Must stay in sync with controller/src/binary_protocol.h.
+"""
+import re
+import struct
+from collections import namedtuple
+
+from flexibot.registry import MOTOR_COMMANDS, MOTORS, NUM_LIMBS
+
+SYNC = 0xA5
+FRAME = struct.Struct("<BBBHHBB")
+FRAME_LEN = FRAME.size  # 9
+
+OP_ROTATE = 1
+OP_STOP_MOTOR = 2
+OP_STOP_LIMB = 3
+OP_STOP_ALL = 4
+OP_SET_MODE = 5
+OP_GAIT = 6
+OP_STAND_UP = 7
+OP_SIT_DOWN = 8
+OP_ELONGATE = 9
+OP_RETRACT = 10
+OP_CALIBRATE_LIMB = 11
+OP_CALIBRATE_ALL = 12
+
+DIR_CW = 0
+DIR_CCW = 1
+
+MODES = {"INDIVIDUAL": 1, "BODY": 2, "GAIT": 3}
+GAITS = {"STOP_GAIT": 0, "START_CRAWLING": 1, "START_WALKING": 2, "START_FASTCRAWL": 3}
+
+# Motor name -> 0-based index used by the firmware's limbs[] array
+MOTOR_INDEX = {m.name: m.index for m in MOTORS}
+
+BinaryCommand = namedtuple("BinaryCommand", "opcode target direction pulse duration seq")
+
+DEFAULT_DURATION = 200  # same default the ASCII parser uses
+DURATION_MAX = 0xFFFF
+
+_TO_INT_RE = re.compile(r"\s*([+-]?\d+)")
+
+
+# --------------------------------------------------------------------
+# CRC-8 (poly 0x07), table driven
+# --------------------------------------------------------------------
+def _crc8_table():
+    table = []
+    for byte in range(256):
+        crc = byte
+        for _ in range(8):
+            crc = ((crc << 1) ^ 0x07) & 0xFF if crc & 0x80 else (crc << 1) & 0xFF
+        table.append(crc)
+    return bytes(table)
+
+
+_CRC8 = _crc8_table()
+
+
+def crc8(data) -> int:
+    crc = 0
+    for b in data:
+        crc = _CRC8[crc ^ b]
+    return crc
+
+
+# --------------------------------------------------------------------
+# Command table
+# --------------------------------------------------------------------
+def build_command_table():
+    """ASCII command (without parameters) -> (opcode, target, direction)."""
+    table = {}
+    for name, c in MOTOR_COMMANDS.items():
+        if c.kind == "rotate":
+            table[name] = (OP_ROTATE, c.index, DIR_CCW if c.ccw else DIR_CW)
+        elif c.kind == "stop_pair":
+            table[name] = (OP_STOP_LIMB, c.index // 2, DIR_CW)
+        else:
+            table[name] = (OP_STOP_MOTOR, c.index, DIR_CW)
+    for limb in range(NUM_LIMBS):
+        table[f"CALIBRATE_LIMB:{limb + 1}"] = (OP_CALIBRATE_LIMB, limb, DIR_CW)
+    table["STOP_MOTORS"] = (OP_STOP_ALL, 0, DIR_CW)
+    for mode, mode_id in MODES.items():
+        table[f"SET_MODE:{mode}"] = (OP_SET_MODE, mode_id, DIR_CW)
+    for gait, gait_id in GAITS.items():
+        table[gait] = (OP_GAIT, gait_id, DIR_CW)
+    table["STAND_UP"] = (OP_STAND_UP, 0, DIR_CW)
+    table["SIT_DOWN"] = (OP_SIT_DOWN, 0, DIR_CW)
+    table["ELONGATE"] = (OP_ELONGATE, 0, DIR_CW)
+    table["RETRACT"] = (OP_RETRACT, 0, DIR_CW)
+    table["CALIBRATE_ALL_LIMBS"] = (OP_CALIBRATE_ALL, 0, DIR_CW)
+    return table
+
+
+COMMAND_TABLE = build_command_table()
+_REVERSE_TABLE = {v: k for k, v in COMMAND_TABLE.items()}
+
+
+def _parse_duration(param: str) -> int:
+    """
+    ROTATE duration as processCommand() reads it: param.toInt() (leading
+    integer, so '1500_500' -> 1500), DEFAULT_DURATION unless positive.
+    """
+    m = _TO_INT_RE.match(param)
+    duration = int(m.group(1)) if m else 0
+    return duration if duration > 0 else DEFAULT_DURATION
+
+
+# --------------------------------------------------------------------
+# Encode / decode
+# --------------------------------------------------------------------
+def can_encode(command: str) -> bool:
+    command = command.strip()
+    if command in COMMAND_TABLE:
+        return True
+    base, _, param = command.partition(":")
+    entry = COMMAND_TABLE.get(base)
+    if entry is None:
+        return False
+    return entry[0] != OP_ROTATE or _parse_duration(param) <= DURATION_MAX
+
+
+def encode_command(command: str, seq: int = 0) -> bytes:
+    """ASCII command -> 9-byte frame. Raises KeyError if it has no binary form."""
+    command = command.strip()
+    entry = COMMAND_TABLE.get(command)
+    duration = 0
+    if entry is None:
+        base, _, param = command.partition(":")
+        entry = COMMAND_TABLE[base]
+        if entry[0] == OP_ROTATE:
+            duration = _parse_duration(param)
+    elif entry[0] == OP_ROTATE:
+        duration = DEFAULT_DURATION
+    opcode, target, direction = entry
+    # pulse 0: the firmware picks the direction's pulse, as for the ASCII command
+    return encode_frame(opcode, target, direction, 0, duration, seq)
+
+
+def encode_frame(opcode, target, direction=DIR_CW, pulse=0, duration=0, seq=0) -> bytes:
+    frame = bytearray(FRAME.pack(SYNC, opcode, (target & 0x7F) | (direction << 7),
+                                 pulse, duration, seq & 0xFF, 0))
+    frame[-1] = crc8(frame[1:-1])
+    return bytes(frame)
+
+
+def decode_frame(frame) -> BinaryCommand:
+    if len(frame) != FRAME_LEN:
+        raise ValueError(f"Frame must be {FRAME_LEN} bytes, got {len(frame)}")
+    sync, opcode, target, pulse, duration, seq, crc = FRAME.unpack(frame)
+    if sync != SYNC:
+        raise ValueError(f"Bad sync byte 0x{sync:02X}")
+    if crc8(frame[1:-1]) != crc:
+        raise ValueError("CRC mismatch")
+    return BinaryCommand(opcode, target & 0x7F, target >> 7, pulse, duration, seq)
+
+
+def to_text(cmd: BinaryCommand) -> str:
+    """Decoded frame -> equivalent ASCII command (for logs and tests)."""
+    name = _REVERSE_TABLE[(cmd.opcode, cmd.target, cmd.direction)]
+    if cmd.opcode != OP_ROTATE:
+        return name
+    if cmd.pulse:
+        return f"{name}:{cmd.pulse}_{cmd.duration}"
+    return f"{name}:{cmd.duration}"
@@ -0,0 +1,206 @@
+"""
+Calibration profiles cached on the host, so a new session costs one
+command instead of a CALIBRATE_ALL_LIMBS run.
+
+Calibration::calibrateMotor() holds the firmware's loop() in delay() for
+1.8 s per motor (1000 ms settle, a 6 x 50 ms sweep, 500 ms park), plus
+500 ms between limbs. The firmware reports the neutral pulse each motor
+ended up with, and takes a whole profile back in one line:
+
+    [Calib] CALIBRATED 1=1450,2=1450,...    after CALIBRATE_LIMB / CALIBRATE_ALL_LIMBS
+    SET_NEUTRAL:1=1450,2=1450,...           echoed as [Calib] LOADED 1=1450,...
+    GET_NEUTRAL                             answered with [Calib] CURRENT 1=1450,...
+
+    cache = CalibrationCache()                  # ~/.flexibot/calibration, or FLEXIBOT_CALIB_DIR
+    cache.attach(backend, "morphbot")           # CALIBRATED lines update the profile on disk;
+                                                # every link (re)connect pushes it again
+    report = cache.restore(backend, "morphbot") # push what is cached, calibrate only the rest
+
+One JSON file per robot name:
+
+    {"robot": "morphbot", "motors": {"1": {"neutral": 1450, "t": 1760000000.0, "drifted": false}, ...}}
+
+A motor is recalibrated when it has no entry, when the entry is flagged
+drifted (mark_drifted(), `python -m flexibot calib --drifted M3`) or older
+than `max_age_s`. The firmware calibrates whole limbs, so one such motor
+recalibrates its limb. Over HTTP there are no robot lines to learn new
+values from, so restore() only pushes the profile there.
+"""
+import json
+import os
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import Future
+
+from flexibot.registry import (DEFAULT_NEUTRAL_PULSE, LIMB_MOTORS, MOTOR_NUMBERS, NEUTRAL_PULSE_MAX,
+                               NEUTRAL_PULSE_MIN, NUM_LIMBS)
+from flexibot.serial_events import NeutralEvent
+
+CALIB_DIR = os.environ.get("FLEXIBOT_CALIB_DIR") or os.path.join(os.path.expanduser("~"), ".flexibot",
+                                                                 "calibration")
+CALIBRATED_MOTORS = tuple(m.number for m in LIMB_MOTORS)  # the body motors have no calibration routine
+
+# How long Calibration blocks loop(): settle + sweep + park per motor, a pause between limbs
+CALIBRATE_MOTOR_MS = 1000 + 6 * 50 + 500
+CALIBRATE_LIMB_MS = 2 * CALIBRATE_MOTOR_MS
+CALIBRATE_ALL_MS = NUM_LIMBS * (CALIBRATE_LIMB_MS + 500)
+PUSH_TIMEOUT_S = 2.0
+
+RestoreReport = namedtuple("RestoreReport", "pushed calibrated seconds")  # motors, limbs, wall time
+
+
+def blocking_ms(command: str) -> int:
+    """How long `command` keeps the firmware from answering anything (0 for most commands)."""
+    if command.startswith("CALIBRATE_ALL_LIMBS"):
+        return CALIBRATE_ALL_MS
+    if command.startswith("CALIBRATE_LIMB"):
+        return CALIBRATE_LIMB_MS
+    return 0
+
+
+def neutral_command(neutrals: dict) -> str:
+    """{1: 1450, 2: 1452} -> 'SET_NEUTRAL:1=1450,2=1452'"""
+    return "SET_NEUTRAL:" + ",".join(f"{m}={neutrals[m]}" for m in sorted(neutrals))
+
+
+def limb_of(motor: int) -> int:
+    return (motor - 1) // 2 + 1
+
+
+class CalibrationCache:
+    def __init__(self, directory=CALIB_DIR, max_age_s=None):
+        self.directory = directory
+        self.max_age_s = max_age_s
+        self._lock = threading.Lock()
+        self._attached = []  # (backend, robot, event callback, link callback)
+
+    # ----------------------------------------------------------------
+    # Profiles on disk
+    # ----------------------------------------------------------------
+    def path(self, robot: str) -> str:
+        return os.path.join(self.directory, f"{robot}.json")
+
+    def load(self, robot: str) -> dict:
+        """{motor: {"neutral", "t", "drifted"}}; empty if nothing is cached."""
+        try:
+            with open(self.path(robot)) as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return {}
+        except (OSError, ValueError) as e:
+            print(f"[Calibration] ignoring unreadable profile {self.path(robot)}: {e}")
+            return {}
+        return {int(m): entry for m, entry in data.get("motors", {}).items()}
+
+    def save(self, robot: str, motors: dict):
+        os.makedirs(self.directory, exist_ok=True)
+        tmp = self.path(robot) + ".tmp"
+        with open(tmp, "w") as f:
+            json.dump({"robot": robot, "motors": {str(m): motors[m] for m in sorted(motors)}}, f, indent=1)
+        os.replace(tmp, self.path(robot))
+
+    def record(self, robot: str, neutrals: dict, t: float = None):
+        """Store what the robot reported; clears any drift flag on those motors."""
+        t = time.time() if t is None else t
+        with self._lock:
+            motors = self.load(robot)
+            for motor, pulse in neutrals.items():
+                motors[motor] = {"neutral": pulse, "t": t, "drifted": False}
+            self.save(robot, motors)
+
+    def mark_drifted(self, robot: str, motors):
+        """Flag motors ('M3', 3, 'BODY1', ...) for recalibration on the next restore()."""
+        numbers = [m if isinstance(m, int) else MOTOR_NUMBERS[str(m).upper()] for m in motors]
+        with self._lock:
+            profile = self.load(robot)
+            for n in numbers:
+                if n in profile:
+                    profile[n]["drifted"] = True
+            self.save(robot, profile)
+
+    def usable(self, robot: str, now: float = None) -> dict:
+        """{motor: neutral} for entries that can be pushed as they are."""
+        now = time.time() if now is None else now
+        out = {}
+        for motor, entry in self.load(robot).items():
+            neutral = entry.get("neutral")
+            if entry.get("drifted") or not isinstance(neutral, int) or not NEUTRAL_PULSE_MIN <= neutral <= NEUTRAL_PULSE_MAX:
+                continue
+            if self.max_age_s is not None and now - entry.get("t", 0) > self.max_age_s:
+                continue
+            out[motor] = neutral
+        return out
+
+    def limb_neutrals(self, robot: str) -> tuple:
+        """The neutral pulse each limb motor stops at, in LIMB_MOTORS order: cached, else the firmware default."""
+        usable = self.usable(robot)
+        return tuple(usable.get(m.number, DEFAULT_NEUTRAL_PULSE) for m in LIMB_MOTORS)
+
+    # ----------------------------------------------------------------
+    # Robot side
+    # ----------------------------------------------------------------
+    def attach(self, backend, robot: str):
+        """
+        Keep `robot`'s profile in step with `backend`: every calibration
+        result is recorded (whoever asked for it), and the usable profile is
+        pushed again whenever a link comes up (the board resets when its
+        serial port is reopened).
+        """
+        def on_neutral(event):
+            if event.kind == "CALIBRATED" and event.neutrals:
+                self.record(robot, event.neutrals)
+
+        def on_link_up(transport):
+            neutrals = self.usable(robot)
+            if neutrals:
+                backend.send_command(neutral_command(neutrals))
+
+        backend.reader.subscribe(on_neutral, NeutralEvent)
+        backend.add_link_listener(on_link_up)
+        self._attached.append((backend, robot, on_neutral, on_link_up))
+
+    def detach(self, backend):
+        for entry in [a for a in self._attached if a[0] is backend]:
+            backend.reader.unsubscribe(entry[2])
+            backend.remove_link_listener(entry[3])
+            self._attached.remove(entry)
+
+    def restore(self, backend, robot: str, margin_s=2.0) -> RestoreReport:
+        """
+        Push the cached profile in one SET_NEUTRAL, then run CALIBRATE_LIMB
+        only for limbs with a missing, drifted or stale motor. Blocks until
+        the robot has acked everything; call it off the UI thread.
+        """
+        t0 = time.monotonic()
+        neutrals = self.usable(robot)
+        if neutrals:
+            backend.send_command(neutral_command(neutrals), ack=True).result(PUSH_TIMEOUT_S)
+            print(f"[Calibration] {robot}: pushed {len(neutrals)} cached neutral(s)")
+        limbs = sorted({limb_of(m) for m in CALIBRATED_MOTORS if m not in neutrals})
+        if limbs and backend.transport.name == "http":
+            print(f"[Calibration] {robot}: limb(s) {limbs} need calibrating, which HTTP cannot report back")
+            limbs = []
+        for limb in limbs:
+            backend.update_status(f"Calibrating limb {limb}")
+            print(f"[Calibration] {robot}: calibrating limb {limb}")
+            backend.send_command(f"CALIBRATE_LIMB:{limb}", ack=True).result(CALIBRATE_LIMB_MS / 1000 + margin_s)
+        report = RestoreReport(sorted(neutrals), limbs, time.monotonic() - t0)
+        backend.update_status(f"Calibration: {len(report.pushed)} cached, "
+                              f"{len(report.calibrated)} limb(s) calibrated in {report.seconds:.1f} s")
+        return report
+
+    def restore_in_background(self, backend, robot: str) -> Future:
+        """restore() on a daemon thread; the Future gets its RestoreReport or error."""
+        fut = Future()
+
+        def run():
+            try:
+                fut.set_result(self.restore(backend, robot))
+            except Exception as e:
+                print(f"[Calibration] {robot}: restore failed: {e}")
+                backend.update_status(f"Error: calibration restore failed ({e})")
+                fut.set_exception(e)
+
+        threading.Thread(target=run, name="calib-restore", daemon=True).start()
+        return fut
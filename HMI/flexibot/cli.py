@@ -0,0 +1,229 @@
+"""
+Command line for driving a robot without the GUI:
+
+    python -m flexibot send SET_MODE:INDIVIDUAL ROTATE_M1_CW:500 --ack
+    python -m flexibot run crawl_test.motion --transport tcp --host 192.168.3.1
+    python -m flexibot run crawl_test.motion --transport sim --sim-speed 0   # lockstep, as fast as possible
+    python -m flexibot check crawl_test.motion
+    python -m flexibot run crawl_test.motion --fallback tcp:192.168.3.1   # serial, Wi-Fi if it drops
+    python -m flexibot calib --drifted M3       # push the cached calibration, redo limb 2 only
+    python -m flexibot header -o ../controller/src/command_table.h   # firmware table from flexibot.registry
+
+add_link_arguments() / transport_from_args() are shared with
+robotControlGUI_wireless_V2.py, so both take the same link flags and
+FLEXIBOT_* environment variables. Real links are supervised (health
+probes, reconnect, failover to --fallback links; see flexibot.supervisor)
+unless --no-supervise is given. Every connection pushes the robot's cached
+calibration profile (see flexibot.calibration).
+"""
+import argparse
+import os
+import sys
+
+from flexibot import log
+from flexibot.backend import (DEFAULT_BAUD_RATE, DEFAULT_SERIAL_PORT, HTTP_OVERFLOW,
+                              HTTP_QUEUE_LIMIT, HTTP_TIMEOUT, HTTP_WORKERS, SERIAL_SETTLE,
+                              RobotBackend)
+from flexibot.calibration import CalibrationCache
+from flexibot.fleet import transport_from_spec
+from flexibot.registry import MOTOR_COMMANDS, firmware_header
+from flexibot.script import COMMAND_RE, ScriptError, ScriptRunner, load
+from flexibot.transports import DEFAULT_TCP_PORT, HttpTransport, SerialTransport, Transport, make_transport
+
+CONNECT_TIMEOUT_S = 10.0
+
+
+def add_link_arguments(parser):
+    """
+    Transport flags, falling back to environment variables: FLEXIBOT_TRANSPORT
+    (serial|http|tcp|sim), FLEXIBOT_SERIAL_PORT, FLEXIBOT_HOST, FLEXIBOT_FALLBACK
+    (comma-separated), FLEXIBOT_ROBOT, FLEXIBOT_RECORD, FLEXIBOT_SIM_SPEED,
+    FLEXIBOT_LOG_LEVEL.
+    """
+    parser.add_argument("--transport", choices=("serial", "http", "tcp", "sim"),
+                        default=os.environ.get("FLEXIBOT_TRANSPORT", "serial"))
+    parser.add_argument("--wireless", action="store_const", const="http", dest="transport",
+                        help="shorthand for --transport http")
+    parser.add_argument("--serial-port", default=os.environ.get("FLEXIBOT_SERIAL_PORT", DEFAULT_SERIAL_PORT),
+                        help="device path or pyserial URL (e.g. loop://)")
+    parser.add_argument("--baud", type=int, default=DEFAULT_BAUD_RATE)
+    parser.add_argument("--binary", action="store_true",
+                        help="send serial/TCP commands as compact binary frames")
+    parser.add_argument("--host", default=os.environ.get("FLEXIBOT_HOST", "192.168.3.1"))
+    parser.add_argument("--port", type=int, default=None, help="HTTP/TCP port (default 80 / %d)" % DEFAULT_TCP_PORT)
+    parser.add_argument("--fallback", action="append",
+                        default=[s for s in os.environ.get("FLEXIBOT_FALLBACK", "").split(",") if s],
+                        help="link to fail over to, e.g. tcp:192.168.3.1 (repeatable, in order of preference)")
+    parser.add_argument("--no-supervise", action="store_true",
+                        help="no health probes, reconnects or failover")
+    parser.add_argument("--robot", default=os.environ.get("FLEXIBOT_ROBOT", "morphbot"),
+                        help="name its calibration profile is cached under (default %(default)s)")
+    parser.add_argument("--record", default=os.environ.get("FLEXIBOT_RECORD"),
+                        help="record the session to this telemetry ring file")
+    parser.add_argument("--sim-speed", type=float, default=float(os.environ.get("FLEXIBOT_SIM_SPEED", 1.0)),
+                        help="--transport sim: virtual seconds per real second, 0 = lockstep (default %(default)s)")
+    parser.add_argument("--log-level", choices=sorted(log.LEVELS),
+                        default=os.environ.get("FLEXIBOT_LOG_LEVEL", "INFO").upper(),
+                        help="DEBUG also prints every command and serial line")
+
+
+def transport_from_args(args) -> Transport:
+    if args.transport == "serial":
+        return SerialTransport(args.serial_port, args.baud, settle=SERIAL_SETTLE, binary=args.binary)
+    if args.transport == "http":
+        return HttpTransport(args.host, args.port or 80,
+                             workers=HTTP_WORKERS, queue_limit=HTTP_QUEUE_LIMIT,
+                             overflow=HTTP_OVERFLOW, timeout=HTTP_TIMEOUT)
+    if args.transport == "sim":
+        return make_transport("sim", speed=args.sim_speed or None, binary=args.binary)
+    return make_transport("tcp", host=args.host, port=args.port or DEFAULT_TCP_PORT, binary=args.binary)
+
+
+def supervised(args) -> bool:
+    """The simulator never drops, so only real links get a supervisor."""
+    return not args.no_supervise and args.transport != "sim"
+
+
+def fallbacks_from_args(args) -> list:
+    try:
+        return [transport_from_spec(spec) for spec in args.fallback]
+    except ValueError as e:
+        raise SystemExit(f"--fallback: {e}")
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog="python -m flexibot", description="FlexiBot headless control")
+    sub = parser.add_subparsers(dest="action", required=True)
+
+    send = sub.add_parser("send", help="send commands in order")
+    send.add_argument("commands", nargs="+")
+    send.add_argument("--ack", action="store_true", help="wait for each command's ACK")
+    send.add_argument("--timeout", type=float, default=5.0, help="seconds per command (default %(default)s)")
+    add_link_arguments(send)
+
+    run = sub.add_parser("run", help="run a motion script")
+    run.add_argument("script")
+    run.add_argument("--steps", action="store_true", help="print timing for every step")
+    add_link_arguments(run)
+
+    check = sub.add_parser("check", help="parse a motion script without connecting")
+    check.add_argument("script")
+
+    calib = sub.add_parser("calib", help="push the cached calibration, calibrate only what is missing")
+    calib.add_argument("--drifted", nargs="+", default=[], metavar="MOTOR",
+                       help="recalibrate these motors' limbs (e.g. M3 M4)")
+    calib.add_argument("--max-age-days", type=float, default=None,
+                       help="treat older cached values as missing")
+    calib.add_argument("--show", action="store_true", help="print the cached profile and exit")
+    add_link_arguments(calib)
+
+    header = sub.add_parser("header", help="write the firmware's command_table.h from flexibot.registry")
+    header.add_argument("-o", "--output", default="-", help="file to write (default stdout)")
+    return parser.parse_args(argv)
+
+
+def connect(args, cache: CalibrationCache = None) -> RobotBackend:
+    backend = RobotBackend(transport=transport_from_args(args))
+    if args.record:
+        backend.enable_recording(args.record)
+    (cache or CalibrationCache()).attach(backend, args.robot)
+    if supervised(args):
+        backend.start_reader()
+        supervisor = backend.supervise(fallbacks_from_args(args))
+        if not supervisor.wait_up(CONNECT_TIMEOUT_S):
+            backend.close()
+            raise SystemExit(f"No link came up within {CONNECT_TIMEOUT_S:.0f} s: {supervisor.stats()['links']}")
+        return backend
+    backend.connect().result(CONNECT_TIMEOUT_S)
+    if backend.transport.name == "serial":
+        backend.start_reader()
+    return backend
+
+
+def main(argv=None) -> int:
+    args = parse_args(argv)
+    if args.action == "check":
+        try:
+            steps = load(args.script)
+        except ScriptError as e:
+            print(f"{args.script}: {e}", file=sys.stderr)
+            return 1
+        print(f"{args.script}: {len(steps)} steps OK")
+        return 0
+    if args.action == "header":
+        return write_header(args.output)
+
+    log.set_level(args.log_level)
+    if args.action == "calib":
+        return calibrate(args)
+    if args.action == "send":
+        bad = [c for c in args.commands if not COMMAND_RE.fullmatch(c)]
+        if bad:
+            print(f"Unknown command(s): {', '.join(bad)}", file=sys.stderr)
+            return 2
+    else:
+        try:
+            steps = load(args.script)
+        except ScriptError as e:
+            print(f"{args.script}: {e}", file=sys.stderr)
+            return 1
+
+    backend = connect(args)
+    try:
+        if args.action == "send":
+            for command in args.commands:
+                result = backend.send_command(command, ack=args.ack).result(args.timeout)
+                if args.ack:
+                    print(f"{command}: ACK, {result} us on the robot")
+            return 0
+        report = ScriptRunner(backend, steps).run()
+        if args.steps:
+            for r in report.results:
+                print(f"{r.step.lineno:4d}  {r.planned_ms:10.1f}  {r.actual_ms:10.1f}  "
+                      f"+{r.late_ms:6.2f}  {r.done_ms:10.1f} ms  {r.step.source}")
+        return 0
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        backend.close()
+
+
+def calibrate(args) -> int:
+    cache = CalibrationCache(max_age_s=args.max_age_days * 86400 if args.max_age_days else None)
+    if args.drifted:
+        try:
+            cache.mark_drifted(args.robot, args.drifted)
+        except KeyError as e:
+            print(f"Unknown motor {e}", file=sys.stderr)
+            return 2
+    if args.show:
+        profile = cache.load(args.robot)
+        usable = cache.usable(args.robot)
+        print(f"{cache.path(args.robot)}: {len(profile)} motor(s)")
+        for motor, entry in sorted(profile.items()):
+            note = "" if motor in usable else "  (recalibrate)"
+            print(f"  M{motor}: {entry['neutral']} us{note}")
+        return 0
+    backend = connect(args, cache)
+    try:
+        report = cache.restore(backend, args.robot)
+        print(f"{args.robot}: {len(report.pushed)} cached motor(s) pushed, "
+              f"limb(s) {report.calibrated or 'none'} calibrated, {report.seconds:.1f} s")
+        return 0
+    except Exception as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        backend.close()
+
+
+def write_header(path) -> int:
+    text = firmware_header()
+    if path == "-":
+        sys.stdout.write(text)
+        return 0
+    with open(path, "w", newline="\n") as f:
+        f.write(text)
+    print(f"{path}: {len(MOTOR_COMMANDS)} motor commands")
+    return 0
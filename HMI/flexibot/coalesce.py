@@ -0,0 +1,109 @@
+"""
+Latest-value-wins coalescing for slider-style commands.
+
+Commands are keyed by what they control (the speed setting, one motor, one
+body motor). For each key at most one command goes out per `interval`
+seconds; anything submitted in between only replaces the pending value, and
+the last value is always flushed once the interval has passed.
+"""
+import re
+import threading
+import time
+
+_MOTOR_RE = re.compile(r"^(?:ROTATE|STOP)_(M\d+|BODY\d+)")
+
+
+def coalesce_key(command: str) -> str:
+    """Target a command acts on: 'speed', 'M3', 'BODY1', ... or the bare command name."""
+    if command.startswith("SET_SPEED"):
+        return "speed"
+    m = _MOTOR_RE.match(command)
+    if m:
+        return m.group(1)
+    return command.split(":", 1)[0]
+
+
+class CommandCoalescer:
+    def __init__(self, send_fn, interval=0.05):
+        self.send_fn = send_fn
+        self.interval = interval
+        self._cond = threading.Condition()
+        self._last_sent = {}  # key -> monotonic time of last send
+        self._pending = {}    # key -> latest unsent command
+        self.counters = {"submitted": 0, "sent": 0, "dropped": 0}
+        self.dropped_per_key = {}
+        self._running = True
+        self._thread = threading.Thread(target=self._flush_loop, name="coalescer", daemon=True)
+        self._thread.start()
+
+    def submit(self, command: str, key: str = None):
+        key = key or coalesce_key(command)
+        send_now = False
+        with self._cond:
+            self.counters["submitted"] += 1
+            now = time.monotonic()
+            last = self._last_sent.get(key)
+            if key in self._pending:
+                # Superseded before it went out
+                self.counters["dropped"] += 1
+                self.dropped_per_key[key] = self.dropped_per_key.get(key, 0) + 1
+                self._pending[key] = command
+            elif last is None or now - last >= self.interval:
+                self._last_sent[key] = now
+                self.counters["sent"] += 1
+                send_now = True
+            else:
+                self._pending[key] = command
+                self._cond.notify()
+        if send_now:
+            self.send_fn(command)
+
+    def flush(self):
+        """Send every pending value right away."""
+        with self._cond:
+            ready = list(self._pending.items())
+            self._pending.clear()
+            now = time.monotonic()
+            for key, _ in ready:
+                self._last_sent[key] = now
+            self.counters["sent"] += len(ready)
+        for _, command in ready:
+            self.send_fn(command)
+
+    def stats(self) -> dict:
+        with self._cond:
+            out = dict(self.counters)
+            out["pending"] = len(self._pending)
+            out["dropped_per_key"] = dict(self.dropped_per_key)
+        return out
+
+    def close(self):
+        self.flush()
+        with self._cond:
+            self._running = False
+            self._cond.notify()
+
+    # ----------------------------------------------------------------
+    def _flush_loop(self):
+        while True:
+            ready = []
+            with self._cond:
+                if not self._running:
+                    return
+                now = time.monotonic()
+                next_due = None
+                for key in list(self._pending):
+                    due = self._last_sent.get(key, 0.0) + self.interval
+                    if due <= now:
+                        ready.append(self._pending.pop(key))
+                        self._last_sent[key] = now
+                    elif next_due is None or due < next_due:
+                        next_due = due
+                self.counters["sent"] += len(ready)
+                if not ready:
+                    self._cond.wait(None if next_due is None else next_due - now)
+            for command in ready:
+                try:
+                    self.send_fn(command)
+                except Exception as e:
+                    print(f"[Coalescer] send failed for {command}: {e}")
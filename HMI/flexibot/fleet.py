@@ -0,0 +1,249 @@
+"""
+Several robots from one operator station.
+
+Every robot gets its own RobotBackend (transport and connection pool,
+scheduler, latency tracker, status), but all of them run on the fleet's
+single LinkLoop, and HTTP robots drain their queues on one shared worker
+pool. Adding a robot adds no loop thread and no per-command threads; only
+serial robots keep their own blocking reader.
+
+    fleet = Fleet()
+    fleet.add("alpha", "tcp:192.168.3.2", groups=("front",))
+    fleet.add("bravo", "http:192.168.3.3", fallbacks=["tcp:192.168.3.3"])
+    fleet.add("test", "sim")
+    fleet.connect()
+    fleet.broadcast("STAND_UP").wait(2)      # every robot, same start instant
+    fleet.broadcast("START_CRAWLING", group="front")
+    print(fleet.overview_text())
+    fleet.close()
+
+Synchronized start: the firmware has no clock to schedule against, so
+broadcast() does it on the host. It picks a start time `lead_s` ahead and
+schedules each robot's send on the shared loop (loop.call_at) early by
+half that robot's median round-trip for the command type, so the command
+reaches every robot at about the same moment.
+"""
+import time
+from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from flexibot.backend import RobotBackend
+from flexibot.latency import command_type
+from flexibot.transports import (DEFAULT_HTTP_PORT, DEFAULT_TCP_PORT, HttpTransport, LinkLoop,
+                                 Transport, make_transport)
+
+DEFAULT_LEAD_S = 0.1      # broadcast start time, ahead of the call
+FLEET_HTTP_WORKERS = 4    # threads shared by all HTTP robots
+
+RobotStatus = namedtuple("RobotStatus", "name transport connected status fsm queued p50_ms p95_ms lost")
+
+
+def transport_from_spec(spec: str) -> Transport:
+    """
+    'serial:/dev/ttyACM0', 'http:192.168.3.2[:80]', 'tcp:192.168.3.2[:8081]',
+    'sim' or 'sim:<speed>'.
+    """
+    kind, _, rest = spec.partition(":")
+    if kind == "serial":
+        return make_transport("serial", port=rest)
+    if kind in ("http", "tcp"):
+        host, _, port = rest.partition(":")
+        default = DEFAULT_HTTP_PORT if kind == "http" else DEFAULT_TCP_PORT
+        return make_transport(kind, host=host, port=int(port) if port else default)
+    if kind == "sim":
+        return make_transport("sim", speed=float(rest) if rest else 1.0)
+    raise ValueError(f"Bad robot spec {spec!r} (expected serial:, http:, tcp: or sim)")
+
+
+def _chain(src, dst: Future):
+    if src.cancelled():
+        dst.cancel()
+    elif src.exception() is not None:
+        dst.set_exception(src.exception())
+    else:
+        dst.set_result(src.result())
+
+
+class Broadcast:
+    """One command sent to several robots for the same start time."""
+
+    def __init__(self, command, names):
+        self.command = command
+        self.futures = {name: Future() for name in names}
+        self.dispatched = {}  # name -> perf_counter() when its send was handed to the backend
+        self.t_start = None   # perf_counter() the sends were aimed at
+
+    def wait(self, timeout=None) -> dict:
+        """name -> transport result, or the exception that send raised."""
+        deadline = None if timeout is None else time.perf_counter() + timeout
+        out = {}
+        for name, fut in self.futures.items():
+            remaining = None if deadline is None else max(0.0, deadline - time.perf_counter())
+            try:
+                out[name] = fut.result(remaining)
+            except Exception as e:  # includes the TimeoutError of a send still pending
+                out[name] = e
+        return out
+
+    def dispatch_skew_ms(self):
+        """Spread of the actual send times, without latency compensation."""
+        if len(self.dispatched) < 2:
+            return 0.0
+        return 1000.0 * (max(self.dispatched.values()) - min(self.dispatched.values()))
+
+
+# ====================================================================
+class Fleet:
+    def __init__(self, http_workers=FLEET_HTTP_WORKERS, lead_s=DEFAULT_LEAD_S):
+        self.link = LinkLoop(name="fleet-loop")
+        self.http_pool = ThreadPoolExecutor(http_workers, thread_name_prefix="fleet-http")
+        self.lead_s = lead_s
+        self.robots = {}  # name -> RobotBackend, in the order added
+        self.fallbacks = {}  # name -> [Transport] for supervised robots
+        self.groups = {}  # group -> [names]
+        self.last_broadcast = None
+
+    # ----------------------------------------------------------------
+    # Membership
+    # ----------------------------------------------------------------
+    def add(self, name, transport, groups=(), fallbacks=None) -> RobotBackend:
+        """
+        `transport` is a Transport or a spec string (see transport_from_spec).
+        With `fallbacks` (a list of either, possibly empty) connect() puts the
+        robot under a LinkSupervisor, as RobotBackend.supervise() does for
+        a single robot; None leaves the link unsupervised.
+        """
+        if name in self.robots:
+            raise ValueError(f"Robot {name!r} is already in the fleet")
+        transport = self._transport(transport)
+        backend = RobotBackend(transport=transport, link=self.link, name=name)
+        self.robots[name] = backend
+        if fallbacks is not None:
+            self.fallbacks[name] = [self._transport(t) for t in fallbacks]
+        for group in groups:
+            self.groups.setdefault(group, []).append(name)
+        print(f"[Fleet] added {name} via {transport}")
+        return backend
+
+    def _transport(self, transport) -> Transport:
+        if isinstance(transport, str):
+            transport = transport_from_spec(transport)
+        if isinstance(transport, HttpTransport):
+            transport.dispatch_opts.setdefault("executor", self.http_pool)
+        return transport
+
+    def remove(self, name):
+        backend = self.robots.pop(name)
+        self.fallbacks.pop(name, None)
+        for members in self.groups.values():
+            if name in members:
+                members.remove(name)
+        backend.close()
+
+    def select(self, names=None, group=None) -> list:
+        """[(name, backend)] for the given names and/or group; everyone if neither."""
+        if names is None and group is None:
+            wanted = list(self.robots)
+        else:
+            wanted = list(names or []) + [n for n in self.groups.get(group, []) if n not in (names or [])]
+        unknown = [n for n in wanted if n not in self.robots]
+        if unknown:
+            raise KeyError(f"Not in the fleet: {', '.join(unknown)}")
+        return [(n, self.robots[n]) for n in wanted]
+
+    def connect(self) -> dict:
+        """
+        Open every link in the background; name -> concurrent Future, or the
+        LinkSupervisor of a supervised robot (see its wait_up()).
+        """
+        out = {}
+        for name, backend in self.robots.items():
+            fallbacks = self.fallbacks.get(name)
+            if fallbacks is None:
+                out[name] = backend.connect()
+            else:
+                out[name] = backend.supervise(fallbacks)
+            if any(t.name == "serial" for t in (backend.transport, *(fallbacks or ()))):
+                backend.start_reader()
+        return out
+
+    # ----------------------------------------------------------------
+    # Commands
+    # ----------------------------------------------------------------
+    def send(self, name, command, priority=None, deadline_s=None):
+        return self.robots[name].send_command(command, priority, deadline_s)
+
+    def broadcast(self, command, names=None, group=None, lead_s=None, priority=None,
+                  compensate=True) -> Broadcast:
+        """
+        Send `command` to the selected robots so it starts on all of them at
+        the same moment, `lead_s` from now.
+        """
+        targets = self.select(names, group)
+        lead_s = self.lead_s if lead_s is None else lead_s
+        result = Broadcast(command, [n for n, _ in targets])
+        ctype = command_type(command)
+        loop = self.link.loop
+
+        def fire(name, backend):
+            result.dispatched[name] = time.perf_counter()
+            fut = backend.send_command(command, priority)
+            fut.add_done_callback(lambda f: _chain(f, result.futures[name]))
+
+        def schedule():
+            t_start = loop.time() + lead_s
+            result.t_start = time.perf_counter() + lead_s
+            for name, backend in targets:
+                early = min(lead_s, self._one_way_s(backend, ctype)) if compensate else 0.0
+                loop.call_at(t_start - early, fire, name, backend)
+
+        self.link.call_soon(schedule)
+        self.last_broadcast = result
+        return result
+
+    def stop_all(self) -> Broadcast:
+        """STOP_MOTORS to every robot, right away."""
+        return self.broadcast("STOP_MOTORS", lead_s=0.0, compensate=False)
+
+    @staticmethod
+    def _one_way_s(backend, ctype):
+        """Half the median round-trip for this command type on this robot (0 until measured)."""
+        stats = backend.latency.summary().get(f"{ctype}/{backend.transport.name}")
+        if stats is None:
+            return 0.0
+        return stats["p50_ms"] / 2000.0
+
+    # ----------------------------------------------------------------
+    # Status
+    # ----------------------------------------------------------------
+    def overview(self) -> list:
+        rows = []
+        for name, backend in self.robots.items():
+            backend.latency.expire()
+            stats = backend.latency.summary(by="transport").get(backend.transport.name, {})
+            rows.append(RobotStatus(
+                name=name,
+                transport=backend.transport.name,
+                connected=backend.transport.connected,
+                status=backend.status.latest("status", ""),
+                fsm=backend.status.latest("fsm", "?"),
+                queued=backend.queue_depth(),
+                p50_ms=stats.get("p50_ms"),
+                p95_ms=stats.get("p95_ms"),
+                lost=backend.latency.counters["lost"],
+            ))
+        return rows
+
+    def overview_text(self) -> str:
+        lines = []
+        for r in self.overview():
+            latency = f"p50 {r.p50_ms:.0f} / p95 {r.p95_ms:.0f} ms" if r.p50_ms is not None else "no acks yet"
+            link = r.transport if r.connected else f"{r.transport} (down)"
+            lines.append(f"{r.name}: {link}, FSM {r.fsm}, queued {r.queued}, {latency}, lost {r.lost}")
+        return "\n".join(lines)
+
+    def close(self):
+        for backend in self.robots.values():
+            backend.close()
+        self.link.stop()
+        self.http_pool.shutdown(wait=False)
@@ -0,0 +1,194 @@
+"""
+Host-side gait planner: keyframe trajectories for the limb motors, streamed as POSE frames.
+
+Each limb has a top tendon motor (M1, M3, M5, M7) and a bottom one
+(M2, M4, M6, M8), like GaitControl's bendLimbUp()/bendLimbDown(). A gait
+is one cycle of `period_ms` split into `keyframes` equal steps; per limb
+the cycle is shifted by its phase offset, the first `duty` fraction of it
+is stance (bottom tendon pulls, limb anchored down) and the rest is swing
+(top tendon pulls, limb lifted).
+
+The whole (keyframes x limb motors) pulse table is computed with NumPy in
+one go and cached per parameter set (LRU), so dragging a period slider
+only re-plans parameter sets it has not seen yet. Limbs and motors come
+from flexibot.registry; smoothed pulls ease out from each motor's neutral
+pulse, which is the firmware default unless `neutrals` carries the
+calibrated values (CalibrationCache.limb_neutrals()).
+
+    traj = plan("crawl", period_ms=8000)
+    streamer = GaitStreamer(backend, traj.params)
+    streamer.start()
+    ...
+    streamer.update(period_ms=6000)   # takes effect at the next keyframe
+    streamer.stop()                   # stops every limb motor
+"""
+import threading
+import time
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+
+from flexibot import log
+from flexibot.pose import STOP_PULSE, Pose
+from flexibot.registry import DEFAULT_NEUTRAL_PULSE, LIMB_MOTORS, LIMBS, NUM_LIMBS
+
+NUM_MOTORS = len(LIMB_MOTORS)
+# Column of each limb motor in the pulse table: its limb's phase, and whether it is the top tendon
+_LIMB_COLUMN = [m.limb - 1 for m in LIMB_MOTORS]
+_TOP = [m is motors[0] for _, motors in LIMBS for m in motors]
+PULL_PULSE = 700       # what GaitControl pulls a tendon with
+MIN_PROFILE = 0.05     # smoothed pull weaker than this is sent as a stop
+
+GaitParams = namedtuple(
+    "GaitParams",
+    "period_ms duty phase_offsets keyframes pull_pulse smooth overlap_ms neutrals",
+    defaults=(16, PULL_PULSE, False, 50, None),  # neutrals: one per limb motor, None = firmware default
+)
+
+PRESETS = {
+    # Same 8 x 1500 ms cycle as the firmware crawl, one limb after the other
+    "crawl": GaitParams(period_ms=12000, duty=0.75, phase_offsets=(0.0, 0.25, 0.5, 0.75)),
+    # Diagonal pairs (L1+L4, L2+L3), half stance
+    "fastcrawl": GaitParams(period_ms=6000, duty=0.5, phase_offsets=(0.0, 0.5, 0.5, 0.0)),
+}
+
+# commands[i] is the POSE frame for keyframe i; pulses is (keyframes, limb motors), read-only
+Trajectory = namedtuple("Trajectory", "params step_ms pulses duration_ms commands")
+
+
+def make_params(gait="crawl", **overrides) -> GaitParams:
+    """Preset name or GaitParams, with fields overridden; validated and hashable."""
+    params = PRESETS[gait] if isinstance(gait, str) else gait
+    params = params._replace(**overrides)
+    offsets = tuple(float(o) % 1.0 for o in params.phase_offsets)
+    if len(offsets) != NUM_LIMBS:
+        raise ValueError(f"Need {NUM_LIMBS} phase offsets, got {len(offsets)}")
+    if not 0.0 < params.duty < 1.0:
+        raise ValueError(f"Duty factor must be in (0, 1), got {params.duty}")
+    if params.period_ms <= 0 or params.keyframes < 2:
+        raise ValueError("period_ms must be > 0 and keyframes >= 2")
+    neutrals = (DEFAULT_NEUTRAL_PULSE,) * NUM_MOTORS if params.neutrals is None else tuple(map(int, params.neutrals))
+    if len(neutrals) != NUM_MOTORS:
+        raise ValueError(f"Need {NUM_MOTORS} neutral pulses, got {len(neutrals)}")
+    return params._replace(neutrals=neutrals, period_ms=int(params.period_ms), duty=float(params.duty),
+                           phase_offsets=offsets, keyframes=int(params.keyframes),
+                           pull_pulse=int(params.pull_pulse), smooth=bool(params.smooth),
+                           overlap_ms=int(params.overlap_ms))
+
+
+def plan(gait="crawl", **overrides) -> Trajectory:
+    return _plan(make_params(gait, **overrides))
+
+
+def cache_info():
+    return _plan.cache_info()
+
+
+def clear_cache():
+    _plan.cache_clear()
+
+
+@lru_cache(maxsize=32)
+def _plan(params: GaitParams) -> Trajectory:
+    k = params.keyframes
+    # Sample each step at its midpoint; (k, motors) phase of every motor's limb
+    t = (np.arange(k) + 0.5) / k
+    phase = (t[:, None] - np.asarray(params.phase_offsets)[None, _LIMB_COLUMN]) % 1.0
+    stance = phase < params.duty
+
+    if params.smooth:
+        # Raised sine over each stance / swing interval: ease in, ease out
+        u = np.where(stance, phase / params.duty, (phase - params.duty) / (1.0 - params.duty))
+        profile = np.sin(np.pi * u)
+    else:
+        profile = np.ones_like(phase)
+    neutral = np.asarray(params.neutrals)[None, :]
+    pull = np.rint(neutral - (neutral - params.pull_pulse) * profile).astype(np.int32)
+    pull[profile < MIN_PROFILE] = STOP_PULSE
+
+    # Top tendons pull in swing, bottom tendons in stance
+    pulses = np.where(stance != np.asarray(_TOP)[None, :], pull, STOP_PULSE).astype(np.int32)
+    pulses.flags.writeable = False
+
+    step_ms = params.period_ms / k
+    # Hold each target a little past the next keyframe so link jitter never lets the
+    # firmware's auto-stop timer fire between two steps
+    duration_ms = int(round(step_ms)) + params.overlap_ms
+    commands = tuple(
+        Pose({m.number: (p, 0 if p == STOP_PULSE else duration_ms) for m, p in zip(LIMB_MOTORS, row)}).to_command()
+        for row in pulses.tolist()
+    )
+    return Trajectory(params, step_ms, pulses, duration_ms, commands)
+
+
+# ====================================================================
+class GaitStreamer:
+    """Sends a trajectory's POSE frames to the robot on a timer thread."""
+
+    def __init__(self, backend, params: GaitParams, cycles=None):
+        self.backend = backend
+        self.cycles = cycles  # None = until stop()
+        self.frames_sent = 0
+        self.cycles_done = 0
+        self._trajectory = _plan(make_params(params))
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+
+    @property
+    def params(self) -> GaitParams:
+        return self._trajectory.params
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def update(self, **overrides):
+        """Re-plan with new parameters; the current phase in the cycle is kept."""
+        trajectory = _plan(make_params(self.params, **overrides))
+        with self._lock:
+            self._trajectory = trajectory
+        log.debug("[GaitStreamer] params => %s", trajectory.params)
+
+    def start(self):
+        if self.running:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="gait-streamer", daemon=True)
+        self._thread.start()
+
+    def stop(self, join_timeout=2.0):
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(join_timeout)
+            self._thread = None
+
+    def _run(self):
+        # GAIT mode runs GaitControl::update(), which would fight our frames
+        self.backend.send_command("SET_MODE:INDIVIDUAL")
+        print(f"[GaitStreamer] streaming {self.params}")
+        phase = 0.0
+        t_next = time.perf_counter()
+        while not self._stop.wait(max(0.0, t_next - time.perf_counter())):
+            with self._lock:
+                trajectory = self._trajectory
+            k = len(trajectory.commands)
+            index = int(phase * k) % k
+            # A keyframe that cannot go out within its own step is stale
+            self.backend.send_command(trajectory.commands[index], deadline_s=trajectory.step_ms / 1000.0)
+            self.frames_sent += 1
+
+            phase = (index + 1) / k
+            if phase >= 1.0:
+                phase = 0.0
+                self.cycles_done += 1
+                if self.cycles is not None and self.cycles_done >= self.cycles:
+                    break
+            t_next += trajectory.step_ms / 1000.0
+
+        stop = Pose()
+        for m in LIMB_MOTORS:
+            stop.stop(m.number)
+        self.backend.send_pose(stop)
+        print(f"[GaitStreamer] stopped after {self.frames_sent} frames")
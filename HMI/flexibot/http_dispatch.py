@@ -0,0 +1,203 @@
+"""
+Pooled HTTP dispatch for the wireless link.
+
+One requests.Session (keep-alive connection pool) is shared by a small,
+fixed set of worker threads that drain a bounded queue (or, for a fleet,
+by drain tasks on an executor all robots share). When the queue is
+full the overflow policy decides what happens to the new command:
+
+    "drop_oldest"  -> discard the oldest queued command, enqueue the new one
+    "drop_newest"  -> reject the new command
+    "block"        -> wait until a worker frees a slot
+
+Every request is timed (time spent queued + time on the wire) and the
+result is handed to an optional callback.
+"""
+import queue
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import Future
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from flexibot import log
+
+OVERFLOW_POLICIES = ("drop_oldest", "drop_newest", "block")
+
+# status_code is None when the request never got a response (timeout, refused, ...)
+# ack is the firmware's X-Ack header ("<id>:<t_us>") when it sent one,
+# nbytes the size of the response body
+RequestTiming = namedtuple("RequestTiming", "command status_code queued_s elapsed_s error ack nbytes",
+                           defaults=(None, 0))
+
+
+class DispatchQueueFull(Exception):
+    """Raised on a command's future when the overflow policy dropped it."""
+
+
+class HttpDispatcher:
+    def __init__(self, base_url, workers=1, queue_limit=16, overflow="drop_oldest",
+                 timeout=5.0, on_result=None, history=200, executor=None):
+        """
+        With `executor` (a concurrent.futures executor shared by several
+        dispatchers, e.g. one per robot of a fleet) no threads of our own
+        are started: up to `workers` drain tasks run on the executor while
+        this dispatcher has queued commands.
+        """
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(f"Unknown overflow policy: {overflow!r} (expected one of {OVERFLOW_POLICIES})")
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.overflow = overflow
+        self.on_result = on_result
+
+        # A single worker keeps commands in press order; the firmware only
+        # serves one client per loop() anyway.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=workers, max_retries=0)
+        self.session.mount("http://", adapter)
+
+        self._queue = queue.Queue(maxsize=queue_limit)
+        self._lock = threading.Lock()
+        self._closed = False
+        self.timings = deque(maxlen=history)
+        self.counters = {"sent": 0, "ok": 0, "failed": 0, "dropped": 0}
+
+        self.executor = executor
+        self.workers = workers
+        self._draining = 0  # drain tasks on the executor
+        self._workers = []
+        if executor is None:
+            for i in range(workers):
+                t = threading.Thread(target=self._worker, name=f"http-dispatch-{i}", daemon=True)
+                t.start()
+                self._workers.append(t)
+
+    # ----------------------------------------------------------------
+    def submit(self, command: str) -> Future:
+        """Queue a command; the returned future resolves to a RequestTiming."""
+        fut = Future()
+        if self._closed:
+            fut.set_exception(RuntimeError("HttpDispatcher is closed"))
+            return fut
+
+        item = (command, fut, time.perf_counter())
+        if self.overflow == "block":
+            self._queue.put(item)
+            self._kick()
+            return fut
+
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            if self.overflow == "drop_newest":
+                self._drop(item)
+            else:
+                try:
+                    self._drop(self._queue.get_nowait())
+                except queue.Empty:
+                    pass
+                try:
+                    self._queue.put_nowait(item)
+                except queue.Full:
+                    self._drop(item)
+        self._kick()
+        return fut
+
+    def queue_depth(self) -> int:
+        return self._queue.qsize()
+
+    def stats(self) -> dict:
+        """Counters plus mean/max wire time over the recent history."""
+        with self._lock:
+            out = dict(self.counters)
+            elapsed = [t.elapsed_s for t in self.timings]
+        out["queued"] = self._queue.qsize()
+        if elapsed:
+            out["mean_ms"] = 1000.0 * sum(elapsed) / len(elapsed)
+            out["max_ms"] = 1000.0 * max(elapsed)
+        return out
+
+    def close(self):
+        self._closed = True
+        for _ in self._workers:
+            try:
+                self._queue.put_nowait(None)
+            except queue.Full:
+                pass
+        self.session.close()
+
+    # ----------------------------------------------------------------
+    def _drop(self, item):
+        command, fut, _ = item
+        with self._lock:
+            self.counters["dropped"] += 1
+        log.debug("[HTTP] queue full (%s) -> dropped %s", self.overflow, command)
+        fut.set_exception(DispatchQueueFull(command))
+
+    def _kick(self):
+        """Shared executor: start a drain task unless `workers` are already running."""
+        if self.executor is None or self._closed:
+            return
+        with self._lock:
+            if self._draining >= self.workers or self._queue.empty():
+                return
+            self._draining += 1
+        self.executor.submit(self._drain_queue)
+
+    def _drain_queue(self):
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                item = None
+            if item is None or self._closed:
+                with self._lock:
+                    self._draining -= 1
+                # A command queued between get_nowait() and here still needs a task
+                self._kick()
+                return
+            self._request(item)
+
+    def _worker(self):
+        while True:
+            item = self._queue.get()
+            if item is None or self._closed:
+                return
+            self._request(item)
+
+    def _request(self, item):
+        command, fut, t_queued = item
+        t_start = time.perf_counter()
+        status_code, error, ack, nbytes = None, None, None, 0
+        try:
+            response = self.session.get(f"{self.base_url}/{command}", timeout=self.timeout)
+            status_code = response.status_code
+            ack = response.headers.get("X-Ack")
+            nbytes = len(response.content)
+            response.close()
+        except requests.exceptions.Timeout:
+            error = "timeout"
+        except requests.exceptions.ConnectionError:
+            error = "connection"
+        except Exception as e:
+            error = str(e)
+        t_end = time.perf_counter()
+
+        timing = RequestTiming(command, status_code, t_start - t_queued, t_end - t_start, error, ack, nbytes)
+        with self._lock:
+            self.timings.append(timing)
+            self.counters["sent"] += 1
+            if status_code == 200:
+                self.counters["ok"] += 1
+            else:
+                self.counters["failed"] += 1
+
+        if self.on_result:
+            try:
+                self.on_result(timing)
+            except Exception as e:
+                print(f"[HTTP] on_result callback failed: {e}")
+        fut.set_result(timing)
@@ -0,0 +1,147 @@
+"""
+Command round-trip latency from sequence IDs and firmware acks.
+
+Every command goes out tagged with an 8-bit sequence ID:
+
+    ROTATE_M1_CW:500@42
+
+The firmware strips the tag, runs the command and answers
+`ACK:<id>:<t_us>` once processCommand has finished (t_us = time it spent
+processing). On serial the ack is a line of output, over HTTP it is the
+X-Ack response header. LatencyTracker matches acks to sends and keeps a
+rolling window of round-trip times per (command type, transport).
+"""
+import re
+import threading
+import time
+from collections import deque
+
+TAG_SEP = "@"
+SEQ_MOD = 256  # IDs wrap; also fits the binary frame's seq byte
+
+_TAG_RE = re.compile(r"^(.*)@(\d+)$")
+_MOTOR_RE = re.compile(r"M\d+|BODY\d+")
+
+
+def tag_command(command: str, seq: int) -> str:
+    return f"{command}{TAG_SEP}{seq}"
+
+
+def split_tag(command: str):
+    """'CMD@42' -> ('CMD', 42); untagged commands give (command, None)."""
+    m = _TAG_RE.match(command)
+    if m:
+        return m.group(1), int(m.group(2))
+    return command, None
+
+
+def command_type(command: str) -> str:
+    """Group commands for stats: 'ROTATE_M3_CCW:1500_200' -> 'ROTATE_Mx_CCW'."""
+    base = command.split(":", 1)[0]
+    if base in ("SET_MODE", "CALIBRATE_LIMB", "POSE", "BATCH", "SET_SPEED"):
+        return base
+    return _MOTOR_RE.sub("Mx", base)
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return None
+    idx = min(len(sorted_values) - 1, int(round(q / 100.0 * (len(sorted_values) - 1))))
+    return sorted_values[idx]
+
+
+class LatencyTracker:
+    def __init__(self, window=500, ack_timeout=2.0):
+        self.window = window
+        self.ack_timeout = ack_timeout
+        self._lock = threading.Lock()
+        self._next_seq = 0
+        self._pending = {}   # seq -> (t_sent, command_type, transport)
+        self._samples = {}   # (command_type, transport) -> deque of seconds
+        self._robot_us = {}  # (command_type, transport) -> deque of firmware processing us
+        self.counters = {"sent": 0, "acked": 0, "lost": 0, "unmatched": 0}
+
+    def next_seq(self) -> int:
+        with self._lock:
+            self._next_seq = (self._next_seq + 1) % SEQ_MOD
+            return self._next_seq
+
+    def sent(self, seq: int, command: str, transport: str, t: float = None) -> float:
+        """Returns the send time, which lost() takes to tell this send from a later one with the same ID."""
+        t = t or time.perf_counter()
+        with self._lock:
+            if seq in self._pending:
+                # ID wrapped around before the ack came back
+                self.counters["lost"] += 1
+            self._pending[seq] = (t, command_type(command), transport)
+            self.counters["sent"] += 1
+        return t
+
+    def acked(self, seq: int, robot_us: int = 0, t: float = None):
+        """Returns the round-trip in seconds, or None if the ID was not pending."""
+        t = t or time.perf_counter()
+        with self._lock:
+            entry = self._pending.pop(seq, None)
+            if entry is None:
+                self.counters["unmatched"] += 1
+                return None
+            t_sent, ctype, transport = entry
+            key = (ctype, transport)
+            rtt = t - t_sent
+            self._samples.setdefault(key, deque(maxlen=self.window)).append(rtt)
+            self._robot_us.setdefault(key, deque(maxlen=self.window)).append(robot_us)
+            self.counters["acked"] += 1
+        return rtt
+
+    def expire(self, now: float = None) -> int:
+        """Drop sends older than ack_timeout; returns how many were lost."""
+        now = now or time.perf_counter()
+        with self._lock:
+            stale = [s for s, (t0, _, _) in self._pending.items() if now - t0 > self.ack_timeout]
+            for s in stale:
+                del self._pending[s]
+            self.counters["lost"] += len(stale)
+        return len(stale)
+
+    def lost(self, seq: int, t_sent: float) -> bool:
+        """Give up on the send of `seq` at `t_sent`; False if it was acked (or the ID reused) since."""
+        with self._lock:
+            entry = self._pending.get(seq)
+            if entry is None or entry[0] != t_sent:
+                return False
+            del self._pending[seq]
+            self.counters["lost"] += 1
+        return True
+
+    def in_flight(self) -> int:
+        return len(self._pending)
+
+    def summary(self, by="both") -> dict:
+        """
+        Percentiles in ms. `by` is 'both' (command type + transport),
+        'type' or 'transport'.
+        """
+        with self._lock:
+            groups = {}
+            for (ctype, transport), values in self._samples.items():
+                key = {"both": f"{ctype}/{transport}", "type": ctype, "transport": transport}[by]
+                groups.setdefault(key, []).extend(values)
+        out = {}
+        for key, values in groups.items():
+            values.sort()
+            out[key] = {
+                "n": len(values),
+                "p50_ms": 1000.0 * percentile(values, 50),
+                "p95_ms": 1000.0 * percentile(values, 95),
+                "p99_ms": 1000.0 * percentile(values, 99),
+            }
+        return out
+
+    def overlay_text(self) -> str:
+        """One short line per transport, for the HMI overlay."""
+        lines = []
+        for transport, s in sorted(self.summary(by="transport").items()):
+            lines.append(f"{transport}: p50 {s['p50_ms']:.0f} / p95 {s['p95_ms']:.0f} / "
+                         f"p99 {s['p99_ms']:.0f} ms (n={s['n']})")
+        lines.append(f"in flight {self.in_flight()}, lost {self.counters['lost']}")
+        return "\n".join(lines)
@@ -0,0 +1,56 @@
+"""
+Level-gated console logging for the hot paths.
+
+Output looks exactly like the print() calls it replaces; lines below the
+current level are skipped before any formatting happens, so passing
+arguments instead of an f-string makes a disabled debug() almost free:
+
+    log.debug("[RobotBackend] send_command: %s", command)
+
+The level comes from FLEXIBOT_LOG_LEVEL (DEBUG / INFO / WARNING / ERROR,
+default INFO) or set_level().
+"""
+import os
+
+DEBUG = 10
+INFO = 20
+WARNING = 30
+ERROR = 40
+LEVELS = {"DEBUG": DEBUG, "INFO": INFO, "WARNING": WARNING, "ERROR": ERROR}
+
+_level = LEVELS.get(os.environ.get("FLEXIBOT_LOG_LEVEL", "INFO").upper(), INFO)
+
+
+def set_level(level):
+    """Level number or name ("DEBUG", ...)."""
+    global _level
+    _level = LEVELS[level.upper()] if isinstance(level, str) else int(level)
+
+
+def get_level() -> int:
+    return _level
+
+
+def enabled(level) -> bool:
+    return level >= _level
+
+
+def _emit(level, msg, args):
+    if level >= _level:
+        print(msg % args if args else msg)
+
+
+def debug(msg, *args):
+    _emit(DEBUG, msg, args)
+
+
+def info(msg, *args):
+    _emit(INFO, msg, args)
+
+
+def warning(msg, *args):
+    _emit(WARNING, msg, args)
+
+
+def error(msg, *args):
+    _emit(ERROR, msg, args)
@@ -0,0 +1,199 @@
+"""
+Live metrics for the HMI: counters, gauges and histograms in one registry,
+rendered in the Prometheus text exposition format.
+
+    metrics = Registry()
+    sent = metrics.counter("flexibot_commands_sent_total", "Commands sent", ("type", "transport"))
+    sent.inc(type="ROTATE_Mx_CW", transport="serial")
+    metrics.gauge("flexibot_threads", "Live threads", fn=threading.active_count)
+
+    server = MetricsServer(metrics, port=9108)   # GET http://127.0.0.1:9108/metrics
+
+Updates are a dict increment under one lock; gauges given `fn` are only
+evaluated when scraped, so the hot paths pay nothing for them. The
+server binds to localhost by default and is off unless started.
+"""
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+DEFAULT_METRICS_PORT = 9108
+
+# Seconds; covers UI frames (16 ms) up to multi-second stalls
+FRAME_BUCKETS = (0.008, 0.016, 0.033, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5)
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _label_str(names, values):
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+def _fmt(value):
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name, help_text, labels=(), fn=None):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.fn = fn  # called at scrape time instead of stored values
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(f"{self.name} expects labels {self.labels}, got {tuple(labels)}")
+        return tuple(labels[n] for n in self.labels)
+
+    def samples(self):
+        """(suffix, label names, label values, value) tuples for rendering."""
+        if self.fn is not None:
+            return [("", (), (), self.fn())]
+        with self._lock:
+            return [("", self.labels, key, value) for key, value in self._values.items()]
+
+    def render(self):
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} {self.kind}"]
+        for suffix, names, values, value in self.samples():
+            lines.append(f"{self.name}{suffix}{_label_str(names, values)} {_fmt(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels):
+        return self._values.get(self._key(labels), 0)
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels):
+        if self.fn is not None:
+            return self.fn()
+        return self._values.get(self._key(labels), 0)
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, buckets=FRAME_BUCKETS):
+        super().__init__(name, help_text)
+        self.buckets = tuple(sorted(buckets)) + (float("inf"),)
+        self._counts = [0] * len(self.buckets)
+        self._sum = 0.0
+        self._count = 0
+        self.last = None
+
+    def observe(self, value):
+        with self._lock:
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    self._counts[i] += 1
+                    break
+            self._sum += value
+            self._count += 1
+            self.last = value
+
+    def samples(self):
+        with self._lock:
+            counts, total, count = list(self._counts), self._sum, self._count
+        out, running = [], 0
+        for bound, n in zip(self.buckets, counts):
+            running += n
+            out.append(("_bucket", ("le",), (_fmt(bound),), running))
+        out.append(("_sum", (), (), total))
+        out.append(("_count", (), (), count))
+        return out
+
+
+class Registry:
+    def __init__(self):
+        self._metrics = {}
+        self._lock = threading.Lock()
+
+    def _add(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name, help_text, labels=(), fn=None) -> Counter:
+        return self._add(Counter(name, help_text, labels, fn))
+
+    def gauge(self, name, help_text, labels=(), fn=None) -> Gauge:
+        return self._add(Gauge(name, help_text, labels, fn))
+
+    def histogram(self, name, help_text, buckets=FRAME_BUCKETS) -> Histogram:
+        return self._add(Histogram(name, help_text, buckets))
+
+    def get(self, name):
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            try:
+                lines += metric.render()
+            except Exception as e:
+                lines.append(f"# {metric.name}: {e}")
+        return "\n".join(lines) + "\n"
+
+
+# ====================================================================
+class MetricsServer:
+    """Serves GET /metrics on a daemon thread."""
+
+    def __init__(self, registry: Registry, port=DEFAULT_METRICS_PORT, host="127.0.0.1"):
+        self.registry = registry
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(handler):
+                if handler.path.split("?", 1)[0] != "/metrics":
+                    handler.send_error(404)
+                    return
+                body = registry.render().encode("utf-8")
+                handler.send_response(200)
+                handler.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+                handler.send_header("Content-Length", str(len(body)))
+                handler.end_headers()
+                handler.wfile.write(body)
+
+            def log_message(handler, *args):
+                pass  # one line per scrape would drown the console
+
+        self.httpd = ThreadingHTTPServer((host, port), Handler)
+        self.httpd.daemon_threads = True
+        self.host, self.port = self.httpd.server_address[:2]
+        self._thread = threading.Thread(target=self.httpd.serve_forever, name="metrics-http", daemon=True)
+        self._thread.start()
+        print(f"[Metrics] serving http://{self.host}:{self.port}/metrics")
+
+    def close(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+        self._thread.join(timeout=2)
@@ -0,0 +1,102 @@
+"""
+Multi-motor frames: one line on the link for many motor targets.
+
+    POSE:<n>=<pulse>_<duration>;<n>=<pulse>_<duration>;...
+        n is the motor number 1..10 (M1..M8, 9 = BODY1, 10 = BODY2).
+        pulse 0 stops the motor. All targets are applied in the same
+        loop() pass on the robot and share one start time.
+
+    BATCH:<cmd>;<cmd>;...
+        Plain commands (ROTATE_*, STOP_*, SET_MODE:*, ...) processed back
+        to back in one loop() pass.
+"""
+from flexibot.registry import MOTOR_NUMBERS, NUM_MOTORS
+
+PULSE_MIN = 500
+PULSE_MAX = 2500
+STOP_PULSE = 0
+
+# Longest frame we hand the firmware in one go: MAX_COMMAND_LEN in
+# controller/src/WebServerControl.h, which sizes every link's line buffer
+MAX_FRAME_LEN = 240
+
+
+def motor_number(motor) -> int:
+    """'M3' / 'BODY1' / 3 -> motor number 1..10."""
+    if isinstance(motor, int):
+        n = motor
+    else:
+        n = MOTOR_NUMBERS.get(str(motor).upper())
+        if n is None:
+            raise ValueError(f"Unknown motor {motor!r}")
+    if not 1 <= n <= NUM_MOTORS:
+        raise ValueError(f"Motor number out of range: {n}")
+    return n
+
+
+class Pose:
+    """Targets for several motors, sent as a single POSE frame."""
+
+    def __init__(self, targets=None):
+        self.targets = {}  # motor number -> (pulse, duration_ms)
+        for motor, (pulse, duration) in (targets or {}).items():
+            self.set(motor, pulse, duration)
+
+    def set(self, motor, pulse: int, duration: int):
+        pulse = int(pulse)
+        if pulse != STOP_PULSE and not PULSE_MIN <= pulse <= PULSE_MAX:
+            raise ValueError(f"Pulse {pulse} outside {PULSE_MIN}..{PULSE_MAX}")
+        self.targets[motor_number(motor)] = (pulse, max(0, int(duration)))
+        return self
+
+    def stop(self, motor):
+        self.targets[motor_number(motor)] = (STOP_PULSE, 0)
+        return self
+
+    def __len__(self):
+        return len(self.targets)
+
+    def __eq__(self, other):
+        return isinstance(other, Pose) and self.targets == other.targets
+
+    def __repr__(self):
+        return f"Pose({self.targets})"
+
+    def to_command(self) -> str:
+        body = ";".join(f"{n}={p}_{d}" for n, (p, d) in sorted(self.targets.items()))
+        return f"POSE:{body}"
+
+    @classmethod
+    def from_command(cls, command: str) -> "Pose":
+        if not command.startswith("POSE:"):
+            raise ValueError(f"Not a POSE frame: {command!r}")
+        pose = cls()
+        for entry in filter(None, command[5:].split(";")):
+            n, _, rest = entry.partition("=")
+            pulse, _, duration = rest.partition("_")
+            pose.targets[int(n)] = (int(pulse), int(duration or 0))
+        return pose
+
+
+def _batch_frame(commands):
+    return commands[0] if len(commands) == 1 else "BATCH:" + ";".join(commands)
+
+
+def pack_batch(commands, max_len=MAX_FRAME_LEN):
+    """Pack plain commands into as few BATCH frames as fit in max_len each."""
+    frames, current = [], []
+    size = len("BATCH:")
+    for command in commands:
+        command = command.strip()
+        if ";" in command:
+            raise ValueError(f"Command cannot contain ';': {command!r}")
+        extra = len(command) + (1 if current else 0)
+        if current and size + extra > max_len:
+            frames.append(_batch_frame(current))
+            current, size = [], len("BATCH:")
+            extra = len(command)
+        current.append(command)
+        size += extra
+    if current:
+        frames.append(_batch_frame(current))
+    return frames
@@ -0,0 +1,156 @@
+"""
+The robot's motors and the per-motor commands that drive them, in one place.
+
+Everything that used to spell out M1..M8 / BODY1..2 by hand is built from
+this module: the limb and body control screens, the pose and binary
+protocol motor maps, the simulator's command dispatch, and the firmware's
+command_table.h, which is generated rather than written:
+
+    python -m flexibot header -o ../controller/src/command_table.h
+
+A robot with more limbs changes NUM_LIMBS here and regenerates the header
+(the firmware's limbs[] / motorChannels[] must grow to match; a
+static_assert there checks it).
+
+    MOTOR_COMMANDS["ROTATE_M3_CCW"]  -> MotorCommand(name, kind="rotate", index=2, ccw=True)
+    CONTROL_ROWS["limbs"]            -> one row of buttons per limb, for the screens
+"""
+from collections import namedtuple
+
+NUM_LIMBS = 4         # two motors each: top tendon M(2l-1), bottom tendon M(2l)
+NUM_BODY_MOTORS = 2
+
+# limb_control.h: LimbControl::neutralPulse until a calibration sets it, and the range it accepts
+DEFAULT_NEUTRAL_PULSE = 1550
+NEUTRAL_PULSE_MIN = 1300
+NEUTRAL_PULSE_MAX = 1700
+
+# number: 1-based (POSE, teleop); index: slot in the firmware's limbs[]; limb: 1.. or None (body)
+Motor = namedtuple("Motor", "number name index limb")
+# kind: rotate | stop | stop_pair (index and index + 1)
+MotorCommand = namedtuple("MotorCommand", "name kind index ccw")
+# One button: label, command name (a MOTOR_COMMANDS key), and whether it is a stop
+ControlButton = namedtuple("ControlButton", "text command stop")
+ControlRow = namedtuple("ControlRow", "label buttons")
+
+
+def build_motors(num_limbs=NUM_LIMBS, num_body=NUM_BODY_MOTORS):
+    limb_motors = [Motor(n, f"M{n}", n - 1, (n - 1) // 2 + 1) for n in range(1, 2 * num_limbs + 1)]
+    body_motors = [Motor(2 * num_limbs + i, f"BODY{i}", 2 * num_limbs + i - 1, None)
+                   for i in range(1, num_body + 1)]
+    return tuple(limb_motors + body_motors)
+
+
+MOTORS = build_motors()
+NUM_MOTORS = len(MOTORS)
+LIMB_MOTORS = tuple(m for m in MOTORS if m.limb is not None)
+BODY_MOTORS = tuple(m for m in MOTORS if m.limb is None)
+LIMBS = tuple((limb, tuple(m for m in LIMB_MOTORS if m.limb == limb)) for limb in range(1, NUM_LIMBS + 1))
+
+# 'M3' / 'BODY1' -> motor number; body motors also answer to M9, M10, ...
+MOTOR_NUMBERS = {m.name: m.number for m in MOTORS}
+MOTOR_NUMBERS.update({f"M{m.number}": m.number for m in BODY_MOTORS})
+
+
+def rotate_name(motor: Motor, ccw: bool) -> str:
+    return f"ROTATE_{motor.name}_{'CCW' if ccw else 'CW'}"
+
+
+def stop_name(limb_or_motor) -> str:
+    """Limb number -> 'STOP_M1_M2_MOTORS'; body Motor -> 'STOP_BODY1'."""
+    if isinstance(limb_or_motor, Motor):
+        return f"STOP_{limb_or_motor.name}"
+    top, bottom = dict(LIMBS)[limb_or_motor]
+    return f"STOP_{top.name}_{bottom.name}_MOTORS"
+
+
+def build_commands():
+    """Command name (no parameters) -> MotorCommand, for every per-motor command."""
+    commands = {}
+    for m in MOTORS:
+        for ccw in (False, True):
+            name = rotate_name(m, ccw)
+            commands[name] = MotorCommand(name, "rotate", m.index, ccw)
+    for limb, (top, _) in LIMBS:
+        name = stop_name(limb)
+        commands[name] = MotorCommand(name, "stop_pair", top.index, False)
+    for m in BODY_MOTORS:
+        name = stop_name(m)
+        commands[name] = MotorCommand(name, "stop", m.index, False)
+    return commands
+
+
+MOTOR_COMMANDS = build_commands()
+
+
+def build_control_rows():
+    """The button rows of the limb and body screens, in display order."""
+    limbs = []
+    for limb, motors in LIMBS:
+        buttons = [ControlButton(f"L{limb} {m.name} {d}", rotate_name(m, d == "CCW"), False)
+                   for m in motors for d in ("CW", "CCW")]
+        buttons.append(ControlButton(f"Stop L{limb}", stop_name(limb), True))
+        limbs.append(ControlRow(f"Limb {limb}", tuple(buttons)))
+    body = []
+    for m in BODY_MOTORS:
+        label = m.name.capitalize()  # BODY1 -> Body1
+        body.append(ControlRow(label, (ControlButton(f"{label} CW", rotate_name(m, False), False),
+                                       ControlButton(f"{label} CCW", rotate_name(m, True), False),
+                                       ControlButton(f"Stop {label}", stop_name(m), True))))
+    return {"limbs": tuple(limbs), "body": tuple(body)}
+
+
+CONTROL_ROWS = build_control_rows()
+
+
+# --------------------------------------------------------------------
+# Firmware table
+# --------------------------------------------------------------------
+_KINDS = {("rotate", False): "MC_ROTATE_CW", ("rotate", True): "MC_ROTATE_CCW",
+          ("stop", False): "MC_STOP", ("stop_pair", False): "MC_STOP_PAIR"}
+
+
+def firmware_header() -> str:
+    """controller/src/command_table.h: the per-motor commands, sorted for a binary search."""
+    rows = [f'  {{"{c.name}", {_KINDS[c.kind, c.ccw]}, {c.index}}},'
+            for c in sorted(MOTOR_COMMANDS.values())]
+    return "\n".join([
+        "// Generated from HMI/flexibot/registry.py by `python -m flexibot header`; do not edit.",
+        "#ifndef COMMAND_TABLE_H",
+        "#define COMMAND_TABLE_H",
+        "",
+        "#include <stdint.h>",
+        "#include <string.h>",
+        "",
+        f"#define REGISTRY_NUM_LIMBS  {NUM_LIMBS}",
+        f"#define REGISTRY_NUM_MOTORS {NUM_MOTORS}",
+        "",
+        "enum MotorCommandKind : uint8_t { MC_ROTATE_CW, MC_ROTATE_CCW, MC_STOP, MC_STOP_PAIR };",
+        "",
+        "struct MotorCommand {",
+        "  const char* name;",
+        "  uint8_t     kind;",
+        "  uint8_t     motor;   // index into limbs[]; MC_STOP_PAIR stops motor and motor + 1",
+        "};",
+        "",
+        "// Sorted by name (strcmp order)",
+        "static const MotorCommand MOTOR_COMMANDS[] = {",
+        *rows,
+        "};",
+        "static const int NUM_MOTOR_COMMANDS = sizeof(MOTOR_COMMANDS) / sizeof(MOTOR_COMMANDS[0]);",
+        "",
+        "// Command name without parameters -> its entry, or nullptr",
+        "static inline const MotorCommand* findMotorCommand(const char* name) {",
+        "  int lo = 0, hi = NUM_MOTOR_COMMANDS - 1;",
+        "  while (lo <= hi) {",
+        "    int mid = (lo + hi) / 2;",
+        "    int c = strcmp(name, MOTOR_COMMANDS[mid].name);",
+        "    if (c == 0) return &MOTOR_COMMANDS[mid];",
+        "    if (c < 0) hi = mid - 1; else lo = mid + 1;",
+        "  }",
+        "  return nullptr;",
+        "}",
+        "",
+        "#endif // COMMAND_TABLE_H",
+        "",
+    ])
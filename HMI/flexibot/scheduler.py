@@ -0,0 +1,283 @@
+"""
+Priority scheduling between the UI and the transport.
+
+Every command gets a priority class:
+
+    PRIO_STOP    STOP_*, all-stop POSE frames        never expire, never wait
+    PRIO_MODE    SET_MODE:*, START_*, STAND_UP, ...  default deadline 5 s
+    PRIO_MOTION  ROTATE_*, POSE:, BATCH:, HB:        default deadline 1 s
+    PRIO_TUNING  SET_SPEED and everything else       no deadline (last value matters)
+
+Commands wait in a heap ordered by (priority, submit order) and only
+`max_in_flight` of them are handed to the transport at a time, so the
+transport's own queue (HttpDispatcher) stays short. Stops skip that limit
+and jump the heap, and on arrival they drop every queued motion command
+for the motors they stop. Motion commands still queued past their deadline
+are dropped rather than sent late. Worst-case stop latency is therefore
+one in-flight command on the wire, however deep the backlog.
+
+Dropped commands fail their future with CommandDropped.
+
+With a `requeue` hook (see flexibot.supervisor), a send that fails
+because the link is down goes back into the heap in its old place instead
+of failing, and pause()/resume() hold everything while the link is
+switched. Deadlines keep running meanwhile, so motion that waited too long
+is still dropped as expired; stops have no deadline and are never lost.
+"""
+import heapq
+import itertools
+import re
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from flexibot import log
+from flexibot.latency import percentile
+from flexibot.pose import MOTOR_NUMBERS, Pose
+
+PRIO_STOP = 0
+PRIO_MODE = 1
+PRIO_MOTION = 2
+PRIO_TUNING = 3
+PRIORITY_NAMES = {PRIO_STOP: "stop", PRIO_MODE: "mode", PRIO_MOTION: "motion", PRIO_TUNING: "tuning"}
+
+# Seconds a command may wait in the queue; None = no deadline
+DEFAULT_DEADLINES = {PRIO_STOP: None, PRIO_MODE: 5.0, PRIO_MOTION: 1.0, PRIO_TUNING: None}
+
+_MODE_PREFIXES = ("SET_MODE", "START_", "STAND_UP", "SIT_DOWN", "ELONGATE", "RETRACT", "CALIBRATE")
+_MOTION_PREFIXES = ("ROTATE_", "POSE:", "BATCH:", "HB:")
+_TARGET_RE = re.compile(r"M\d+|BODY\d+")
+
+
+class CommandDropped(Exception):
+    """A queued command was not sent (expired, superseded by a stop, or shutdown)."""
+
+    def __init__(self, reason, command):
+        super().__init__(f"{reason}: {command}")
+        self.reason = reason
+        self.command = command
+
+
+def classify(command: str) -> int:
+    if command.startswith("STOP_"):
+        return PRIO_STOP
+    if command.startswith("POSE:"):
+        pose = Pose.from_command(command)
+        if pose.targets and all(pulse == 0 for pulse, _ in pose.targets.values()):
+            return PRIO_STOP
+        return PRIO_MOTION
+    if command.startswith("BATCH:"):
+        return min((classify(c) for c in command[6:].split(";") if c), default=PRIO_MOTION)
+    if command.startswith(_MODE_PREFIXES):
+        return PRIO_MODE
+    if command.startswith(_MOTION_PREFIXES):
+        return PRIO_MOTION
+    return PRIO_TUNING
+
+
+def command_targets(command: str):
+    """Motor numbers a command acts on, or None for 'all / unknown'."""
+    if command.startswith("POSE:"):
+        return frozenset(Pose.from_command(command).targets)
+    if command.startswith("BATCH:"):
+        targets = set()
+        for part in filter(None, command[6:].split(";")):
+            t = command_targets(part)
+            if t is None:
+                return None
+            targets |= t
+        return frozenset(targets)
+    names = _TARGET_RE.findall(command.split(":", 1)[0])
+    if not names:
+        return None  # STOP_MOTORS, STOP_GAIT, ...
+    return frozenset(MOTOR_NUMBERS[n] for n in names if n in MOTOR_NUMBERS)
+
+
+class _Item:
+    __slots__ = ("priority", "order", "command", "deadline", "t_submit", "future", "targets", "send",
+                 "attempts")
+
+    def __init__(self, priority, order, command, deadline, future, send=None):
+        self.send = send
+        self.attempts = 0
+        self.priority = priority
+        self.order = order
+        self.command = command
+        self.deadline = deadline
+        self.t_submit = time.monotonic()
+        self.future = future
+        self.targets = command_targets(command) if priority <= PRIO_MOTION else None
+
+    def __lt__(self, other):
+        return (self.priority, self.order) < (other.priority, other.order)
+
+
+class CommandScheduler:
+    def __init__(self, link, send_coro, max_in_flight=1, deadlines=None, history=200, requeue=None):
+        """
+        `send_coro(command)` is the coroutine that actually sends (it runs
+        on `link`, a LinkLoop); `deadlines` overrides DEFAULT_DEADLINES.
+        `requeue(exc, command)` returning True keeps a command whose send
+        raised `exc` queued for another try.
+        """
+        self.link = link
+        self.send_coro = send_coro
+        self.max_in_flight = max_in_flight
+        self.deadlines = dict(DEFAULT_DEADLINES, **(deadlines or {}))
+        self.requeue = requeue
+        self._heap = []
+        self._order = itertools.count()
+        self._in_flight = 0
+        self._closed = False
+        self._paused = False
+        self.counters = {"submitted": 0, "sent": 0, "failed": 0, "expired": 0,
+                         "superseded": 0, "closed": 0, "requeued": 0}
+        self.stop_waits = deque(maxlen=history)  # seconds each stop spent queued
+
+    # ----------------------------------------------------------------
+    # Any thread
+    # ----------------------------------------------------------------
+    def submit(self, command: str, priority: int = None, deadline_s: float = None, send=None) -> Future:
+        """
+        Queue a command; the future resolves to the transport's result.
+        `send` replaces send_coro for this one command.
+        """
+        fut = Future()
+        if priority is None:
+            priority = classify(command)
+        if deadline_s is None:
+            deadline_s = self.deadlines.get(priority)
+        deadline = time.monotonic() + deadline_s if deadline_s is not None else None
+        item = _Item(priority, next(self._order), command, deadline, fut, send)
+        self.link.call_soon(self._push, item)
+        return fut
+
+    def queue_depth(self) -> int:
+        return len(self._heap)
+
+    def in_flight(self) -> int:
+        return self._in_flight
+
+    def stats(self) -> dict:
+        out = dict(self.counters)
+        out["queued"] = len(self._heap)
+        waits = sorted(self.stop_waits)
+        if waits:
+            out["stop_wait_p50_ms"] = 1000.0 * percentile(waits, 50)
+            out["stop_wait_max_ms"] = 1000.0 * waits[-1]
+        return out
+
+    def close(self):
+        """Fail everything still queued; nothing new is accepted."""
+        self.link.call_soon(self._drain)
+
+    def pause(self):
+        """Hold every command (stops too) until resume(), e.g. while no link is up."""
+        self._on_loop(self._set_paused, True)
+
+    def resume(self):
+        self._on_loop(self._set_paused, False)
+
+    def _on_loop(self, fn, *args):
+        if self.link.in_loop():
+            fn(*args)
+        else:
+            self.link.call_soon(fn, *args)
+
+    @property
+    def paused(self) -> bool:
+        return self._paused
+
+    # ----------------------------------------------------------------
+    # Link loop only
+    # ----------------------------------------------------------------
+    def _push(self, item):
+        if self._closed:
+            self._drop(item, "closed")
+            return
+        self.counters["submitted"] += 1
+        if item.priority == PRIO_STOP:
+            self._supersede(item.targets)
+        heapq.heappush(self._heap, item)
+        if item.deadline is not None:
+            self.link.loop.call_later(item.deadline - time.monotonic(), self._expire)
+        self._pump()
+
+    def _set_paused(self, paused):
+        self._paused = paused
+        if not paused:
+            self._pump()
+
+    def _pump(self):
+        if self._paused:
+            return
+        while self._heap:
+            head = self._heap[0]
+            if self._in_flight >= self.max_in_flight and head.priority != PRIO_STOP:
+                return
+            item = heapq.heappop(self._heap)
+            if item.deadline is not None and time.monotonic() > item.deadline:
+                self._drop(item, "expired")
+                continue
+            if item.attempts or item.future.set_running_or_notify_cancel():
+                if item.priority == PRIO_STOP and not item.attempts:
+                    self.stop_waits.append(time.monotonic() - item.t_submit)
+                self._in_flight += 1
+                self.link.loop.create_task(self._send(item))
+
+    async def _send(self, item):
+        item.attempts += 1
+        try:
+            result = await (item.send or self.send_coro)(item.command)
+        except Exception as e:
+            if self.requeue is not None and not self._closed and self.requeue(e, item.command):
+                self.counters["requeued"] += 1
+                log.debug("[Scheduler] %s -> requeued %s", e, item.command)
+                heapq.heappush(self._heap, item)
+                return
+            self.counters["failed"] += 1
+            item.future.set_exception(e)
+        else:
+            self.counters["sent"] += 1
+            item.future.set_result(result)
+        finally:
+            self._in_flight -= 1
+            self._pump()
+
+    def _supersede(self, stop_targets):
+        """Drop queued motion for the motors a stop is about to stop."""
+        keep = []
+        for item in self._heap:
+            if item.priority == PRIO_MOTION and (
+                    stop_targets is None or item.targets is None or item.targets & stop_targets):
+                self._drop(item, "superseded")
+            else:
+                keep.append(item)
+        if len(keep) != len(self._heap):
+            heapq.heapify(keep)
+            self._heap = keep
+
+    def _expire(self):
+        now = time.monotonic()
+        keep = []
+        for item in self._heap:
+            if item.deadline is not None and now > item.deadline:
+                self._drop(item, "expired")
+            else:
+                keep.append(item)
+        if len(keep) != len(self._heap):
+            heapq.heapify(keep)
+            self._heap = keep
+
+    def _drain(self):
+        self._closed = True
+        for item in self._heap:
+            self._drop(item, "closed")
+        self._heap = []
+
+    def _drop(self, item, reason):
+        self.counters[reason] += 1
+        log.debug("[Scheduler] %s -> dropped %s", reason, item.command)
+        # A requeued command's future is already running
+        if item.attempts or item.future.set_running_or_notify_cancel():
+            item.future.set_exception(CommandDropped(reason, item.command))
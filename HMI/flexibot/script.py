@@ -0,0 +1,359 @@
+"""
+Motion scripts: timed command sequences run against a RobotBackend.
+
+One step per line, `#` starts a comment:
+
+    timeout 5000                 # default for the waits below (ms)
+    SET_MODE:INDIVIDUAL
+    ROTATE_M1_CW:600 ack         # send, then wait for the robot's ACK
+    wait 250                     # ms after the previous step was due
+    @1000 ROTATE_M2_CCW:400      # 1000 ms after the script started
+    wait stop M1                 # motor auto-stopped / stopped ([Motor] line)
+    SET_MODE:GAIT
+    wait fsm GAIT 2000           # [FSM] => STATE_GAIT
+    START_CRAWLING
+    wait line "[Crawl] Step3"    # any robot output containing the text
+    repeat 3
+        STAND_UP ack
+        wait 1500
+        SIT_DOWN ack
+        wait 1500
+    end
+    STOP_GAIT
+
+Commands are checked against the firmware's vocabulary when the script is
+loaded, so a typo fails before anything moves. Waits on robot output only
+see lines that arrived after the previous send, and a wait for an FSM
+state the robot is already in returns at once.
+
+Timing runs on time.perf_counter(): plain `wait` steps are measured from
+when the previous step was due, not when it finished, so lateness does
+not add up. Against a simulator, times are on its virtual clock: a
+lockstep one (SimTransport(speed=None)) is advanced by the waits, and a
+minute of motion runs in milliseconds; a free-running one at `speed` has
+each wait take 1/speed of its length in wall time.
+
+    steps = load("crawl_test.motion")
+    report = ScriptRunner(backend, steps).run()
+    print(report.summary())
+"""
+import re
+import shlex
+import threading
+import time
+from collections import deque, namedtuple
+from concurrent.futures import TimeoutError as FutureTimeout
+
+from flexibot import log
+from flexibot.registry import MOTOR_COMMANDS, NUM_LIMBS
+from flexibot.serial_events import FsmEvent, MotorStopEvent, parse_line
+
+DEFAULT_TIMEOUT_MS = 5000
+SPIN_S = 0.002          # busy-wait the last bit of a timed wait
+SIM_STEP_MS = 10        # virtual time per poll while waiting on a lockstep simulator
+SIM_ACK_STEP_MS = 1     # ... and while waiting for an ACK still going out of its serial buffer
+HISTORY = 4096          # robot output lines kept for waits
+
+# What processCommand() in MorphBotV2.ino accepts; per-motor names come from the registry
+_ROTATES = "|".join(name for name, c in MOTOR_COMMANDS.items() if c.kind == "rotate")
+_STOPS = "|".join(name for name, c in MOTOR_COMMANDS.items() if c.kind != "rotate")
+_LIMBS = "|".join(str(limb) for limb in range(1, NUM_LIMBS + 1))
+COMMAND_RE = re.compile(
+    rf"(({_ROTATES})(:\d+(_\d+)?)?"
+    rf"|{_STOPS}|STOP_MOTORS|STOP_GAIT"
+    r"|SET_MODE:(INDIVIDUAL|BODY|GAIT)"
+    r"|SET_SPEED:\d+"
+    r"|START_(CRAWLING|WALKING|FASTCRAWL)"
+    r"|STAND_UP|SIT_DOWN|ELONGATE|RETRACT"
+    rf"|CALIBRATE_LIMB:({_LIMBS})|CALIBRATE_ALL_LIMBS|SET_NEUTRAL:\d+=\d+(,\d+=\d+)*|GET_NEUTRAL"
+    r"|POSE:\S+|BATCH:\S+|HB:\d+)"
+)
+
+# op: send | at | sleep | fsm | line | stop; arg is the command, ms, state, text or motor
+Step = namedtuple("Step", "lineno op arg ack timeout_ms source")
+# Times are ms since the script started; done_ms is when a wait or an acked send finished
+StepResult = namedtuple("StepResult", "step planned_ms actual_ms late_ms done_ms result")
+
+
+class ScriptError(Exception):
+    def __init__(self, message, lineno=None):
+        super().__init__(f"line {lineno}: {message}" if lineno else message)
+        self.lineno = lineno
+
+
+# --------------------------------------------------------------------
+# Parsing
+# --------------------------------------------------------------------
+def load(path):
+    with open(path) as f:
+        return parse(f.read())
+
+
+def parse(text: str) -> list:
+    """Script text -> flat list of Steps (repeat blocks unrolled)."""
+    steps, stack = [], []
+    timeout_ms = DEFAULT_TIMEOUT_MS
+    for lineno, raw in enumerate(text.splitlines(), 1):
+        try:
+            words = shlex.split(raw, comments=True)
+        except ValueError as e:
+            raise ScriptError(str(e), lineno)
+        if not words:
+            continue
+        head, rest = words[0], words[1:]
+        source = raw.strip()
+
+        if head == "repeat":
+            count = _int(rest, 0, lineno, "repeat count")
+            stack.append((lineno, count, steps))
+            steps = []
+        elif head == "end":
+            if not stack:
+                raise ScriptError("'end' without 'repeat'", lineno)
+            _, count, outer = stack.pop()
+            outer.extend(steps * count)
+            steps = outer
+        elif head == "timeout":
+            timeout_ms = _int(rest, 0, lineno, "timeout")
+        elif head == "wait":
+            steps.append(_parse_wait(rest, lineno, timeout_ms, source))
+        elif head.startswith("@"):
+            if stack:
+                raise ScriptError("'@' times are not allowed inside repeat blocks", lineno)
+            at_ms = _int([head[1:]], 0, lineno, "@ time")
+            steps.append(Step(lineno, "at", at_ms, False, timeout_ms, source))
+            steps.append(_parse_send(rest, lineno, timeout_ms, source))
+        else:
+            steps.append(_parse_send(words, lineno, timeout_ms, source))
+    if stack:
+        raise ScriptError("'repeat' without 'end'", stack[-1][0])
+    return steps
+
+
+def _parse_send(words, lineno, timeout_ms, source):
+    if not words:
+        raise ScriptError("missing command", lineno)
+    command, flags = words[0], words[1:]
+    if not COMMAND_RE.fullmatch(command):
+        raise ScriptError(f"unknown command {command!r}", lineno)
+    if flags not in ([], ["ack"]):
+        raise ScriptError(f"unexpected {' '.join(flags)!r} after {command}", lineno)
+    return Step(lineno, "send", command, bool(flags), timeout_ms, source)
+
+
+def _parse_wait(words, lineno, timeout_ms, source):
+    if not words:
+        raise ScriptError("wait what?", lineno)
+    kind = words[0]
+    if kind == "fsm":
+        if len(words) < 2:
+            raise ScriptError("wait fsm needs a state", lineno)
+        return Step(lineno, "fsm", words[1].upper(), False, _opt_timeout(words, 2, lineno, timeout_ms), source)
+    if kind == "line":
+        if len(words) < 2:
+            raise ScriptError("wait line needs the text to look for", lineno)
+        return Step(lineno, "line", words[1], False, _opt_timeout(words, 2, lineno, timeout_ms), source)
+    if kind == "stop":
+        if len(words) < 2 or not re.fullmatch(r"M\d+", words[1]):
+            raise ScriptError("wait stop needs a motor (M1..M10)", lineno)
+        # [Motor] lines number motors from 0
+        motor = int(words[1][1:]) - 1
+        return Step(lineno, "stop", motor, False, _opt_timeout(words, 2, lineno, timeout_ms), source)
+    if len(words) != 1:
+        raise ScriptError(f"unexpected {' '.join(words[1:])!r}", lineno)
+    return Step(lineno, "sleep", _int(words, 0, lineno, "wait"), False, timeout_ms, source)
+
+
+def _opt_timeout(words, i, lineno, default):
+    if len(words) > i + 1:
+        raise ScriptError(f"unexpected {' '.join(words[i + 1:])!r}", lineno)
+    return _int(words, i, lineno, "timeout") if len(words) > i else default
+
+
+def _int(words, i, lineno, what):
+    try:
+        value = int(words[i])
+    except (IndexError, ValueError):
+        raise ScriptError(f"{what} must be a whole number", lineno) from None
+    if value < 0:
+        raise ScriptError(f"{what} must not be negative", lineno)
+    return value
+
+
+# --------------------------------------------------------------------
+# Running
+# --------------------------------------------------------------------
+class RunReport:
+    def __init__(self, results, elapsed_ms, virtual):
+        self.results = results
+        self.elapsed_ms = elapsed_ms
+        self.virtual = virtual
+
+    @property
+    def max_late_ms(self):
+        return max((r.late_ms for r in self.results), default=0.0)
+
+    def summary(self) -> str:
+        clock = "virtual" if self.virtual else "wall"
+        return (f"{len(self.results)} steps in {self.elapsed_ms:.1f} ms ({clock}), "
+                f"max lateness {self.max_late_ms:.2f} ms")
+
+
+class ScriptRunner:
+    def __init__(self, backend, steps, stop_on_error=True):
+        self.backend = backend
+        self.steps = steps
+        self.stop_on_error = stop_on_error
+        transport = backend.transport
+        # Script times are on the simulator's clock, whatever its speed
+        self.clock = transport if transport.name == "sim" else None
+        self.speed = (transport.speed or 1.0) if self.clock is not None else 1.0
+        # SimTransport(speed=None): nothing happens on the robot until we advance its clock
+        self.sim = self.clock if self.clock is not None and transport.speed is None else None
+        self._cond = threading.Condition()
+        self._lines = deque(maxlen=HISTORY)
+        self._seen = 0     # lines received so far
+        self._cursor = 0   # waits look at lines from here on (reset on every send)
+        self._t0 = None
+
+    # ----------------------------------------------------------------
+    def run(self) -> RunReport:
+        self.backend.add_line_listener(self._on_line)
+        results = []
+        try:
+            self._t0 = self._now_s()
+            planned = 0.0
+            for step in self.steps:
+                if step.op == "at":
+                    planned = float(step.arg)
+                    self._sleep_until(planned)
+                    continue
+                if step.op == "sleep":
+                    planned += step.arg
+                    self._sleep_until(planned)
+                    actual = self._elapsed_ms()
+                    results.append(StepResult(step, planned, actual, max(0.0, actual - planned), actual, None))
+                    continue
+                actual = self._elapsed_ms()
+                value = self._run_step(step)
+                done = self._elapsed_ms()
+                results.append(StepResult(step, planned, actual, max(0.0, actual - planned), done, value))
+                if step.ack or step.op != "send":
+                    planned = done  # an unknown-length wait restarts the timeline
+        except Exception as e:
+            if self.stop_on_error:
+                self.backend.send_command("STOP_MOTORS", priority=0)
+            print(f"[Script] failed: {e}")
+            raise
+        finally:
+            self.backend.remove_line_listener(self._on_line)
+        report = RunReport(results, self._elapsed_ms(), self.clock is not None)
+        print(f"[Script] {report.summary()}")
+        return report
+
+    def _run_step(self, step):
+        log.debug("[Script] line %d: %s", step.lineno, step.source)
+        if step.op == "send":
+            with self._cond:
+                self._cursor = self._seen
+            fut = self.backend.send_command(step.arg, ack=step.ack)
+            if step.ack:
+                return self._wait_future(fut, step)
+            return None
+        if step.op == "fsm":
+            if self.backend.status.latest("fsm") == step.arg:
+                return step.arg
+            match = lambda line, ev: isinstance(ev, FsmEvent) and ev.state == step.arg
+        elif step.op == "line":
+            match = lambda line, ev: step.arg in line
+        else:  # stop
+            match = lambda line, ev: isinstance(ev, MotorStopEvent) and ev.motor == step.arg
+        return self._wait_line(match, step)
+
+    # ----------------------------------------------------------------
+    # Waiting
+    # ----------------------------------------------------------------
+    def _on_line(self, line):
+        with self._cond:
+            self._lines.append(line)
+            self._seen += 1
+            self._cond.notify_all()
+
+    def _find(self, match):
+        """First line since the last send that matches; call with the lock held."""
+        first = self._seen - len(self._lines)
+        start = max(self._cursor, first)
+        for i in range(start - first, len(self._lines)):
+            line = self._lines[i]
+            if match(line, parse_line(line)):
+                self._cursor = first + i + 1
+                return line
+        self._cursor = self._seen
+        return None
+
+    def _wait_line(self, match, step):
+        deadline = self._elapsed_ms() + step.timeout_ms
+        while True:
+            with self._cond:
+                line = self._find(match)
+                if line is not None:
+                    return line
+                remaining = deadline - self._elapsed_ms()
+                if remaining <= 0:
+                    raise ScriptError(f"timed out after {step.timeout_ms} ms: {step.source}", step.lineno)
+                if self.sim is None:
+                    self._cond.wait(self._wall_s(remaining))
+                    continue
+            self._advance_sim(min(SIM_STEP_MS, remaining))
+
+    def _wait_future(self, fut, step):
+        deadline = self._elapsed_ms() + step.timeout_ms
+        while not fut.done():
+            remaining = deadline - self._elapsed_ms()
+            if remaining <= 0:
+                raise ScriptError(f"no ACK after {step.timeout_ms} ms: {step.source}", step.lineno)
+            if self.sim is None:
+                try:
+                    return fut.result(self._wall_s(remaining))
+                except FutureTimeout:
+                    continue
+            # Calibration delays, or the ACK itself, need virtual time to pass
+            self._advance_sim(min(SIM_ACK_STEP_MS, remaining))
+        return fut.result()
+
+    # ----------------------------------------------------------------
+    # Clock
+    # ----------------------------------------------------------------
+    def _now_s(self):
+        if self.clock is not None:
+            return self.clock.virtual_us() / 1e6
+        return time.perf_counter()
+
+    def _wall_s(self, ms):
+        """Wall seconds for `ms` of script time."""
+        return ms / 1000.0 / self.speed
+
+    def _elapsed_ms(self):
+        return (self._now_s() - self._t0) * 1000.0
+
+    def _advance_sim(self, ms):
+        self.backend.link.submit(self.sim.advance(ms)).result()
+
+    def _sleep_until(self, planned_ms):
+        remaining = planned_ms - self._elapsed_ms()
+        if remaining <= 0:
+            return
+        if self.sim is not None:
+            self._advance_sim(remaining)
+            return
+        if self._wall_s(remaining) > SPIN_S:
+            time.sleep(self._wall_s(remaining) - SPIN_S)
+        while self._elapsed_ms() < planned_ms:
+            pass
+
+
+def run(backend, script, **opts) -> RunReport:
+    """Run a script given as a path, script text or list of Steps."""
+    if isinstance(script, str):
+        script = parse(script) if "\n" in script else load(script)
+    return ScriptRunner(backend, script, **opts).run()
@@ -0,0 +1,192 @@
+"""
+Serial reader that turns firmware output into typed events.
+
+The reader thread blocks in ser.read() (woken by data or the port timeout,
+no polling sleep), reassembles lines in one reusable bytearray and parses
+each line through a precompiled dispatch table:
+
+    STATUS:<text>                    -> StatusEvent
+    [FSM] => STATE_<name>            -> FsmEvent
+    [Timer] Motor N auto-stopped     -> MotorStopEvent(auto=True)
+    [stopMotor] Motor N manually ... -> MotorStopEvent(auto=False)
+    [Cmd] <text>                     -> CommandEvent
+    [ERROR] <text>                   -> ErrorEvent
+    [Calib] <kind> 1=1450,2=1452     -> NeutralEvent("CALIBRATED", {1: 1450, 2: 1452})
+    ACK:<id>:<t_us>                  -> AckEvent
+    anything else                    -> LineEvent
+
+Subscribers get events on the reader thread and must not block it.
+"""
+import re
+import threading
+import time
+from collections import namedtuple
+
+import serial
+
+StatusEvent = namedtuple("StatusEvent", "t text")
+FsmEvent = namedtuple("FsmEvent", "t state")
+MotorStopEvent = namedtuple("MotorStopEvent", "t motor auto")
+CommandEvent = namedtuple("CommandEvent", "t text")
+ErrorEvent = namedtuple("ErrorEvent", "t text")
+AckEvent = namedtuple("AckEvent", "t seq robot_us")
+LineEvent = namedtuple("LineEvent", "t text")
+LinkEvent = namedtuple("LinkEvent", "t up reason")
+# kind: CALIBRATED | LOADED (SET_NEUTRAL echo) | CURRENT (GET_NEUTRAL); neutrals: {motor: pulse us}
+NeutralEvent = namedtuple("NeutralEvent", "t kind neutrals")
+
+
+# --------------------------------------------------------------------
+# Dispatch table: (line prefix, compiled pattern, builder(t, match))
+# --------------------------------------------------------------------
+_DISPATCH = (
+    ("ACK:", re.compile(r"ACK:(\d+):(\d+)"),
+     lambda t, m: AckEvent(t, int(m.group(1)), int(m.group(2)))),
+    ("STATUS:", re.compile(r"STATUS:\s*(.*)"),
+     lambda t, m: StatusEvent(t, m.group(1).strip())),
+    ("[FSM]", re.compile(r"\[FSM\] => STATE_(\w+)"),
+     lambda t, m: FsmEvent(t, m.group(1))),
+    ("[Timer]", re.compile(r"\[Timer\] Motor (\d+) auto-stopped"),
+     lambda t, m: MotorStopEvent(t, int(m.group(1)), True)),
+    ("[stopMotor]", re.compile(r"\[stopMotor\] Motor (\d+) manually stopped"),
+     lambda t, m: MotorStopEvent(t, int(m.group(1)), False)),
+    ("[Cmd]", re.compile(r"\[Cmd\]\s*(.*)"),
+     lambda t, m: CommandEvent(t, m.group(1))),
+    ("[ERROR]", re.compile(r"\[ERROR\]\s*(.*)"),
+     lambda t, m: ErrorEvent(t, m.group(1))),
+    ("[Calib]", re.compile(r"\[Calib\] (CALIBRATED|LOADED|CURRENT)\s*((?:\d+=\d+,?)*)$"),
+     lambda t, m: NeutralEvent(t, m.group(1), {int(k): int(v) for k, v in
+                                               (item.split("=") for item in m.group(2).split(",") if item)})),
+)
+
+
+def parse_line(line: str, t: float = None):
+    """Parse one firmware line into an event (LineEvent if nothing matches)."""
+    if t is None:
+        t = time.monotonic()
+    for prefix, pattern, build in _DISPATCH:
+        if line.startswith(prefix):
+            m = pattern.match(line)
+            if m:
+                return build(t, m)
+            break
+    return LineEvent(t, line)
+
+
+class LineFramer:
+    """Reassembles newline-terminated lines from arbitrary read chunks."""
+
+    def __init__(self, max_line=1024):
+        self.buf = bytearray()
+        self.max_line = max_line
+
+    def feed(self, data: bytes):
+        """Append data and return the list of complete lines (bytes, no EOL)."""
+        self.buf += data
+        lines = []
+        start = 0
+        while True:
+            nl = self.buf.find(b"\n", start)
+            if nl < 0:
+                break
+            lines.append(bytes(self.buf[start:nl]).rstrip(b"\r"))
+            start = nl + 1
+        if start:
+            del self.buf[:start]
+        if len(self.buf) > self.max_line:
+            # Runaway line without a newline (binary noise) - keep only the tail
+            del self.buf[:-self.max_line]
+        return lines
+
+
+class SerialReader:
+    """
+    Background reader for a serial port.
+
+    `get_port` is called to obtain the current serial object, so the reader
+    keeps working after the port is reopened instead of exiting on the
+    first SerialException.
+    """
+
+    def __init__(self, get_port, retry_interval=0.5):
+        self.get_port = get_port
+        self.retry_interval = retry_interval
+        self.framer = LineFramer()
+        self._subscribers = []
+        self.on_raw_line = None  # optional tap, called with every line before parsing
+        self._running = False
+        self._thread = None
+        self.wakeups = 0
+        self.lines = 0
+        self.bytes_in = 0
+
+    def subscribe(self, callback, *event_types):
+        """Call `callback(event)` for the given event types (all if none given)."""
+        self._subscribers.append((callback, event_types or None))
+
+    def unsubscribe(self, callback):
+        self._subscribers = [(cb, ty) for cb, ty in self._subscribers if cb is not callback]
+
+    def publish(self, event):
+        for callback, types in self._subscribers:
+            if types is None or type(event) in types:
+                try:
+                    callback(event)
+                except Exception as e:
+                    print(f"[SerialReader] subscriber error: {e}")
+
+    def start(self):
+        if self._thread is None:
+            self._running = True
+            self._thread = threading.Thread(target=self._run, name="serial-reader", daemon=True)
+            self._thread.start()
+            print("[SerialReader] started")
+
+    def stop(self):
+        self._running = False
+
+    def join(self, timeout=None):
+        """Wait for the thread to exit (it notices stop() within one port timeout)."""
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    # ----------------------------------------------------------------
+    def _run(self):
+        link_up = False
+        while self._running:
+            ser = self.get_port()
+            if ser is None or not ser.is_open:
+                if link_up:
+                    link_up = False
+                    self.publish(LinkEvent(time.monotonic(), False, "port closed"))
+                time.sleep(self.retry_interval)
+                continue
+            if not link_up:
+                link_up = True
+                self.publish(LinkEvent(time.monotonic(), True, ""))
+            try:
+                # Blocks until at least one byte arrives or the port timeout expires
+                data = ser.read(max(1, ser.in_waiting))
+            except (serial.SerialException, OSError, TypeError, AttributeError) as e:
+                # TypeError/AttributeError: pyserial reading a port that was closed underneath it
+                if not self._running:
+                    return
+                link_up = False
+                self.framer.buf.clear()
+                self.publish(LinkEvent(time.monotonic(), False, str(e)))
+                time.sleep(self.retry_interval)
+                continue
+            self.wakeups += 1
+            if not data:
+                continue
+            self.bytes_in += len(data)
+            now = time.monotonic()
+            for raw in self.framer.feed(data):
+                line = raw.decode("utf-8", errors="replace").strip()
+                if not line:
+                    continue
+                self.lines += 1
+                if self.on_raw_line:
+                    self.on_raw_line(line)
+                self.publish(parse_line(line, now))
@@ -0,0 +1,773 @@
+"""
+Deterministic simulator of the MorphBotV2 firmware on a virtual clock.
+
+MorphBotSim models what the board does with the bytes it receives:
+serialEvent() framing (ASCII lines and 9-byte binary frames), the
+processCommand() grammar, the mainState FSM, the motorTasks auto-stop
+timers, GaitControl's step sequencing and Calibration's blocking delays.
+It prints the same lines the firmware prints, to `on_line`.
+
+Time only moves when the simulator is told to (advance() / run_until()).
+Idle loop() passes are skipped: the simulator jumps straight to the next
+loop that can do something (a timer expiry, the next gait step, pending
+input). So a one-minute crawl replays in well under a second, and the
+same inputs at the same virtual times always give the same output.
+
+    sim = MorphBotSim(on_line=print)
+    sim.boot()
+    sim.write(b"SET_MODE:GAIT\\n")
+    sim.write(b"START_CRAWLING\\n")
+    sim.advance(60000)
+
+SimTransport puts a MorphBotSim behind RobotBackend like any other link:
+
+    backend = RobotBackend(transport=SimTransport(speed=20))  # 20x real time
+    backend = RobotBackend(transport=SimTransport(speed=None))
+    backend.link.submit(backend.transport.advance(60000))     # lockstep
+
+With `speed` the virtual clock follows the wall clock times `speed`;
+with speed=None every command is processed as soon as it is sent and the
+clock otherwise only moves through advance(), which makes whole backend
+sessions reproducible.
+"""
+import asyncio
+import re
+import time
+
+from flexibot import binary_protocol
+from flexibot.registry import (DEFAULT_NEUTRAL_PULSE, MOTOR_COMMANDS, NEUTRAL_PULSE_MAX, NEUTRAL_PULSE_MIN,
+                               NUM_LIMBS, NUM_MOTORS)
+from flexibot.transports import Transport, TransportError
+
+# MorphBotV2.ino / limb_control.h
+PULSE_MIN = 500         # CW max
+PULSE_MAX = 2500        # CCW max
+CALIBRATION_NEUTRAL = 1450  # Calibration::calibrationNeutral
+GAIT_PULSE = 700        # GaitControl pulls tendons with rotateClockwise(700)
+DEFAULT_DURATION = 200
+PULSES_FOR_FULL_MOV = 3
+PCA9685_FREQ = 400
+PWM_PERIOD_US = 2500
+STAND_UP_MS = 4250
+SIT_DOWN_MS = 3500
+GAIT_STEP_MS = 1500
+
+# WebServerControl.h: the longest command any link takes, plus its "@255" ack tag
+MAX_COMMAND_LEN = 240
+ACK_TAG_MAX = 4
+SERIAL_LINE_MAX = MAX_COMMAND_LEN + ACK_TAG_MAX + 1  # serialEvent() also keeps a "\r"
+
+# Cost model: one loop() pass, and each byte printed over USB serial
+LOOP_US = 1000
+TX_US_PER_BYTE = 1
+
+MAIN_STATES = ("IDLE", "INDIVIDUAL", "BODY", "GAIT", "STAND_UP", "SIT_DOWN", "ELONGATE", "RETRACT")
+GAIT_STATES = ("STOP", "CRAWLING", "FASTCRAWL", "WALKING")
+
+_TO_INT_RE = re.compile(r"\s*([+-]?\d+)")
+
+# updateCrawling(): (log line, limb, bend down?)
+CRAWL_STEPS = tuple(
+    (f"[Crawl] Step{i}: Limb{i // 2 + 1} bend {'up' if i % 2 else 'down'}", i // 2, not i % 2)
+    for i in range(8)
+)
+
+# updateFastCrawl(): (log line, action per limb) with C=compress, A=anchor, S=stop
+FASTCRAWL_STEPS = (
+    ("[FastCrawl] Step0: compress L1, anchor L2, stop L3,4", "CASS"),
+    ("[FastCrawl] Step1: stop L1, anchor L2, compress L3, stop L4", "SACS"),
+    ("[FastCrawl] Step2: anchor L1, stop L2, compress L3, stop L4", "ASCS"),
+    ("[FastCrawl] Step3: anchor L1, stop L2, stop L3, compress L4", "ASSC"),
+    ("[FastCrawl] Step4: compress L1, anchor L2, anchor L3, anchor L4", "CAAA"),
+    ("[FastCrawl] Step5: anchor L1, compress L2, anchor L3, anchor L4", "ACAA"),
+    ("[FastCrawl] Step6: anchor L1, anchor L2, compress L3, anchor L4", "AACA"),
+    ("[FastCrawl] Step7: anchor L1, anchor L2, anchor L3, compress L4", "AAAC"),
+)
+
+_BIN_MODES = {1: "INDIVIDUAL", 2: "BODY", 3: "GAIT"}
+_BIN_GAITS = {0: "STOP", 1: "CRAWLING", 2: "WALKING", 3: "FASTCRAWL"}
+
+
+def to_int(text: str) -> int:
+    """Arduino String::toInt(): leading integer, 0 if there is none."""
+    m = _TO_INT_RE.match(text)
+    return int(m.group(1)) if m else 0
+
+
+def pwm_ticks(pulse: int) -> int:
+    ticks = pulse * 4096 // PWM_PERIOD_US
+    return 4094 if ticks > 4095 else ticks
+
+
+class VirtualClock:
+    """micros() / millis() for the simulator; only moves when advanced."""
+
+    def __init__(self, us=0):
+        self.us = us
+
+    def micros(self) -> int:
+        return self.us
+
+    def millis(self) -> int:
+        return self.us // 1000
+
+    def advance(self, us):
+        self.us += int(us)
+
+    def delay(self, ms):
+        self.us += int(ms) * 1000
+
+
+class MotorTask:
+    __slots__ = ("active", "end_ms")
+
+    def __init__(self):
+        self.active = False
+        self.end_ms = 0
+
+
+# ====================================================================
+class MorphBotSim:
+    """
+    The firmware's state and loop(). Everything printed goes to
+    on_line(text); printing costs `tx_us_per_byte` of virtual time, as
+    the Serial.print() calls do on the board. With echo_pwm=False the
+    per-channel "Channel N => Pulse" lines are skipped, which keeps long
+    runs in GAIT/STOP (stopAllLimbs() every pass) from flooding the log.
+    """
+
+    def __init__(self, on_line=None, clock: VirtualClock = None, loop_us=LOOP_US,
+                 tx_us_per_byte=TX_US_PER_BYTE, echo_pwm=True):
+        self.on_line = on_line
+        self.clock = clock or VirtualClock()
+        self.loop_us = loop_us
+        self.tx_us_per_byte = tx_us_per_byte
+        self.echo_pwm = echo_pwm
+        self.pulses = [0] * NUM_MOTORS  # what the PCA9685 outputs; 0 = never set
+        self.neutrals = [DEFAULT_NEUTRAL_PULSE] * NUM_MOTORS  # LimbControl::neutralPulse
+        self.tasks = [MotorTask() for _ in range(NUM_MOTORS)]
+        self.main_state = "IDLE"
+        self.gait_state = "STOP"
+        self.booted = False
+        self.counters = {"loops": 0, "commands": 0, "frames": 0, "lines": 0}
+        self._rx = bytearray()
+        self._input = bytearray()
+        self._input_overflow = False
+        self._bin = bytearray()
+        self._started = dict.fromkeys(("STAND_UP", "SIT_DOWN", "ELONGATE", "RETRACT"), False)
+        # doElongateState() / doRetractState() keep these in function statics
+        self._move_steps = {"ELONGATE": 0, "RETRACT": 0}
+        self._move_last_ms = {"ELONGATE": 0, "RETRACT": 0}
+        self._crawl_step = self._fast_step = 0
+        self._crawl_last_ms = self._fast_last_ms = 0
+        self._busy = False  # the last pass printed something: run the next one right away
+
+    # ----------------------------------------------------------------
+    # Serial out
+    # ----------------------------------------------------------------
+    def println(self, text: str):
+        self.clock.advance((len(text.encode("utf-8")) + 2) * self.tx_us_per_byte)
+        self.counters["lines"] += 1
+        self._busy = True
+        if self.on_line is not None:
+            self.on_line(text)
+
+    # ----------------------------------------------------------------
+    # Serial in
+    # ----------------------------------------------------------------
+    def write(self, data):
+        """Bytes arriving on the serial port; str is sent as one line."""
+        if isinstance(data, str):
+            data = (data + "\n").encode("utf-8")
+        self._rx += data
+
+    @property
+    def pending(self) -> bool:
+        return bool(self._rx)
+
+    def _serial_event(self):
+        """serialEvent(): returns a completed line, or None."""
+        rx = self._rx
+        i = 0
+        line = None
+        while i < len(rx):
+            byte = rx[i]
+            i += 1
+            if self._bin or (byte == binary_protocol.SYNC and not self._input):
+                self._bin.append(byte)
+                if len(self._bin) == binary_protocol.FRAME_LEN:
+                    frame, self._bin = bytes(self._bin), bytearray()
+                    self.process_binary_frame(frame)
+                continue
+            if byte == 0x0A:
+                if self._input_overflow:
+                    self.println("[ERROR] Command too long")
+                    self._input, self._input_overflow = bytearray(), False
+                    continue
+                line, self._input = self._input.decode("utf-8", errors="replace"), bytearray()
+                break
+            if len(self._input) < SERIAL_LINE_MAX:
+                self._input.append(byte)
+            else:
+                self._input_overflow = True
+        del rx[:i]
+        return line
+
+    # ----------------------------------------------------------------
+    # setup() / loop()
+    # ----------------------------------------------------------------
+    def boot(self):
+        for i in range(NUM_MOTORS):
+            self._set_pulse(i, DEFAULT_NEUTRAL_PULSE)
+        for line in ("Configuring Access Point...", "Access Point Created!",
+                     "SSID: PortentaRobot", "Password: portentaconnect", "IP Address: 192.168.3.1",
+                     "Web Server initialized. Connect to Wi-Fi AP to control the robot."):
+            self.println(line)
+        self._set_pulse(8, DEFAULT_NEUTRAL_PULSE)  # bodyControl.init()
+        self._set_pulse(9, DEFAULT_NEUTRAL_PULSE)
+        self.println("System initialized (Wire2 + PCA9685 @ 0x40).")
+        self.println("System Initialized")
+        self.main_state = "IDLE"
+        self.booted = True
+
+    def loop(self):
+        """One loop() pass at the current virtual time."""
+        self.counters["loops"] += 1
+        self._busy = False
+        start = self.clock.us
+        line = self._serial_event()
+        if line is not None:
+            self.process_command(line)
+
+        state = self.main_state
+        if state == "GAIT":
+            self._gait_update()
+        elif state in ("STAND_UP", "SIT_DOWN"):
+            self._do_stand_sit(state)
+        elif state in ("ELONGATE", "RETRACT"):
+            self._do_elongate_retract(state)
+
+        now = self.clock.millis()
+        for i, task in enumerate(self.tasks):
+            if task.active and now >= task.end_ms:
+                self._stop_pulse(i)
+                task.active = False
+                self.println(f"[Timer] Motor {i} auto-stopped")
+        # Never less than one pass of loop() overhead
+        self.clock.us = max(self.clock.us, start + self.loop_us)
+
+    def next_wake_us(self):
+        """Virtual time of the next loop() pass that can change anything (None = never)."""
+        if self._busy or self._rx:
+            return self.clock.us
+        times = [task.end_ms * 1000 for task in self.tasks if task.active]
+        state = self.main_state
+        if state == "GAIT":
+            if self.gait_state == "CRAWLING":
+                times.append((self._crawl_last_ms + GAIT_STEP_MS) * 1000)
+            elif self.gait_state == "FASTCRAWL":
+                times.append((self._fast_last_ms + GAIT_STEP_MS) * 1000)
+            elif any(p != n for p, n in zip(self.pulses[:8], self.neutrals)):
+                return self.clock.us  # stopAllLimbs() still has work to do
+        elif state in ("ELONGATE", "RETRACT"):
+            times.append((self._move_last_ms[state] + 501) * 1000)
+        elif state in ("STAND_UP", "SIT_DOWN") and not self._started[state]:
+            return self.clock.us
+        if not times:
+            return None
+        return max(self.clock.us, min(times))
+
+    def run_until(self, t_us):
+        """Run every loop() pass that does something before virtual time t_us."""
+        while True:
+            wake = self.next_wake_us()
+            if wake is None or wake >= t_us:
+                break
+            self.clock.us = wake
+            self.loop()
+        self.clock.us = max(self.clock.us, t_us)
+
+    def advance(self, ms):
+        self.run_until(self.clock.us + int(ms * 1000))
+
+    def process_pending(self):
+        """Run loop() passes until all received input has been handled."""
+        while self._rx:
+            self.loop()
+
+    # ----------------------------------------------------------------
+    # processCommand()
+    # ----------------------------------------------------------------
+    def process_command(self, cmd: str):
+        cmd = cmd.strip()
+        self.counters["commands"] += 1
+        # Teleop heartbeats arrive many times a second; don't echo them
+        if not cmd.startswith("HB"):
+            self.println(f"[processCommand] {cmd}")
+        t0 = self.clock.micros()
+        ack_id = -1
+        at = cmd.rfind("@")
+        if at != -1:
+            ack_id = to_int(cmd[at + 1:])
+            cmd = cmd[:at]
+
+        base, colon, param = cmd.partition(":")
+        duration = DEFAULT_DURATION
+        if colon and to_int(param) > 0:
+            duration = to_int(param)
+
+        if base == "BATCH":
+            for part in param.split(";"):
+                if part:
+                    self.process_command(part)
+        elif base == "POSE":
+            self._apply_pose(param)
+        elif base == "HB":
+            if to_int(param) > 0:  # HB:0 is the supervisor's probe: no keepAlive(200)
+                self._keep_alive(to_int(param))
+        elif cmd.startswith("SET_MODE:INDIVIDUAL"):
+            self.println("[Cmd] => STATE_INDIVIDUAL")
+            self.set_state("INDIVIDUAL")
+        elif cmd.startswith("SET_MODE:BODY"):
+            self.println("[Cmd] => STATE_BODY")
+            self.set_state("BODY")
+        elif cmd.startswith("SET_MODE:GAIT"):
+            self.println("[Cmd] => STATE_GAIT")
+            self.set_gait_state("STOP")
+            self.set_state("GAIT")
+        elif cmd.startswith(("STAND_UP", "SIT_DOWN", "ELONGATE", "RETRACT")):
+            state = next(s for s in ("STAND_UP", "SIT_DOWN", "ELONGATE", "RETRACT") if cmd.startswith(s))
+            self.println(f"[Cmd] => STATE_{state}")
+            self.set_state(state)
+        elif cmd.startswith("START_CRAWLING"):
+            self._gait_command("CRAWLING", "[ERROR] Must be in STATE_GAIT for crawling")
+        elif cmd.startswith("START_WALKING"):
+            self._gait_command("WALKING", "[ERROR] Must be in STATE_GAIT for walking")
+        elif cmd.startswith("STOP_GAIT"):
+            if self.main_state == "GAIT":
+                self.set_gait_state("STOP")
+                self.println("[Cmd] Gait => STOPPED")
+            else:
+                self.println("[ERROR] Not in GAIT state")
+        elif cmd.startswith("START_FASTCRAWL"):
+            self._gait_command("FASTCRAWL", "[ERROR] Must be in STATE_GAIT for FASTCRAWL")
+        elif cmd.startswith("STOP_MOTORS"):
+            self.stop_motors()
+        elif base in MOTOR_COMMANDS:  # command_table.h's findMotorCommand()
+            self._motor_command(MOTOR_COMMANDS[base], duration)
+        elif base == "CALIBRATE_LIMB":
+            limb = to_int(param) - 1
+            self.calibrate_limb(limb)
+            if 0 <= limb < NUM_LIMBS:
+                self._report_neutral("CALIBRATED", limb * 2, 2)
+        elif base == "CALIBRATE_ALL_LIMBS":
+            self.calibrate_all_limbs()
+            self._report_neutral("CALIBRATED", 0, NUM_LIMBS * 2)
+        elif base == "SET_NEUTRAL":
+            self._set_neutrals(param)
+        elif base == "GET_NEUTRAL":
+            self._report_neutral("CURRENT", 0, NUM_MOTORS)
+        else:
+            self.println("[Cmd] Unknown or unhandled command")
+
+        if ack_id >= 0:
+            self._send_ack(ack_id, self.clock.micros() - t0)
+
+    def _motor_command(self, c, duration):
+        if c.kind == "rotate":
+            self.control_motor(c.index, PULSE_MAX if c.ccw else PULSE_MIN, duration)
+        else:
+            self.stop_motor(c.index)
+            if c.kind == "stop_pair":
+                self.stop_motor(c.index + 1)
+
+    def _gait_command(self, gait, error):
+        if self.main_state == "GAIT":
+            self.set_gait_state(gait)
+            self.println(f"[Cmd] Gait => {gait}")
+        else:
+            self.println(error)
+
+    def _send_ack(self, ack_id, t_us):
+        self.println(f"ACK:{ack_id}:{t_us}")
+
+    def _apply_pose(self, targets):
+        start_ms = self.clock.millis()
+        applied = 0
+        for entry in targets.split(";"):
+            eq = entry.find("=")
+            if eq <= 0:
+                continue
+            index = to_int(entry[:eq]) - 1
+            und = entry.find("_", eq + 1)
+            if und != -1:
+                pulse, duration = to_int(entry[eq + 1:und]), to_int(entry[und + 1:])
+            else:
+                pulse, duration = to_int(entry[eq + 1:]), DEFAULT_DURATION
+            if pulse == 0:
+                self.stop_motor(index)
+            else:
+                self.control_motor(index, pulse & 0xFFFF, duration, start_ms)
+            applied += 1
+        self.println(f"[Cmd] Pose applied to {applied} motors")
+
+    def _keep_alive(self, hold_ms):
+        until = self.clock.millis() + hold_ms
+        for task in self.tasks:
+            if task.active and task.end_ms < until:
+                task.end_ms = until
+
+    # ----------------------------------------------------------------
+    # processBinaryFrame()
+    # ----------------------------------------------------------------
+    def process_binary_frame(self, frame: bytes):
+        self.counters["frames"] += 1
+        t0 = self.clock.micros()
+        try:
+            c = binary_protocol.decode_frame(frame)
+        except ValueError:
+            self.println("[ERROR] Bad binary frame")
+            return
+        duration = c.duration if c.duration > 0 else DEFAULT_DURATION
+        op = c.opcode
+        if op == binary_protocol.OP_ROTATE:
+            pulse = c.pulse or (PULSE_MAX if c.direction else PULSE_MIN)
+            self.control_motor(c.target, pulse, duration)
+        elif op == binary_protocol.OP_STOP_MOTOR:
+            self.stop_motor(c.target)
+        elif op == binary_protocol.OP_STOP_LIMB:
+            self.stop_motor(c.target * 2)
+            self.stop_motor(c.target * 2 + 1)
+        elif op == binary_protocol.OP_STOP_ALL:
+            self.stop_motors()
+        elif op == binary_protocol.OP_SET_MODE:
+            mode = _BIN_MODES.get(c.target)
+            if mode is None:
+                self.println("[ERROR] Unknown mode")
+            else:
+                if mode == "GAIT":
+                    self.set_gait_state("STOP")
+                self.set_state(mode)
+        elif op == binary_protocol.OP_GAIT:
+            gait = _BIN_GAITS.get(c.target)
+            if self.main_state != "GAIT" and c.target != 0:
+                self.println("[ERROR] Must be in STATE_GAIT for gait commands")
+            elif gait is None:
+                self.println("[ERROR] Unknown gait")
+            else:
+                self.set_gait_state(gait)
+        elif op == binary_protocol.OP_STAND_UP:
+            self.set_state("STAND_UP")
+        elif op == binary_protocol.OP_SIT_DOWN:
+            self.set_state("SIT_DOWN")
+        elif op == binary_protocol.OP_ELONGATE:
+            self.set_state("ELONGATE")
+        elif op == binary_protocol.OP_RETRACT:
+            self.set_state("RETRACT")
+        elif op == binary_protocol.OP_CALIBRATE_LIMB:
+            self.calibrate_limb(c.target)
+            if c.target < NUM_LIMBS:
+                self._report_neutral("CALIBRATED", c.target * 2, 2)
+        elif op == binary_protocol.OP_CALIBRATE_ALL:
+            self.calibrate_all_limbs()
+            self._report_neutral("CALIBRATED", 0, NUM_LIMBS * 2)
+        else:
+            self.println("[Cmd] Unknown or unhandled command")
+        self._send_ack(c.seq, self.clock.micros() - t0)
+
+    # ----------------------------------------------------------------
+    # FSM
+    # ----------------------------------------------------------------
+    def set_state(self, state):
+        if self.main_state in self._started:
+            self._started[self.main_state] = False
+        self.main_state = state
+        self.println(f"[FSM] => STATE_{state}")
+        if state in self._started:
+            self._started[state] = False
+
+    def _do_stand_sit(self, state):
+        if not self._started[state]:
+            if state == "STAND_UP":
+                self.println("[StandUp] Commanding M2,M4,M6,M8 => CW for example")
+                pulse, duration = PULSE_MIN, STAND_UP_MS
+            else:
+                self.println("[SitDown] Commanding M2,M4,M6,M8 => CCW")
+                pulse, duration = PULSE_MAX, SIT_DOWN_MS
+            for index in (1, 3, 5, 7):
+                self.control_motor(index, pulse, duration)
+            self._started[state] = True
+        if not any(self.tasks[i].active for i in (1, 3, 5, 7)):
+            self.println("[StandUp] Done => STATE_IDLE" if state == "STAND_UP" else "[SitDown] Done => STATE_IDLE")
+            self.set_state("IDLE")
+
+    def _do_elongate_retract(self, state):
+        label = "[Elongate]" if state == "ELONGATE" else "[Retract]"
+        if not self._started[state]:
+            self.println(f"{label} partial moves on M1 & M2")
+            self._started[state] = True
+        now = self.clock.millis()
+        if now - self._move_last_ms[state] > 500:
+            pulse = PULSE_MIN if state == "ELONGATE" else PULSE_MAX
+            self.control_motor(0, pulse, 1000)
+            self.control_motor(1, pulse, 1000)
+            self._move_steps[state] += 1
+            self._move_last_ms[state] = now
+            if self._move_steps[state] >= PULSES_FOR_FULL_MOV:
+                self.println(f"{label} Done => STATE_IDLE")
+                self._move_steps[state] = 0
+                self.set_state("IDLE")
+
+    # ----------------------------------------------------------------
+    # GaitControl
+    # ----------------------------------------------------------------
+    def set_gait_state(self, gait):
+        self.gait_state = gait
+        self.println(f"[GaitControl] => {gait}")
+        if gait == "CRAWLING":
+            self._crawl_step = 0
+            self._crawl_last_ms = self.clock.millis()
+        elif gait == "FASTCRAWL":
+            self._fast_step = 0
+            self._fast_last_ms = self.clock.millis()
+        elif gait == "STOP":
+            self._stop_all_limbs()
+
+    def _gait_update(self):
+        gait = self.gait_state
+        now = self.clock.millis()
+        if gait == "CRAWLING":
+            if now - self._crawl_last_ms < GAIT_STEP_MS:
+                return
+            self._crawl_last_ms = now
+            text, limb, down = CRAWL_STEPS[self._crawl_step]
+            self.println(text)
+            top, bottom = 2 * limb, 2 * limb + 1
+            if down:
+                self._set_pulse(bottom, GAIT_PULSE)
+                self._stop_pulse(top)
+            else:
+                self._set_pulse(top, GAIT_PULSE)
+                self._stop_pulse(bottom)
+            self._crawl_step = (self._crawl_step + 1) % 8
+        elif gait == "FASTCRAWL":
+            if now - self._fast_last_ms < GAIT_STEP_MS:
+                return
+            self._fast_last_ms = now
+            text, actions = FASTCRAWL_STEPS[self._fast_step]
+            self.println(text)
+            for limb, action in enumerate(actions):
+                top, bottom = 2 * limb, 2 * limb + 1
+                if action == "C":    # compressLimb()
+                    self._set_pulse(top, GAIT_PULSE)
+                    self._set_pulse(bottom, GAIT_PULSE)
+                elif action == "A":  # anchorLimbDown()
+                    self._stop_pulse(top)
+                    self._set_pulse(bottom, GAIT_PULSE)
+                else:                # stopLimb()
+                    self._stop_pulse(top)
+                    self._stop_pulse(bottom)
+            self._fast_step = (self._fast_step + 1) % 8
+        elif gait == "WALKING":
+            self.println("[GaitControl] Walking is not implemented.")
+            self._stop_all_limbs()
+        else:
+            self._stop_all_limbs()
+
+    def _stop_all_limbs(self):
+        for i in range(2 * NUM_LIMBS):
+            self._stop_pulse(i)
+
+    # ----------------------------------------------------------------
+    # Calibration (blocking: delay() holds up loop() and the timers)
+    # ----------------------------------------------------------------
+    def calibrate_limb(self, limb):
+        if limb < 0 or limb >= NUM_LIMBS:
+            self.println("Invalid limb index for calibration!")
+            return
+        self.println(f"Starting calibration for Limb {limb + 1}")
+        self.println(f"Calibrating Limb {limb + 1}")
+        self._calibrate_motor(limb, 0)
+        self._calibrate_motor(limb, 1)
+        self.println(f"Calibration completed for Limb {limb + 1}")
+        self.println("Calibration Done")
+
+    def calibrate_all_limbs(self):
+        for limb in range(NUM_LIMBS):
+            self.calibrate_limb(limb)
+            self.clock.delay(500)
+        self.println("All limbs calibrated.")
+        self.println("All Limbs Calibrated")
+
+    def _calibrate_motor(self, limb, offset):
+        index = limb * 2 + offset
+        if index >= NUM_LIMBS * 2:
+            self.println("Motor index out of range during calibration!")
+            return
+        self.println(f"Calibrating Motor {index + 1}")
+        self.println(f"Calibrating M{index + 1}")
+        self._set_pulse(index, 1450)
+        self.clock.delay(1000)
+        for pulse in range(1450, 1501, 10):
+            self._set_pulse(index, pulse)
+            self.clock.delay(50)
+        self._set_pulse(index, CALIBRATION_NEUTRAL)
+        self.neutrals[index] = CALIBRATION_NEUTRAL
+        self.clock.delay(500)
+        self.println(f"Motor {index + 1} calibrated.")
+
+    def _set_neutrals(self, param):
+        """setNeutrals(): SET_NEUTRAL:<m>=<us>,..."""
+        applied = []
+        for item in param.split(","):
+            motor, eq, pulse = item.partition("=")
+            motor, pulse = (to_int(motor), to_int(pulse)) if eq and motor else (0, 0)
+            if 1 <= motor <= NUM_MOTORS and NEUTRAL_PULSE_MIN <= pulse <= NEUTRAL_PULSE_MAX:
+                self.neutrals[motor - 1] = pulse
+                if not self.tasks[motor - 1].active and self.main_state != "GAIT":
+                    self._stop_pulse(motor - 1)
+                applied.append(f"{motor}={pulse}")
+            else:
+                self.println(f"[ERROR] Bad neutral {item}")
+        self.println("[Calib] LOADED " + ",".join(applied))
+
+    def _report_neutral(self, kind, first, count):
+        """reportNeutral()"""
+        motors = range(first, min(first + count, NUM_MOTORS))
+        self.println(f"[Calib] {kind} " + ",".join(f"{i + 1}={self.neutrals[i]}" for i in motors))
+
+    # ----------------------------------------------------------------
+    # Motor control
+    # ----------------------------------------------------------------
+    def control_motor(self, index, pulse, duration, start_ms=0):
+        if index < 0 or index >= NUM_MOTORS:
+            self.println("[ERROR] Invalid motor index!")
+            return
+        if start_ms == 0:
+            start_ms = self.clock.millis()
+        self._set_pulse(index, pulse)
+        task = self.tasks[index]
+        task.active = True
+        task.end_ms = start_ms + duration
+
+    def stop_motor(self, index):
+        if index < 0 or index >= NUM_MOTORS:
+            self.println("[ERROR] Invalid motor index!")
+            return
+        self._stop_pulse(index)
+        self.tasks[index].active = False
+        self.println(f"[stopMotor] Motor {index} manually stopped")
+
+    def stop_motors(self):
+        self.println("[stopMotors] Stopping all")
+        for i, task in enumerate(self.tasks):
+            self._stop_pulse(i)
+            task.active = False
+
+    def _stop_pulse(self, index):
+        self._set_pulse(index, self.neutrals[index])
+
+    def _set_pulse(self, channel, pulse):
+        """LimbControl::setPulse(); the channel is the motor index."""
+        pulse = min(max(pulse, PULSE_MIN), PULSE_MAX)
+        self.pulses[channel] = pulse
+        if self.echo_pwm:
+            self.println(f"Channel {channel} => Pulse: {pulse} µs => {pwm_ticks(pulse)} ticks "
+                         f"(out of 4095) at {PCA9685_FREQ} Hz")
+
+    # ----------------------------------------------------------------
+    def running_motors(self):
+        """Motor numbers (1-based) whose output is not the neutral pulse."""
+        return [i + 1 for i, p in enumerate(self.pulses) if p and p != self.neutrals[i]]
+
+    def snapshot(self) -> dict:
+        return {
+            "t_ms": self.clock.millis(),
+            "state": self.main_state,
+            "gait": self.gait_state,
+            "pulses": list(self.pulses),
+            "neutrals": list(self.neutrals),
+            "active": [i + 1 for i, task in enumerate(self.tasks) if task.active],
+        }
+
+
+# ====================================================================
+class SimTransport(Transport):
+    """
+    A MorphBotSim as a link. Robot output is handed to on_line() like the
+    TCP transport does, so acks, FSM and timer events go through
+    RobotBackend's usual parser.
+    """
+    name = "sim"
+
+    def __init__(self, sim: MorphBotSim = None, speed=1.0, tick_s=0.005, binary=False, **sim_opts):
+        """
+        `speed` is virtual seconds per wall second (None = lockstep, see
+        advance()). With `binary=True` commands that have a binary form go
+        out as 9-byte frames, like SerialTransport(binary=True).
+        """
+        self.sim = sim if sim is not None else MorphBotSim(**sim_opts)
+        self.speed = speed
+        self.tick_s = tick_s
+        self.binary = binary
+        self._open = False
+        self._task = None
+        self._wall0 = self._virt0 = 0
+
+    def _emit(self, line):
+        self.bytes_in += len(line) + 2
+        if self.on_line:
+            self.on_line(line)
+
+    async def connect(self):
+        if self._open:
+            return
+        self.sim.on_line = self._emit
+        if not self.sim.booted:
+            self.sim.boot()
+        self._wall0, self._virt0 = time.perf_counter(), self.sim.clock.us
+        self._open = True
+        if self.speed:
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        print(f"[Sim] MorphBotV2 simulator up ({f'{self.speed:g}x real time' if self.speed else 'lockstep'})")
+
+    def virtual_us(self) -> int:
+        """Virtual time now: the sim's clock, or where a free-running one is due to be."""
+        if self.speed and self._open:
+            return max(self.sim.clock.us, self._virt0 + int((time.perf_counter() - self._wall0) * self.speed * 1e6))
+        return self.sim.clock.us
+
+    def _catch_up(self):
+        self.sim.run_until(self.virtual_us())
+
+    async def _run(self):
+        while self._open:
+            self._catch_up()
+            await asyncio.sleep(self.tick_s)
+
+    async def send(self, command: str):
+        if not self._open:
+            raise TransportError("Simulator not connected.")
+        data = self._encode(command)
+        self.sim.write(data)
+        self.bytes_out += len(data)
+        if self.speed:
+            self._catch_up()
+        self.sim.process_pending()
+        return len(data)
+
+    async def advance(self, ms):
+        """Move the virtual clock forward by `ms`, running everything due."""
+        self.sim.advance(ms)
+        if self.speed:
+            self._virt0 += int(ms * 1000)
+
+    async def close(self):
+        self._open = False
+        if self._task is not None:
+            self._task.cancel()
+            self._task = None
+
+    @property
+    def connected(self) -> bool:
+        return self._open
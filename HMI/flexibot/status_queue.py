@@ -0,0 +1,70 @@
+"""
+Thread-safe hand-off of status updates from the link threads to a UI.
+
+Producers (link loop, serial reader, HTTP workers) call put() from any
+thread; it only stores values under a lock. The UI calls drain() once per
+frame on its own thread and gets:
+
+    changed  - {field: latest message} for fields updated since the last
+               drain; a burst of updates to one field collapses to the
+               newest value, so the UI redraws each field at most once
+    lines    - new scrollback lines since the last drain (bounded; lines
+               the UI never picked up are counted in `overflowed`)
+
+The scrollback itself keeps the last `scrollback` lines for views that
+are opened later.
+"""
+import threading
+import time
+from collections import deque
+
+
+class StatusQueue:
+    def __init__(self, scrollback=500):
+        self._lock = threading.Lock()
+        self._latest = {}    # field -> message
+        self._changed = set()
+        self._new_lines = deque(maxlen=scrollback)
+        self.scrollback = deque(maxlen=scrollback)
+        self.overflowed = 0
+        self.puts = 0
+
+    def put(self, field: str, message: str, log_line=True):
+        """Set `field` to `message`; also appends it to the scrollback unless log_line is False."""
+        with self._lock:
+            self.puts += 1
+            self._latest[field] = message
+            self._changed.add(field)
+            if log_line:
+                self._append(message)
+
+    def append(self, line: str):
+        """Scrollback only (e.g. raw robot output)."""
+        with self._lock:
+            self._append(line)
+
+    def _append(self, line):
+        line = f"{time.strftime('%H:%M:%S')}  {line}"
+        if len(self._new_lines) == self._new_lines.maxlen:
+            self.overflowed += 1
+        self._new_lines.append(line)
+        self.scrollback.append(line)
+
+    def latest(self, field, default=None):
+        with self._lock:
+            return self._latest.get(field, default)
+
+    def drain(self):
+        """Returns (changed fields -> latest message, new scrollback lines)."""
+        with self._lock:
+            if not self._changed and not self._new_lines:
+                return {}, []
+            changed = {f: self._latest[f] for f in self._changed}
+            self._changed.clear()
+            lines = list(self._new_lines)
+            self._new_lines.clear()
+        return changed, lines
+
+    def lines(self):
+        with self._lock:
+            return list(self.scrollback)
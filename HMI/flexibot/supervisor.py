@@ -0,0 +1,323 @@
+"""
+Link supervision: health probes, reconnect with backoff, serial <-> Wi-Fi failover.
+
+    backend = RobotBackend(transport=SerialTransport(port))
+    supervisor = backend.supervise([TcpTransport("192.168.3.1")])   # fallbacks, in order
+    ...
+    supervisor.stats()   # active link, per-link state, reconnect and failover times
+
+Links are listed in order of preference; backend.transport is always the
+active one. Everything runs as one task on the backend's LinkLoop:
+
+  - The active link is probed with an acked `HB:0` (a no-op heartbeat on
+    the firmware) whenever it has been quiet for `probe_s`; standby links
+    are probed every `standby_probe_s`, so a failover target is known to
+    work before it is needed. `max_misses` probes without an ACK, a send
+    error, or the serial reader losing its port marks a link down.
+  - A down link is closed and reopened with exponential backoff
+    (`backoff_min_s`, doubling up to `backoff_max_s`, +-10 % jitter) and
+    counts as up again once a probe over it is acked.
+  - When the active link goes down, the best link that is up takes over
+    at once. With none up, the scheduler is paused: commands stay queued
+    (a send that failed is requeued, not lost) and go out on whichever
+    link comes back first. Once a preferred link has been up for
+    `failback_s`, traffic moves back to it.
+
+Commands are resent if their send raised, which can repeat one the robot
+had already received; queued motion still expires after its deadline, but
+stops never do.
+
+Measured, per event: reconnect time (link marked down -> probe acked on
+it again) and failover time (active link marked down -> first ACK over the
+link that took over). Both are kept in stats() and exported as histograms.
+"""
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+
+from flexibot.latency import percentile
+from flexibot.transports import SerialTransport, TransportError, TransportTimeout
+
+PROBE_COMMAND = "HB:0"
+PROBE_S = 0.5             # probe the active link after this long without an ACK
+STANDBY_PROBE_S = 2.0
+PROBE_TIMEOUT_S = 0.5
+MAX_MISSES = 2
+BACKOFF_MIN_S = 0.1
+BACKOFF_MAX_S = 5.0
+FAILBACK_S = 3.0
+TICK_S = 0.05
+
+# Seconds; from a TCP reconnect to a serial port that resets the board
+RECOVERY_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+class _Link:
+    def __init__(self, transport, rank):
+        self.transport = transport
+        self.rank = rank            # 0 = most preferred
+        self.up = False
+        self.misses = 0
+        self.t_down = None          # None until it has been up once
+        self.t_up = None
+        self.t_ok = None            # last ACK over this link
+        self.reason = "not connected"
+        self.backoff = BACKOFF_MIN_S
+        self.next_try = 0.0
+        self.busy = False           # a probe or reconnect is running
+        self.reconnects = deque(maxlen=100)
+
+    @property
+    def name(self):
+        return self.transport.name
+
+
+class LinkSupervisor:
+    def __init__(self, backend, transports, probe_s=PROBE_S, standby_probe_s=STANDBY_PROBE_S,
+                 probe_timeout_s=PROBE_TIMEOUT_S, max_misses=MAX_MISSES, backoff_min_s=BACKOFF_MIN_S,
+                 backoff_max_s=BACKOFF_MAX_S, failback_s=FAILBACK_S):
+        self.backend = backend
+        self.links = [_Link(t, rank) for rank, t in enumerate(transports)]
+        self.probe_s = probe_s
+        self.standby_probe_s = standby_probe_s
+        self.probe_timeout_s = probe_timeout_s
+        self.max_misses = max_misses
+        self.backoff_min_s = backoff_min_s
+        self.backoff_max_s = backoff_max_s
+        self.failback_s = failback_s
+        self.active = self.links[0]
+        self.failovers = deque(maxlen=100)   # (from, to, seconds)
+        self._t_failover = None              # when the active link was lost, until the next ACK
+        self._lost_name = None
+        self._task = None
+        self._tasks = set()                  # probes and reconnects in flight
+        self._running = False
+        self._busy_until = 0.0               # the firmware is stuck in a blocking command until then
+        self._any_up = threading.Event()
+
+        m = backend.metrics
+        self._m_reconnect = m.histogram("flexibot_link_reconnect_seconds",
+                                        "Link down until a probe over it is acked again", RECOVERY_BUCKETS)
+        self._m_failover = m.histogram("flexibot_link_failover_seconds",
+                                       "Active link lost until the first ACK over its replacement",
+                                       RECOVERY_BUCKETS)
+        self._m_down = m.counter("flexibot_link_down_total", "Links marked down", ("link",))
+        for link in self.links:
+            link.transport.on_line = backend._on_link_line
+
+    @property
+    def transports(self):
+        return [link.transport for link in self.links]
+
+    # ----------------------------------------------------------------
+    # Any thread
+    # ----------------------------------------------------------------
+    def start(self):
+        self._running = True
+        self._task = self.backend.link.submit(self._run())
+
+    def stop(self):
+        self._running = False
+        self.backend.link.call_soon(self._cancel)
+
+    def wait_up(self, timeout=None) -> bool:
+        """Block until some link is up (an ACK came back over it); False on timeout."""
+        return self._any_up.wait(timeout)
+
+    def stats(self) -> dict:
+        failover_s = sorted(s for _, _, s in self.failovers)
+        out = {
+            "active": self.active.name,
+            "links": {link.name: {
+                "up": link.up,
+                "reason": None if link.up else link.reason,
+                "reconnects": len(link.reconnects),
+                "last_reconnect_ms": 1000.0 * link.reconnects[-1] if link.reconnects else None,
+                "backoff_s": None if link.up else link.backoff,
+            } for link in self.links},
+            "failovers": len(self.failovers),
+        }
+        if failover_s:
+            out["failover_p50_ms"] = 1000.0 * percentile(failover_s, 50)
+            out["failover_max_ms"] = 1000.0 * failover_s[-1]
+            out["last_failover"] = self.failovers[-1][:2] + (1000.0 * self.failovers[-1][2],)
+        return out
+
+    # ----------------------------------------------------------------
+    # Link loop only
+    # ----------------------------------------------------------------
+    def robot_busy(self, seconds):
+        """The robot will not answer for `seconds` (calibration); don't count that as a dead link."""
+        self._busy_until = max(self._busy_until, time.monotonic() + seconds + self.probe_timeout_s)
+
+    def link_failed(self, transport, reason):
+        """A send over `transport` raised, or its reader lost the port."""
+        if isinstance(reason, TransportTimeout) and time.monotonic() < self._busy_until:
+            return
+        link = self._find(transport)
+        if link is not None and link.up:
+            self._mark_down(link, str(reason))
+
+    def serial_lost(self, reason):
+        for link in self.links:
+            if isinstance(link.transport, SerialTransport) and link.up:
+                self._mark_down(link, f"serial: {reason}")
+
+    def acked(self, transport):
+        """Called for every ACK; closes an open failover measurement."""
+        link = self._find(transport)
+        if link is None:
+            return
+        link.t_ok = time.monotonic()
+        link.misses = 0
+        if self._t_failover is not None and link is self.active and link.up:
+            seconds = link.t_ok - self._t_failover
+            self._t_failover = None
+            self.failovers.append((self._lost_name, link.name, seconds))
+            self._m_failover.observe(seconds)
+            if self._lost_name == link.name:
+                self.backend.update_status(f"Link: {link.name} back after {seconds * 1000:.0f} ms")
+            else:
+                self.backend.update_status(f"Link: {self._lost_name} -> {link.name} in {seconds * 1000:.0f} ms")
+
+    def _cancel(self):
+        for task in self._tasks:
+            task.cancel()
+        if self._task is not None:
+            self._task.cancel()
+
+    def _spawn(self, coro):
+        task = asyncio.get_running_loop().create_task(coro)
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    def _find(self, transport):
+        for link in self.links:
+            if link.transport is transport:
+                return link
+        return None
+
+    async def _run(self):
+        self.backend.scheduler.pause()  # until a link is up
+        while self._running:
+            now = time.monotonic()
+            for link in self.links:
+                if link.busy:
+                    continue
+                if not link.up:
+                    if now >= link.next_try:
+                        link.busy = True
+                        self._spawn(self._reconnect(link))
+                    continue
+                if now < self._busy_until:
+                    continue
+                quiet = now - (link.t_ok or link.t_up)
+                if quiet >= (self.probe_s if link is self.active else self.standby_probe_s):
+                    link.busy = True
+                    self._spawn(self._probe(link))
+            self._choose(now)
+            await asyncio.sleep(TICK_S)
+
+    async def _probe(self, link):
+        try:
+            ok = await self._probe_once(link)
+            if ok or time.monotonic() < self._busy_until:
+                return
+            link.misses += 1
+            if link.up and link.misses >= self.max_misses:
+                self._mark_down(link, f"{link.misses} probes without ACK")
+        finally:
+            link.busy = False
+
+    async def _probe_once(self, link) -> bool:
+        acked = Future()
+        try:
+            await asyncio.wait_for(self.backend.send_async(PROBE_COMMAND, acked, transport=link.transport),
+                                   self.probe_timeout_s)
+            await asyncio.wait_for(asyncio.wrap_future(acked), self.probe_timeout_s)
+        except (TransportError, OSError, asyncio.TimeoutError):
+            return False
+        return True
+
+    async def _reconnect(self, link):
+        transport = link.transport
+        try:
+            try:
+                await transport.close()
+                await transport.connect()
+            except (TransportError, OSError) as e:
+                link.reason = str(e)
+                ok = False
+            else:
+                # Connected is not enough: the robot has to answer over it
+                ok = await self._probe_once(link)
+                if not ok:
+                    link.reason = "connected, but no ACK"
+            if ok:
+                self._mark_up(link)
+            else:
+                jitter = random.uniform(0.9, 1.1)
+                link.next_try = time.monotonic() + link.backoff * jitter
+                link.backoff = min(link.backoff * 2, self.backoff_max_s)
+        finally:
+            link.busy = False
+
+    def _mark_down(self, link, reason):
+        now = time.monotonic()
+        link.up = False
+        link.reason = reason
+        link.t_down = now
+        link.misses = 0
+        link.backoff = self.backoff_min_s
+        link.next_try = now  # first retry right away, then back off
+        self._m_down.inc(link=link.name)
+        print(f"[LinkSupervisor] {link.name} down: {reason}")
+        if link is self.active:
+            if self._t_failover is None:
+                self._t_failover = now
+                self._lost_name = link.name
+            self.backend.update_status(f"Link: {link.name} lost ({reason})")
+            self._choose(now)
+
+    def _mark_up(self, link):
+        now = time.monotonic()
+        link.up = True
+        link.t_up = now
+        link.t_ok = now
+        link.misses = 0
+        link.backoff = self.backoff_min_s
+        self.backend._link_up(link.transport)
+        if link.t_down is None:
+            print(f"[LinkSupervisor] {link.name} up")
+        else:
+            seconds = now - link.t_down
+            link.reconnects.append(seconds)
+            self._m_reconnect.observe(seconds)
+            print(f"[LinkSupervisor] {link.name} up after {seconds * 1000:.0f} ms")
+        self._choose(now)
+
+    def _choose(self, now):
+        """Switch the active link to the best one that is up (failback only once it has settled)."""
+        up = [link for link in self.links if link.up]
+        if not up:
+            self._any_up.clear()
+            if not self.backend.scheduler.paused:
+                self.backend.scheduler.pause()
+            return
+        best = up[0]
+        current = self.active
+        if current.up and (best is current or now - best.t_up < self.failback_s):
+            best = current
+        if best is not current:
+            print(f"[LinkSupervisor] switching {current.name} -> {best.name}")
+            self.active = best
+            self.backend.use_link(best.transport)
+            if self._t_failover is None and current.up:  # failback from a healthy link
+                self._t_failover = now
+                self._lost_name = current.name
+        self._any_up.set()
+        if self.backend.scheduler.paused:
+            self.backend.scheduler.resume()
@@ -0,0 +1,104 @@
+"""
+Session telemetry: every sent command and every received line, as
+fixed-size records in a memory-mapped ring file.
+
+File layout (little endian):
+
+    header, 64 bytes
+        0   magic        b"FBTL"
+        4   version      uint16
+        6   record_size  uint16
+        8   capacity     uint32   (records)
+        12  (pad)
+        16  written      uint64   (records ever written; slot = written % capacity)
+        24  created      float64  (time.time() at creation)
+    records, capacity * 128 bytes
+        0   t            float64  (time.time())
+        8   kind         uint8    (KIND_TX / KIND_RX)
+        9   flags        uint8    (1 = text truncated)
+        10  length       uint16   (bytes of text used)
+        12  text         116 bytes, utf-8, zero padded
+
+Appends are a struct.pack_into straight into the mapping, so the cost per
+record is one small memcpy; disk use is fixed at creation time. Read it
+back with read_records() or Analysis/replay_session.py (NumPy).
+"""
+import mmap
+import os
+import struct
+import threading
+import time
+
+MAGIC = b"FBTL"
+VERSION = 1
+HEADER = struct.Struct("<4sHHI4xQd")
+HEADER_SIZE = 64
+RECORD = struct.Struct("<dBBH116s")
+RECORD_SIZE = RECORD.size  # 128
+TEXT_MAX = 116
+
+KIND_TX = 1  # command sent to the robot
+KIND_RX = 2  # line received from the robot
+
+_WRITTEN = struct.Struct("<Q")
+_WRITTEN_OFFSET = 16
+
+
+class TelemetryRecorder:
+    def __init__(self, path, capacity=65536):
+        self.path = path
+        self.capacity = capacity
+        size = HEADER_SIZE + capacity * RECORD_SIZE
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT | os.O_TRUNC, 0o644)
+        os.ftruncate(self._fd, size)
+        self.mm = mmap.mmap(self._fd, size)
+        HEADER.pack_into(self.mm, 0, MAGIC, VERSION, RECORD_SIZE, capacity, 0, time.time())
+        self.written = 0
+        self._lock = threading.Lock()
+
+    def record(self, kind: int, text: str, t: float = None):
+        data = text.encode("utf-8", errors="replace")
+        flags = 0
+        if len(data) > TEXT_MAX:
+            data, flags = data[:TEXT_MAX], 1
+        with self._lock:
+            if self.mm is None:
+                return
+            offset = HEADER_SIZE + (self.written % self.capacity) * RECORD_SIZE
+            RECORD.pack_into(self.mm, offset, t or time.time(), kind, flags, len(data), data)
+            self.written += 1
+            _WRITTEN.pack_into(self.mm, _WRITTEN_OFFSET, self.written)
+
+    def record_tx(self, command: str):
+        self.record(KIND_TX, command)
+
+    def record_rx(self, line: str):
+        self.record(KIND_RX, line)
+
+    def flush(self):
+        self.mm.flush()
+
+    def close(self):
+        with self._lock:
+            if self.mm is not None:
+                self.mm.flush()
+                self.mm.close()
+                os.close(self._fd)
+                self.mm = None
+
+
+def read_records(path):
+    """Yield (t, kind, text) oldest first."""
+    with open(path, "rb") as f:
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, record_size, capacity, written, _ = HEADER.unpack_from(mm, 0)
+            if magic != MAGIC:
+                raise ValueError(f"{path} is not a telemetry file")
+            first = max(0, written - capacity)
+            for i in range(first, written):
+                offset = HEADER_SIZE + (i % capacity) * record_size
+                t, kind, _, length, text = RECORD.unpack_from(mm, offset)
+                yield t, kind, text[:length].decode("utf-8", errors="replace")
+        finally:
+            mm.close()
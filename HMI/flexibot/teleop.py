@@ -0,0 +1,164 @@
+"""
+Continuous teleop: held keys / joysticks -> fixed-rate, delta-encoded POSE frames.
+
+Inputs only set target pulses (set_target / set_axis / release); nothing
+is sent from the input handlers. A ticker thread runs at `rate_hz` and on
+each tick sends one POSE frame holding just the motors whose target
+changed since the last tick. Targets are quantised to `quantum_us`, so
+joystick jitter does not turn into frames.
+
+Every motor that is running is also kept alive by a heartbeat
+(HB:<hold_ms>) sent every `heartbeat_s`: the firmware extends the
+auto-stop timer of all active motors by hold_ms. Frames themselves carry
+the same hold, so if the HMI, the link or this thread stalls, the motors
+stop on their own within hold_ms.
+
+    teleop = TeleopStreamer(backend, rate_hz=50)
+    teleop.start()
+    teleop.set_axis("M1", 0.6)    # from a joystick, -1..1
+    teleop.release("M1")
+    teleop.stop()                 # stops every motor it drove
+"""
+import threading
+import time
+
+from flexibot import log
+from flexibot.pose import STOP_PULSE, Pose, motor_number
+from flexibot.registry import MOTORS
+from flexibot.scheduler import CommandDropped
+
+TELEOP_MOTORS = tuple(m.number for m in MOTORS)  # M1..M8, BODY1, BODY2
+
+# LimbControl::setRPM(): CW pulses run 1450 -> 500, CCW 1550 -> 2500
+CW_START, CW_FULL = 1450, 500
+CCW_START, CCW_FULL = 1550, 2500
+DEADZONE = 0.08
+
+
+def axis_to_pulse(value: float, deadzone=DEADZONE) -> int:
+    """Joystick axis -1..1 -> pulse; positive is CW, inside the deadzone is a stop."""
+    value = max(-1.0, min(1.0, value))
+    if abs(value) < deadzone:
+        return STOP_PULSE
+    if value > 0:
+        return int(round(CW_START + (CW_FULL - CW_START) * value))
+    return int(round(CCW_START + (CCW_FULL - CCW_START) * -value))
+
+
+class TeleopStreamer:
+    def __init__(self, backend, rate_hz=50.0, hold_ms=250, heartbeat_s=0.08, quantum_us=25):
+        self.backend = backend
+        self.period = 1.0 / rate_hz
+        self.hold_ms = hold_ms
+        self.heartbeat_s = heartbeat_s
+        self.quantum_us = quantum_us
+        self._lock = threading.Lock()
+        self._targets = {}  # motor number -> wanted pulse
+        self._sent = {}     # motor number -> pulse last sent
+        self._running = False
+        self._thread = None
+        self.counters = {"ticks": 0, "frames": 0, "heartbeats": 0, "motors_sent": 0, "resent": 0}
+
+    # ----------------------------------------------------------------
+    # Inputs (any thread)
+    # ----------------------------------------------------------------
+    def set_target(self, motor, pulse: int):
+        n = motor_number(motor)
+        if pulse != STOP_PULSE:
+            pulse = int(round(pulse / self.quantum_us) * self.quantum_us)
+        with self._lock:
+            self._targets[n] = pulse
+
+    def set_axis(self, motor, value: float):
+        self.set_target(motor, axis_to_pulse(value))
+
+    def release(self, motor):
+        self.set_target(motor, STOP_PULSE)
+
+    def release_all(self):
+        with self._lock:
+            for n in self._targets:
+                self._targets[n] = STOP_PULSE
+
+    # ----------------------------------------------------------------
+    def start(self):
+        if self._thread is not None:
+            return
+        self._running = True
+        self._thread = threading.Thread(target=self._run, name="teleop", daemon=True)
+        self._thread.start()
+        print(f"[Teleop] streaming at {1.0 / self.period:.0f} Hz, hold {self.hold_ms} ms")
+
+    def stop(self, join_timeout=1.0):
+        """Stop streaming and stop every motor teleop has driven."""
+        if self._thread is None:
+            return
+        self._running = False
+        self._thread.join(join_timeout)
+        self._thread = None
+        with self._lock:
+            driven = sorted(self._sent)
+            self._targets.clear()
+            self._sent.clear()
+        if driven:
+            pose = Pose()
+            for n in driven:
+                pose.stop(n)
+            self.backend.send_pose(pose)
+        print(f"[Teleop] stopped: {self.counters}")
+
+    def _run(self):
+        t_next = time.perf_counter()
+        t_heartbeat = t_next
+        while self._running:
+            now = time.perf_counter()
+            if now < t_next:
+                time.sleep(t_next - now)
+                continue
+            t_next += self.period
+            if t_next < now:  # fell behind (e.g. suspended); don't burst to catch up
+                t_next = now + self.period
+            self.counters["ticks"] += 1
+            self._tick()
+            if now >= t_heartbeat:
+                t_heartbeat = now + self.heartbeat_s
+                self._heartbeat()
+
+    def _tick(self):
+        with self._lock:
+            delta = {n: p for n, p in self._targets.items() if self._sent.get(n) != p}
+            self._sent.update(delta)
+        if not delta:
+            return
+        pose = Pose()
+        for n, pulse in delta.items():
+            if pulse == STOP_PULSE:
+                pose.stop(n)
+            else:
+                pose.set(n, pulse, self.hold_ms)
+        self.counters["frames"] += 1
+        self.counters["motors_sent"] += len(delta)
+        # A frame older than one tick is stale; the next tick carries newer targets
+        fut = self.backend.send_command(pose.to_command(), deadline_s=self.period * 2)
+        fut.add_done_callback(lambda f, delta=delta: self._on_frame_done(f, delta))
+
+    def _on_frame_done(self, fut, delta):
+        if not fut.cancelled() and fut.exception() is None:
+            return
+        # Dropped, link down, dispatch queue full...: the robot may not have
+        # these targets, so forget them and the next tick sends them again
+        with self._lock:
+            for n, pulse in delta.items():
+                if self._sent.get(n) == pulse:
+                    del self._sent[n]
+        self.counters["resent"] += 1
+        exc = None if fut.cancelled() else fut.exception()
+        reason = exc.reason if isinstance(exc, CommandDropped) else (exc or "cancelled")
+        log.debug("[Teleop] frame not sent (%s), resending", reason)
+
+    def _heartbeat(self):
+        with self._lock:
+            running = any(p != STOP_PULSE for p in self._sent.values())
+        if running:
+            self.counters["heartbeats"] += 1
+            self.backend.send_command(f"HB:{self.hold_ms}", deadline_s=self.heartbeat_s)
@@ -0,0 +1,322 @@
+"""
+Pluggable transports running on one background asyncio loop.
+
+    LinkLoop        - owns the event loop thread every transport runs on
+    Transport       - interface: connect() / send(command) / close()
+    SerialTransport - newline-terminated commands over pyserial (any URL
+                      serial_for_url understands, e.g. "loop://")
+    HttpTransport   - GET /<command> through the pooled HttpDispatcher
+    TcpTransport    - the firmware's TCP command channel: one long-lived
+                      socket, serial framing both ways
+    SimTransport    - the firmware simulator on a virtual clock (simulator.py)
+
+All transport methods are coroutines and must run on the LinkLoop. From
+other threads use LinkLoop.submit(), which returns a concurrent Future the
+caller can wait on or simply ignore.
+"""
+import asyncio
+import socket
+import threading
+
+import serial
+
+from flexibot import binary_protocol
+from flexibot.http_dispatch import HttpDispatcher
+from flexibot.latency import split_tag
+
+DEFAULT_HTTP_PORT = 80
+DEFAULT_TCP_PORT = 8081
+SERIAL_WRITE_TIMEOUT = 1.0  # s; a write stuck longer than this fails the send
+
+
+class TransportError(Exception):
+    """The transport could not deliver a command."""
+
+
+class TransportTimeout(TransportError):
+    """The robot did not answer in time."""
+
+
+# ====================================================================
+# Event loop
+# ====================================================================
+class LinkLoop:
+    """A single asyncio loop on a daemon thread, shared by all transports."""
+
+    def __init__(self, name="link-loop"):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._run, name=name, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    def submit(self, coro):
+        """Schedule a coroutine from any thread; returns a concurrent.futures.Future."""
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def call_soon(self, fn, *args):
+        self.loop.call_soon_threadsafe(fn, *args)
+
+    def in_loop(self) -> bool:
+        return threading.current_thread() is self._thread
+
+    def stop(self, timeout=2.0):
+        if self.loop.is_running():
+            try:
+                # run_in_executor() threads (serial open) would otherwise linger
+                self.submit(self.loop.shutdown_default_executor()).result(timeout)
+            except Exception:
+                pass
+            self.loop.call_soon_threadsafe(self.loop.stop)
+            self._thread.join(timeout)
+
+
+# ====================================================================
+# Transports
+# ====================================================================
+class Transport:
+    """
+    Base class; subclasses implement the three coroutines below.
+    Transports that carry robot output back (TCP) hand each line to
+    `on_line(text)` when it is set.
+    """
+    name = "transport"
+    on_line = None
+    bytes_out = 0  # per instance once anything has been sent
+    bytes_in = 0   # robot output received on this link (TCP, HTTP bodies)
+    binary = False
+    _seq = 0
+
+    async def connect(self):
+        pass
+
+    async def send(self, command: str):
+        raise NotImplementedError
+
+    async def close(self):
+        pass
+
+    @property
+    def connected(self) -> bool:
+        return False
+
+    def __repr__(self):
+        return f"<{type(self).__name__} {self.name}>"
+
+    def _encode(self, command: str) -> bytes:
+        """Serial framing: a 9-byte binary frame if enabled and possible, else an ASCII line."""
+        if self.binary:
+            text, seq = split_tag(command)
+            if binary_protocol.can_encode(text):
+                if seq is None:
+                    self._seq = (self._seq + 1) & 0xFF
+                    seq = self._seq
+                return binary_protocol.encode_command(text, seq)
+        return (command + "\n").encode("utf-8")
+
+
+class SerialTransport(Transport):
+    name = "serial"
+
+    def __init__(self, port=None, baudrate=115200, ser=None, settle=0.0, binary=False):
+        """
+        Pass either a port/URL to open, or an already opened serial object.
+        `settle` is how long to wait after opening (the board resets on open).
+        With `binary=True`, commands that have a binary form go out as 9-byte
+        frames (see binary_protocol); everything else stays an ASCII line.
+        """
+        self.port = port
+        self.baudrate = baudrate
+        self.ser = ser
+        self.settle = settle
+        self.binary = binary
+        self._lock = None
+
+    async def connect(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        # Holding the lock makes concurrent senders wait for one open + settle
+        async with self._lock:
+            if self.connected:
+                return
+            loop = asyncio.get_running_loop()
+            try:
+                ser = await loop.run_in_executor(
+                    None, lambda: serial.serial_for_url(self.port, self.baudrate, timeout=1,
+                                                        write_timeout=SERIAL_WRITE_TIMEOUT))
+            except serial.SerialException as e:
+                raise TransportError(f"Serial port not connected ({e})") from e
+            if self.settle:
+                await asyncio.sleep(self.settle)
+            self.ser = ser
+            print(f"Connected to {self.port} at {self.baudrate} baud.")
+
+    async def send(self, command: str):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        if not self.connected:
+            raise TransportError("Serial port not connected.")
+        data = self._encode(command)
+        async with self._lock:
+            # write() blocks while the OS buffer is full (or the adapter hangs); keep that off the loop
+            try:
+                await asyncio.get_running_loop().run_in_executor(None, self.ser.write, data)
+            except serial.SerialTimeoutException as e:
+                raise TransportTimeout(f"Serial write timed out ({e})") from e
+            except serial.SerialException as e:
+                raise TransportError(str(e)) from e
+        self.bytes_out += len(data)
+        return len(data)
+
+    async def close(self):
+        if self.ser is not None and self.ser.is_open:
+            self.ser.close()
+
+    @property
+    def connected(self) -> bool:
+        return self.ser is not None and self.ser.is_open
+
+
+class HttpTransport(Transport):
+    name = "http"
+
+    def __init__(self, host, port=DEFAULT_HTTP_PORT, on_result=None, **dispatch_opts):
+        self.host = host
+        self.port = port
+        self.on_result = on_result
+        self.dispatch_opts = dispatch_opts
+        self.dispatcher = None
+
+    async def connect(self):
+        if self.dispatcher is None:
+            self.dispatcher = HttpDispatcher(f"http://{self.host}:{self.port}",
+                                             on_result=self.on_result, **self.dispatch_opts)
+
+    async def send(self, command: str):
+        if self.dispatcher is None:
+            await self.connect()
+        timing = await asyncio.wrap_future(self.dispatcher.submit(command))
+        self.bytes_out += len(command)
+        self.bytes_in += timing.nbytes
+        if timing.status_code is not None and timing.status_code != 200:
+            raise TransportError(f"HTTP {timing.status_code}")
+        if timing.error == "timeout":
+            raise TransportTimeout("HTTP Request Timed Out")
+        if timing.error == "connection":
+            raise TransportError("Connection Failed")
+        if timing.error:
+            raise TransportError(timing.error)
+        return timing
+
+    async def close(self):
+        if self.dispatcher is not None:
+            self.dispatcher.close()
+            self.dispatcher = None
+
+    @property
+    def connected(self) -> bool:
+        return self.dispatcher is not None
+
+
+class TcpTransport(Transport):
+    name = "tcp"
+
+    def __init__(self, host, port=DEFAULT_TCP_PORT, connect_timeout=3.0, binary=False):
+        """
+        Commands go out with the same framing as on serial (`binary=True`
+        for 9-byte frames); ACK:, STATUS: and [FSM] lines come back on the
+        same socket and are handed to on_line. If the robot drops the
+        socket, the next send reconnects.
+        """
+        self.host = host
+        self.port = port
+        self.connect_timeout = connect_timeout
+        self.binary = binary
+        self.reader = None
+        self.writer = None
+        self._read_task = None
+
+    async def connect(self):
+        if self.writer is None:
+            try:
+                self.reader, self.writer = await asyncio.wait_for(
+                    asyncio.open_connection(self.host, self.port), self.connect_timeout)
+            except asyncio.TimeoutError as e:
+                raise TransportTimeout(f"TCP connect to {self.host}:{self.port} timed out") from e
+            except OSError as e:
+                raise TransportError(f"TCP connect to {self.host}:{self.port} failed ({e})") from e
+            sock = self.writer.get_extra_info("socket")
+            if sock is not None:
+                # Commands are a few bytes each; don't let Nagle hold them back
+                sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+            self._read_task = asyncio.get_running_loop().create_task(self._read_lines())
+
+    async def _read_lines(self):
+        reader, writer = self.reader, self.writer
+        try:
+            while True:
+                raw = await reader.readline()
+                if not raw:
+                    break
+                self.bytes_in += len(raw)
+                line = raw.decode("utf-8", errors="replace").strip()
+                if line and self.on_line:
+                    self.on_line(line)
+        except (ConnectionError, OSError):
+            pass
+        if self.writer is writer:
+            # Robot closed the channel (or replaced us with a newer client)
+            print(f"[TcpTransport] connection to {self.host}:{self.port} closed")
+            writer.close()
+            self.reader = self.writer = None
+            self._read_task = None
+
+    async def send(self, command: str):
+        if self.writer is None:
+            await self.connect()
+        data = self._encode(command)
+        try:
+            self.writer.write(data)
+            await self.writer.drain()
+        except (ConnectionError, OSError) as e:
+            # Don't leave the old reader draining the dead socket next to the one connect() starts
+            writer = self.writer
+            self.reader = self.writer = None
+            await self._stop_reader()
+            writer.close()
+            raise TransportError(str(e)) from e
+        self.bytes_out += len(data)
+        return len(data)
+
+    async def _stop_reader(self):
+        task, self._read_task = self._read_task, None
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+            await asyncio.wait([task])
+
+    async def close(self):
+        await self._stop_reader()
+        if self.writer is not None:
+            self.writer.close()
+            try:
+                await self.writer.wait_closed()
+            except (ConnectionError, OSError):
+                pass
+            self.reader = self.writer = None
+
+    @property
+    def connected(self) -> bool:
+        return self.writer is not None and not self.writer.is_closing()
+
+
+def make_transport(kind: str, **opts) -> Transport:
+    """Build a transport by name: 'serial', 'http', 'tcp' or 'sim'."""
+    kinds = {"serial": SerialTransport, "http": HttpTransport, "tcp": TcpTransport}
+    if kind == "sim":
+        from flexibot.simulator import SimTransport  # imports this module
+        kinds["sim"] = SimTransport
+    if kind not in kinds:
+        raise ValueError(f"Unknown transport {kind!r} (expected one of {sorted(kinds)})")
+    return kinds[kind](**opts)
@@ -1,6 +1,12 @@
+import argparse
+import os
 import sys
 import time
-import threading
+
+_T_START = time.perf_counter()
+# Our own CLI flags are parsed below; keep Kivy from trying to parse them.
+os.environ.setdefault("KIVY_NO_ARGS", "1")
+
 from kivy.app import App
 from kivy.clock import Clock
 from kivy.core.window import Window
@@ -11,6 +17,12 @@ from kivy.uix.button import Button
 from kivy.uix.togglebutton import ToggleButton
 from kivy.uix.textinput import TextInput
 from kivy.uix.slider import Slider
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+from kivy.metrics import dp
+from kivy.uix.widget import Widget
+from kivy.graphics import Color, Ellipse
 from kivy.properties import StringProperty
 
 try:
@@ -20,95 +32,19 @@ except ImportError:
     MDApp = App
     MDRaisedButton = Button
     MDFlatButton = Button
-import requests
-import serial
+from flexibot import log
+from flexibot.backend import TELEOP_RATE_HZ, RobotBackend
+from flexibot.calibration import CalibrationCache
+from flexibot.cli import add_link_arguments, fallbacks_from_args, supervised, transport_from_args
+from flexibot.fleet import Fleet
+from flexibot.registry import BODY_MOTORS, CONTROL_ROWS, LIMBS, MOTOR_COMMANDS
+from flexibot.teleop import TeleopStreamer
+from flexibot.transports import Transport
 
 Window.clearcolor = (1, 1, 1, 1)  # White background
 
-# -----------------------------
-# Serial
-# -----------------------------
-#DEFAULT_SERIAL_PORT = '/dev/cu.usbmodem2101'
-DEFAULT_SERIAL_PORT = '/dev/cu.usbmodem211401'
-DEFAULT_BAUD_RATE = 115200
-
-try:
-    ser = serial.Serial(DEFAULT_SERIAL_PORT, DEFAULT_BAUD_RATE, timeout=1)
-    time.sleep(2)
-    print(f"Connected to {DEFAULT_SERIAL_PORT} at {DEFAULT_BAUD_RATE} baud.")
-except serial.SerialException as e:
-    print(f"Error opening serial port {DEFAULT_SERIAL_PORT}: {e}")
-    ser = None
-
-# --------------------------------------------------------------------
-class RobotBackend:
-    def __init__(self, use_wireless=False):
-        self.use_wireless = use_wireless
-        self.ip_address = "192.168.3.1"  # default IP
-        self.status_callback = None
-
-    def set_status_callback(self, callback):
-        """So we can push messages to a UI label from the concurrency thread."""
-        self.status_callback = callback
-
-    def send_command(self, command: str):
-        print(f"[RobotBackend] send_command: {command}")
-        if self.use_wireless:
-            self._send_web_command(command)
-        else:
-            self._send_serial_command(command)
-
-    def _send_web_command(self, command: str):
-        def _threaded_send():
-            try:
-                url = f"http://{self.ip_address}:80/{command}"
-                print(f"[HTTP] GET -> {url}")
-                response = requests.get(url, timeout=5)
-                if response.status_code == 200:
-                    self.update_status("Command Sent Successfully (HTTP)")
-                else:
-                    self.update_status(f"Error: HTTP {response.status_code}")
-            except requests.exceptions.Timeout:
-                self.update_status("Error: HTTP Request Timed Out")
-            except requests.exceptions.ConnectionError:
-                self.update_status("Error: Connection Failed")
-            except Exception as e:
-                self.update_status(f"Error: {e}")
-
-        threading.Thread(target=_threaded_send, daemon=True).start()
-
-    def _send_serial_command(self, command: str):
-        if ser and ser.is_open:
-            full_cmd = command + "\n"
-            ser.write(full_cmd.encode('utf-8'))
-            print(f"Sent (Serial): {command.strip()}")
-        else:
-            print("Serial port not connected.")
-
-    def update_status(self, message):
-        print(f"[RobotBackend] update_status -> {message}")
-        if self.status_callback:
-            self.status_callback(message)
-
-    def read_serial_thread(self):
-        print("[RobotBackend] Serial reading thread started")
-        while True:
-            try:
-                if ser and ser.in_waiting:
-                    line_bytes = ser.readline()
-                    line_str = line_bytes.decode('utf-8').strip()
-                    print(f"Received from serial: {line_str}")
-                    if line_str.startswith("STATUS:"):
-                        msg = line_str.replace("STATUS:", "").strip()
-                        self.update_status(msg)
-            except serial.SerialException:
-                self.update_status("Error: Serial connection lost.")
-                print("Serial connection lost.")
-                break
-            except UnicodeDecodeError:
-                print("UnicodeDecodeError in reading serial.")
-                continue
-            time.sleep(0.01)
+# Startup timings (seconds since process start), filled in as we go
+STARTUP_TIMES = {"import": time.perf_counter() - _T_START}
 
 # --------------------------------------------------------------------
 class StatusLabel(Label):
@@ -123,12 +59,110 @@ class StatusLabel(Label):
         self.text = value
 
 
+class LatencyLabel(Label):
+    """Small overlay with command round-trip percentiles, refreshed once a second."""
+    def __init__(self, backend: RobotBackend, **kwargs):
+        kwargs.setdefault('font_size', '14sp')
+        super().__init__(**kwargs)
+        self.backend = backend
+        self.color = (0.3, 0.3, 0.3, 1)
+        self.text = "latency: no acks yet"
+        self._event = Clock.schedule_interval(self.refresh, 1.0)
+
+    def refresh(self, dt):
+        self.backend.latency.expire()
+        if self.backend.latency.counters["acked"]:
+            self.text = self.backend.latency.overlay_text()
+
+
+class ScrollbackView(RecycleView):
+    """Recent status messages and robot output; only the visible rows are widgets."""
+    def __init__(self, max_lines=500, **kwargs):
+        super().__init__(**kwargs)
+        self.max_lines = max_lines
+        self.viewclass = 'Label'
+        layout = RecycleBoxLayout(orientation='vertical', size_hint_y=None,
+                                  default_size=(None, dp(20)), default_size_hint=(1, None))
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+
+    def set_lines(self, lines):
+        self.data = [self._row(line) for line in lines[-self.max_lines:]]
+        self.scroll_y = 0
+
+    def add_lines(self, lines):
+        self.data = (self.data + [self._row(line) for line in lines])[-self.max_lines:]
+        self.scroll_y = 0
+
+    @staticmethod
+    def _row(line):
+        return {'text': line, 'color': (0, 0, 0, 1), 'font_size': '13sp'}
+
+
+class StatusBar(BoxLayout):
+    """Bottom bar shown on every screen: status, robot FSM state, latency, log toggle."""
+    def __init__(self, backend: RobotBackend, on_toggle_log, **kwargs):
+        super().__init__(orientation='horizontal', spacing=5, **kwargs)
+        self.status_label = StatusLabel(size_hint=(0.5,1))
+        self.fsm_label = Label(text="FSM: ?", color=(0.2,0.2,0.5,1), font_size='14sp', size_hint=(0.15,1))
+        self.latency_label = LatencyLabel(backend, size_hint=(0.25,1))
+        self.btn_log = ToggleButton(text="Log", size_hint=(0.1,1))
+        self.btn_log.bind(state=lambda inst, state: on_toggle_log(state == 'down'))
+        self.add_widget(self.status_label)
+        self.add_widget(self.fsm_label)
+        self.add_widget(self.latency_label)
+        self.add_widget(self.btn_log)
+
+
+class MotorRow(RecycleDataViewBehavior, BoxLayout):
+    """One row of motor buttons; MotorPad hands the same rows out again as it scrolls."""
+    def __init__(self, **kwargs):
+        super().__init__(orientation='horizontal', spacing=5, **kwargs)
+        self.send = None
+
+    def refresh_view_attrs(self, rv, index, data):
+        self.send = rv.send
+        buttons = data['buttons']
+        while len(self.children) < len(buttons):
+            btn = Button(font_size='24sp')
+            btn.bind(on_press=self.on_button)
+            self.add_widget(btn)
+        while len(self.children) > len(buttons):
+            self.remove_widget(self.children[0])
+        for btn, spec in zip(reversed(self.children), buttons):
+            btn.text = spec.text
+            btn.command = spec.command
+            btn.background_color = (1,0,0,1) if spec.stop else (1,1,1,1)
+            btn.color = (1,1,1,1) if spec.stop else (0,0,0,1)
+        return super().refresh_view_attrs(rv, index, data)
+
+    def on_button(self, btn):
+        self.send(btn.command)
+
+
+class MotorPad(RecycleView):
+    """
+    Buttons for registry ControlRows; send(command_name) is called on a press.
+    Rows are only created for what is on screen, so more limbs scroll
+    instead of adding widgets.
+    """
+    def __init__(self, send, rows, row_height=dp(70), **kwargs):
+        super().__init__(**kwargs)
+        self.send = send
+        self.viewclass = MotorRow
+        layout = RecycleBoxLayout(orientation='vertical', spacing=5, size_hint_y=None,
+                                  default_size=(None, row_height), default_size_hint=(1, None))
+        layout.bind(minimum_height=layout.setter('height'))
+        self.add_widget(layout)
+        self.data = [{'buttons': row.buttons} for row in rows]
+
+
 # ==========================
 # Screen: Main Menu
 # ==========================
 class MainMenuScreen(Screen):
-    """The home screen: big buttons to go to limb, body, calibration/gait."""
-    def __init__(self, backend: RobotBackend, **kwargs):
+    """The home screen: big buttons to go to limb, body, calibration/gait, teleop (and fleet)."""
+    def __init__(self, backend: RobotBackend, fleet: Fleet = None, **kwargs):
         super().__init__(**kwargs)
         self.backend = backend
 
@@ -140,14 +174,22 @@ class MainMenuScreen(Screen):
         btn_limb = Button(text="Limb Control", background_color=(0.5, 0.8, 1, 1), color=(0,0,0,1), size_hint=(1,0.15), font_size='30sp')
         btn_body = Button(text="Body Control", background_color=(0.5, 0.8, 1, 1), color=(0,0,0,1), size_hint=(1,0.15), font_size='30sp')
         btn_calib = Button(text="Calibration & Gait", background_color=(0.5, 0.8, 1, 1), color=(0,0,0,1), size_hint=(1,0.15), font_size='30sp')
+        btn_teleop = Button(text="Teleop", background_color=(0.5, 0.8, 1, 1), color=(0,0,0,1), size_hint=(1,0.15), font_size='30sp')
 
         btn_limb.bind(on_press=self.goto_limb)
         btn_body.bind(on_press=self.goto_body)
         btn_calib.bind(on_press=self.goto_calib)
+        btn_teleop.bind(on_press=self.goto_teleop)
 
         layout.add_widget(btn_limb)
         layout.add_widget(btn_body)
         layout.add_widget(btn_calib)
+        layout.add_widget(btn_teleop)
+
+        if fleet is not None:
+            btn_fleet = Button(text=f"Fleet ({len(fleet.robots)} robots)", background_color=(0.5, 0.8, 1, 1), color=(0,0,0,1), size_hint=(1,0.15), font_size='30sp')
+            btn_fleet.bind(on_press=self.goto_fleet)
+            layout.add_widget(btn_fleet)
 
         self.add_widget(layout)
 
@@ -160,21 +202,27 @@ class MainMenuScreen(Screen):
     def goto_calib(self, instance):
         self.manager.current = "calib_screen"
 
+    def goto_teleop(self, instance):
+        self.manager.current = "teleop_screen"
+
+    def goto_fleet(self, instance):
+        self.manager.current = "fleet_screen"
+
 
 # ==========================
 # Screen: Limb Control
 # ==========================
 class LimbControlScreen(Screen):
     """
-    Controls for Limb1..4 (M1..M8).
-    Added:
+    Controls for Limb1..N (M1..M2N), one row per limb from flexibot.registry.
       - A TextInput for "Duration" (ms)
       - A Slider for "Pulse" (µs, 500..2500)
-    So each button can read these two values before sending the command.
-    
+    Both are folded into one ":pulse_duration" suffix whenever they change,
+    so a press only appends it to the button's command name.
+
     NOTE: On your Arduino side, you might need to parse "pulse_duration" as "1500_2000"
     and split by underscore. Right now, your code might interpret everything after ':'
-    as one integer (duration). 
+    as one integer (duration).
     """
     def __init__(self, backend: RobotBackend, **kwargs):
         super().__init__(**kwargs)
@@ -182,10 +230,10 @@ class LimbControlScreen(Screen):
 
         main_layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
 
-        title = Label(text="Limb Control Screen", font_size='48sp', color=(0,0,0,1))
+        title = Label(text="Limb Control Screen", font_size='48sp', color=(0,0,0,1), size_hint=(1,0.15))
         main_layout.add_widget(title)
 
-        config_box = BoxLayout(orientation='horizontal', spacing=10, size_hint=(1, 0.15))
+        config_box = BoxLayout(orientation='horizontal', spacing=10, size_hint=(1, 0.1))
 
         self.duration_input = TextInput(
             text='500',
@@ -195,163 +243,17 @@ class LimbControlScreen(Screen):
         )
         config_box.add_widget(self.duration_input)
 
-
         self.pulse_slider = Slider(min=500, max=2500, value=1500, step=50, size_hint=(0.7, 1))
         config_box.add_widget(self.pulse_slider)
 
         main_layout.add_widget(config_box)
 
-        def getPulseDuration():
-            dur_str = self.duration_input.text.strip()
-            if not dur_str.isdigit():
-                dur_str = "500"
-            pulse_val = int(self.pulse_slider.value)
-            return f"{pulse_val}_{dur_str}"  # e.g. "1500_2000"
-
-
-        limb1_box = BoxLayout(orientation='horizontal', spacing=5, size_hint=(1,0.15))
-
-        btn_l1_m1_cw = Button(text="L1 M1 CW", color=(0,0,0,1),font_size='24sp')
-        btn_l1_m2_cw = Button(text="L1 M2 CW", color=(0,0,0,1),font_size='24sp')
-        btn_l1_m1_ccw = Button(text="L1 M1 CCW", color=(0,0,0,1),font_size='24sp')
-        btn_l1_m2_ccw = Button(text="L1 M2 CCW", color=(0,0,0,1),font_size='24sp')
-        btn_l1_stop = Button(text="Stop L1", background_color=(1,0,0,1), color=(1,1,1,1),font_size='24sp')
-
-        ##############################
-        # Limb1 => M1 & M2
-        ##############################
-        limb1_box = BoxLayout(orientation='horizontal', spacing=5, size_hint=(1,0.15))
-
-        btn_l1_m1_cw = Button(text="L1 M1 CW", color=(0,0,0,1),font_size='24sp')
-        btn_l1_m1_ccw = Button(text="L1 M1 CCW", color=(0,0,0,1),font_size='24sp')
-        btn_l1_m2_cw = Button(text="L1 M2 CW", color=(0,0,0,1),font_size='24sp')
-        btn_l1_m2_ccw = Button(text="L1 M2 CCW", color=(0,0,0,1),font_size='24sp')
-        btn_l1_stop = Button(text="Stop L1", background_color=(1,0,0,1), color=(1,1,1,1),font_size='24sp')
-
-        btn_l1_m1_cw.bind(
-            on_press=lambda x: self.backend.send_command(f"ROTATE_M1_CW:{getPulseDuration()}")
-        )
-        btn_l1_m1_ccw.bind(
-            on_press=lambda x: self.backend.send_command(f"ROTATE_M1_CCW:{getPulseDuration()}")
-        )
-        btn_l1_m2_cw.bind(
-            on_press=lambda x: self.backend.send_command(f"ROTATE_M2_CW:{getPulseDuration()}")
-        )
-        btn_l1_m2_ccw.bind(
-            on_press=lambda x: self.backend.send_command(f"ROTATE_M2_CCW:{getPulseDuration()}")
-        )
-        btn_l1_stop.bind(
-            on_press=lambda x: self.backend.send_command("STOP_M1_M2_MOTORS")
-        )
-
-        limb1_box.add_widget(btn_l1_m1_cw)
-        limb1_box.add_widget(btn_l1_m1_ccw)
-        limb1_box.add_widget(btn_l1_m2_cw)
-        limb1_box.add_widget(btn_l1_m2_ccw)
-        limb1_box.add_widget(btn_l1_stop)
-        main_layout.add_widget(limb1_box)
-
-        ##############################
-        # Limb2 => M3 & M4
-        ##############################
-        limb2_box = BoxLayout(orientation='horizontal', spacing=5, size_hint=(1,0.15))
-
-        btn_l2_m3_cw = Button(text="L2 M3 CW", color=(0,0,0,1), font_size='24sp')
-        btn_l2_m3_ccw = Button(text="L2 M3 CCW", color=(0,0,0,1), font_size='24sp')
-        btn_l2_m4_cw = Button(text="L2 M4 CW", color=(0,0,0,1), font_size='24sp')
-        btn_l2_m4_ccw = Button(text="L2 M4 CCW", color=(0,0,0,1), font_size='24sp')
-        btn_l2_stop = Button(text="Stop L2", background_color=(1,0,0,1), color=(1,1,1,1), font_size='24sp')
-
-        btn_l2_m3_cw.bind(
-            on_press=lambda x: self.backend.send_command(f"ROTATE_M3_CW:{getPulseDuration()}")
-        )
-        btn_l2_m3_ccw.bind(
-            on_press=lambda x: self.backend.send_command(f"ROTATE_M3_CCW:{getPulseDuration()}")
-        )
-        btn_l2_m4_cw.bind(
-            on_press=lambda x: self.backend.send_command(f"ROTATE_M4_CW:{getPulseDuration()}")
-        )
-        btn_l2_m4_ccw.bind(
-            on_press=lambda x: self.backend.send_command(f"ROTATE_M4_CCW:{getPulseDuration()}")
-        )
-        btn_l2_stop.bind(
-            on_press=lambda x: self.backend.send_command("STOP_M3_M4_MOTORS")
-        )
-
-        limb2_box.add_widget(btn_l2_m3_cw)
-        limb2_box.add_widget(btn_l2_m3_ccw)
-        limb2_box.add_widget(btn_l2_m4_cw)
-        limb2_box.add_widget(btn_l2_m4_ccw)
-        limb2_box.add_widget(btn_l2_stop)
-        main_layout.add_widget(limb2_box)
-
-        ##############################
-        # Limb3 => M5 & M6
-        ##############################
-        limb3_box = BoxLayout(orientation='horizontal', spacing=5, size_hint=(1,0.15))
-
-        btn_l3_m5_cw = Button(text="L3 M5 CW", color=(0,0,0,1), font_size='24sp')
-        btn_l3_m5_ccw = Button(text="L3 M5 CCW", color=(0,0,0,1), font_size='24sp')
-        btn_l3_m6_cw = Button(text="L3 M6 CW", color=(0,0,0,1), font_size='24sp')
-        btn_l3_m6_ccw = Button(text="L3 M6 CCW", color=(0,0,0,1), font_size='24sp')
-        btn_l3_stop = Button(text="Stop L3", background_color=(1,0,0,1), color=(1,1,1,1), font_size='24sp')
-
-        btn_l3_m5_cw.bind(
-            on_press=lambda x: self.backend.send_command(f"ROTATE_M5_CW:{getPulseDuration()}")
-        )
-        btn_l3_m5_ccw.bind(
-            on_press=lambda x: self.backend.send_command(f"ROTATE_M5_CCW:{getPulseDuration()}")
-        )
-        btn_l3_m6_cw.bind(
-            on_press=lambda x: self.backend.send_command(f"ROTATE_M6_CW:{getPulseDuration()}")
-        )
-        btn_l3_m6_ccw.bind(
-            on_press=lambda x: self.backend.send_command(f"ROTATE_M6_CCW:{getPulseDuration()}")
-        )
-        btn_l3_stop.bind(
-            on_press=lambda x: self.backend.send_command("STOP_M5_M6_MOTORS")
-        )
+        self._suffix = ""
+        self._update_suffix()
+        self.duration_input.bind(text=self._update_suffix)
+        self.pulse_slider.bind(value=self._update_suffix)
 
-        limb3_box.add_widget(btn_l3_m5_cw)
-        limb3_box.add_widget(btn_l3_m5_ccw)
-        limb3_box.add_widget(btn_l3_m6_cw)
-        limb3_box.add_widget(btn_l3_m6_ccw)
-        limb3_box.add_widget(btn_l3_stop)
-        main_layout.add_widget(limb3_box)
-
-        ##############################
-        # Limb4 => M7 & M8
-        ##############################
-        limb4_box = BoxLayout(orientation='horizontal', spacing=5, size_hint=(1,0.15))
-
-        btn_l4_m7_cw = Button(text="L4 M7 CW", color=(0,0,0,1), font_size='24sp')
-        btn_l4_m7_ccw = Button(text="L4 M7 CCW", color=(0,0,0,1), font_size='24sp')
-        btn_l4_m8_cw = Button(text="L4 M8 CW", color=(0,0,0,1), font_size='24sp')
-        btn_l4_m8_ccw = Button(text="L4 M8 CCW", color=(0,0,0,1), font_size='24sp')
-        btn_l4_stop = Button(text="Stop L4", background_color=(1,0,0,1), color=(1,1,1,1), font_size='24sp')
-
-        btn_l4_m7_cw.bind(
-            on_press=lambda x: self.backend.send_command(f"ROTATE_M7_CW:{getPulseDuration()}")
-        )
-        btn_l4_m7_ccw.bind(
-            on_press=lambda x: self.backend.send_command(f"ROTATE_M7_CCW:{getPulseDuration()}")
-        )
-        btn_l4_m8_cw.bind(
-            on_press=lambda x: self.backend.send_command(f"ROTATE_M8_CW:{getPulseDuration()}")
-        )
-        btn_l4_m8_ccw.bind(
-            on_press=lambda x: self.backend.send_command(f"ROTATE_M8_CCW:{getPulseDuration()}")
-        )
-        btn_l4_stop.bind(
-            on_press=lambda x: self.backend.send_command("STOP_M7_M8_MOTORS")
-        )
-
-        limb4_box.add_widget(btn_l4_m7_cw)
-        limb4_box.add_widget(btn_l4_m7_ccw)
-        limb4_box.add_widget(btn_l4_m8_cw)
-        limb4_box.add_widget(btn_l4_m8_ccw)
-        limb4_box.add_widget(btn_l4_stop)
-        main_layout.add_widget(limb4_box)
+        main_layout.add_widget(MotorPad(self.send, CONTROL_ROWS["limbs"], size_hint=(1,0.6)))
 
         btn_back = Button(text="<< Back to Main Menu", size_hint=(1,0.15),
                           background_color=(0.6,0.6,0.6,1), color=(0,0,0,1), font_size='24sp')
@@ -360,52 +262,40 @@ class LimbControlScreen(Screen):
 
         self.add_widget(main_layout)
 
+    def _update_suffix(self, *args):
+        dur_str = self.duration_input.text.strip()
+        if not dur_str.isdigit():
+            dur_str = "500"
+        self._suffix = f":{int(self.pulse_slider.value)}_{dur_str}"  # e.g. ":1500_2000"
+
+    def send(self, name):
+        if MOTOR_COMMANDS[name].kind == "rotate":
+            name += self._suffix
+        self.backend.send_command(name)
+
 
 # ==========================
 # Screen: Body Control
 # ==========================
 class BodyControlScreen(Screen):
     """
-    Controls for M9..M10 (body motors), plus stand/sit, etc.
+    Controls for the body motors (M9..), plus stand/sit, etc.
     """
+    ROTATE_MS = 500
+
     def __init__(self, backend: RobotBackend, **kwargs):
         super().__init__(**kwargs)
         self.backend = backend
+        # Every command this screen sends, built once
+        self._commands = {name: f"{name}:{self.ROTATE_MS}" if c.kind == "rotate" else name
+                          for name, c in MOTOR_COMMANDS.items()}
 
         layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
 
-        title = Label(text="Body Control Screen", font_size='48sp', color=(0,0,0,1))
+        title = Label(text="Body Control Screen", font_size='48sp', color=(0,0,0,1), size_hint=(1,0.15))
         layout.add_widget(title)
 
-        # Body Motor 1 => M9
-        box_m9 = BoxLayout(orientation='horizontal', spacing=5, size_hint=(1,0.15))
-        btn_m9_cw = Button(text="Body1 CW", color=(0,0,0,1), font_size='24sp')
-        btn_m9_ccw = Button(text="Body1 CCW", color=(0,0,0,1), font_size='24sp')
-        btn_m9_stop = Button(text="Stop Body1", background_color=(1,0,0,1), color=(1,1,1,1), font_size='24sp')
-
-        btn_m9_cw.bind(on_press=lambda x: self.backend.send_command("ROTATE_BODY1_CW:500"))
-        btn_m9_ccw.bind(on_press=lambda x: self.backend.send_command("ROTATE_BODY1_CCW:500"))
-        btn_m9_stop.bind(on_press=lambda x: self.backend.send_command("STOP_BODY1"))
-
-        box_m9.add_widget(btn_m9_cw)
-        box_m9.add_widget(btn_m9_ccw)
-        box_m9.add_widget(btn_m9_stop)
-        layout.add_widget(box_m9)
-
-        # Body Motor 2 => M10
-        box_m10 = BoxLayout(orientation='horizontal', spacing=5, size_hint=(1,0.15))
-        btn_m10_cw = Button(text="Body2 CW", color=(0,0,0,1), font_size='24sp')
-        btn_m10_ccw = Button(text="Body2 CCW", color=(0,0,0,1), font_size='24sp')
-        btn_m10_stop = Button(text="Stop Body2", background_color=(1,0,0,1), color=(1,1,1,1), font_size='24sp')
-
-        btn_m10_cw.bind(on_press=lambda x: self.backend.send_command("ROTATE_BODY2_CW:500"))
-        btn_m10_ccw.bind(on_press=lambda x: self.backend.send_command("ROTATE_BODY2_CCW:500"))
-        btn_m10_stop.bind(on_press=lambda x: self.backend.send_command("STOP_BODY2"))
-
-        box_m10.add_widget(btn_m10_cw)
-        box_m10.add_widget(btn_m10_ccw)
-        box_m10.add_widget(btn_m10_stop)
-        layout.add_widget(box_m10)
+        layout.add_widget(MotorPad(self.send, CONTROL_ROWS["body"], size_hint=(1,0.4)))
 
         # Stand Up / Sit Down
         box_stand = BoxLayout(orientation='horizontal', spacing=5, size_hint=(1,0.15))
@@ -426,18 +316,23 @@ class BodyControlScreen(Screen):
 
         self.add_widget(layout)
 
+    def send(self, name):
+        self.backend.send_command(self._commands[name])
+
 
 # ==========================
 # Screen: Calibration & Gait
 # ==========================
 class CalibGaitScreen(Screen):
     """
-    Contains calibration, crawling/walking/fast crawl, speed slider, status label.
+    Contains calibration, crawling/walking/fast crawl, speed slider, host-planned gaits.
     """
 
-    def __init__(self, backend: RobotBackend, **kwargs):
+    def __init__(self, backend: RobotBackend, calib_cache: CalibrationCache = None, robot="morphbot", **kwargs):
         super().__init__(**kwargs)
         self.backend = backend
+        self.calib_cache = calib_cache
+        self.robot = robot
 
         main_layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
 
@@ -456,12 +351,15 @@ class CalibGaitScreen(Screen):
         btn_cal_limb3.bind(on_press=lambda x: self.backend.send_command("CALIBRATE_LIMB:3"))
         btn_cal_limb4.bind(on_press=lambda x: self.backend.send_command("CALIBRATE_LIMB:4"))
         btn_cal_all.bind(on_press=lambda x: self.backend.send_command("CALIBRATE_ALL_LIMBS"))
+        btn_cal_restore = Button(text="Restore Cal", background_color=(0,0.3,0.5,1), color=(1,1,1,1), font_size='24sp')
+        btn_cal_restore.bind(on_press=lambda x: self.restore_calibration())
 
         cal_box.add_widget(btn_cal_limb1)
         cal_box.add_widget(btn_cal_limb2)
         cal_box.add_widget(btn_cal_limb3)
         cal_box.add_widget(btn_cal_limb4)
         cal_box.add_widget(btn_cal_all)
+        cal_box.add_widget(btn_cal_restore)
         main_layout.add_widget(cal_box)
 
         # Gait Row
@@ -492,9 +390,26 @@ class CalibGaitScreen(Screen):
         slider_box.add_widget(self.speed_slider)
         main_layout.add_widget(slider_box)
 
-        self.status_label = StatusLabel(size_hint=(1,0.15))
-        main_layout.add_widget(self.status_label)
-        self.backend.set_status_callback(self.update_status_label)
+        # Host-planned gaits (flexibot.gait_planner), streamed as POSE frames
+        planner_box = BoxLayout(orientation='horizontal', spacing=5, size_hint=(1,0.15))
+        btn_host_crawl = Button(text="HOST CRAWL", background_color=(1,0.65,0,1), color=(0,0,0,1), font_size='24sp')
+        btn_host_fast = Button(text="HOST FAST", background_color=(1,0.65,0,1), color=(0,0,0,1), font_size='24sp')
+        btn_host_stop = Button(text="STOP HOST", background_color=(1,0,0,1), color=(1,1,1,1), font_size='24sp')
+        self.lbl_period = Label(text="Period: 12.0 s", color=(0,0,0,1), font_size='20sp', size_hint=(0.6,1))
+        self.period_slider = Slider(min=2000, max=20000, value=12000, step=250, size_hint=(1.2,1))
+        self.period_slider.bind(value=self.on_period_slider)
+
+        btn_host_crawl.bind(on_press=lambda x: self.start_host_gait("crawl"))
+        btn_host_fast.bind(on_press=lambda x: self.start_host_gait("fastcrawl"))
+        btn_host_stop.bind(on_press=lambda x: self.stop_host_gait())
+
+        planner_box.add_widget(btn_host_crawl)
+        planner_box.add_widget(btn_host_fast)
+        planner_box.add_widget(btn_host_stop)
+        planner_box.add_widget(self.lbl_period)
+        planner_box.add_widget(self.period_slider)
+        main_layout.add_widget(planner_box)
+        self.gait_streamer = None
 
         btn_back = Button(text="<< Back to Main Menu", size_hint=(1,0.15),
                           background_color=(0.6,0.6,0.6,1), color=(0,0,0,1), font_size='24sp')
@@ -509,59 +424,435 @@ class CalibGaitScreen(Screen):
             return super().on_enter(*args)
 
     def on_leave(self, *args):
+        self.stop_host_gait()
         print("[CalibGaitScreen] on_leave -> sending SET_MODE:INDIVIDUAL (optional)")
         self.backend.send_command("SET_MODE:INDIVIDUAL")
         return super().on_leave(*args)
 
+    def restore_calibration(self):
+        """Cached profile in one command; only limbs without a usable one are calibrated (off the UI thread)."""
+        if self.calib_cache is None:
+            return
+        print(f"[CalibGaitScreen] Restoring calibration for {self.robot}")
+        self.calib_cache.restore_in_background(self.backend, self.robot)
+
     def on_speed_slider(self, instance, value):
-        print(f"[CalibGaitScreen] Speed slider => {value}")
+        log.debug("[CalibGaitScreen] Speed slider => %s", value)
         cmd = f"SET_SPEED:{int(value)}"
-        self.backend.send_command(cmd)
+        self.backend.send_coalesced(cmd)
+
+    def start_host_gait(self, gait):
+        # NumPy comes in with the planner; only pay for it when it is used
+        from flexibot.gait_planner import GaitStreamer, make_params
+        self.stop_host_gait()
+        # Pulls ease out from each motor's calibrated neutral, as LimbControl does
+        neutrals = self.calib_cache.limb_neutrals(self.robot) if self.calib_cache is not None else None
+        params = make_params(gait, period_ms=int(self.period_slider.value), neutrals=neutrals)
+        print(f"[CalibGaitScreen] Host gait => {gait}")
+        self.gait_streamer = GaitStreamer(self.backend, params)
+        self.gait_streamer.start()
+        self.backend.update_status(f"Host gait: {gait}")
+
+    def stop_host_gait(self):
+        if self.gait_streamer is not None:
+            self.gait_streamer.stop()
+            self.gait_streamer = None
+
+    def on_period_slider(self, instance, value):
+        self.lbl_period.text = f"Period: {value / 1000:.1f} s"
+        if self.gait_streamer is not None:
+            self.gait_streamer.update(period_ms=int(value))
+
+
+# ==========================
+# Screen: Teleop
+# ==========================
+class Joystick(Widget):
+    """Touch joystick; calls on_move(x, y) with -1..1 per axis and springs back to 0 on release."""
+    def __init__(self, on_move, **kwargs):
+        super().__init__(**kwargs)
+        self.on_move = on_move
+        self.value = (0.0, 0.0)
+        with self.canvas:
+            Color(0.85, 0.85, 0.85, 1)
+            self._base = Ellipse()
+            Color(0.2, 0.4, 0.8, 1)
+            self._knob = Ellipse()
+        self.bind(pos=self._redraw, size=self._redraw)
+
+    def _radius(self):
+        return 0.45 * min(self.width, self.height)
+
+    def _redraw(self, *args):
+        r = self._radius()
+        kr = 0.35 * r
+        cx, cy = self.center
+        x, y = self.value
+        self._base.pos, self._base.size = (cx - r, cy - r), (2 * r, 2 * r)
+        self._knob.pos = (cx + x * (r - kr) - kr, cy + y * (r - kr) - kr)
+        self._knob.size = (2 * kr, 2 * kr)
+
+    def _set(self, x, y):
+        self.value = (x, y)
+        self._redraw()
+        self.on_move(x, y)
+
+    def _track(self, touch):
+        r = self._radius() or 1.0
+        x = (touch.x - self.center_x) / r
+        y = (touch.y - self.center_y) / r
+        norm = max(1.0, (x * x + y * y) ** 0.5)
+        self._set(x / norm, y / norm)
+
+    def on_touch_down(self, touch):
+        if self.collide_point(*touch.pos):
+            touch.grab(self)
+            self._track(touch)
+            return True
+        return super().on_touch_down(touch)
+
+    def on_touch_move(self, touch):
+        if touch.grab_current is self:
+            self._track(touch)
+            return True
+        return super().on_touch_move(touch)
+
+    def on_touch_up(self, touch):
+        if touch.grab_current is self:
+            touch.ungrab(self)
+            self._set(0.0, 0.0)
+            return True
+        return super().on_touch_up(touch)
+
+
+class TeleopScreen(Screen):
+    """
+    Continuous driving: one joystick per limb (x = top motor, y = bottom
+    motor) plus one for BODY1/BODY2, and held keys. Targets are streamed
+    by flexibot.teleop at a fixed rate; only changes go out.
+    """
+    # Held key -> (motor, direction); + is CW
+    KEY_BINDINGS = {
+        'q': ("M1", 1), 'a': ("M1", -1), 'w': ("M2", 1), 's': ("M2", -1),
+        'e': ("M3", 1), 'd': ("M3", -1), 'r': ("M4", 1), 'f': ("M4", -1),
+        't': ("M5", 1), 'g': ("M5", -1), 'y': ("M6", 1), 'h': ("M6", -1),
+        'u': ("M7", 1), 'j': ("M7", -1), 'i': ("M8", 1), 'k': ("M8", -1),
+        'o': ("BODY1", 1), 'l': ("BODY1", -1), 'p': ("BODY2", 1), ';': ("BODY2", -1),
+    }
+    STICKS = tuple((f"L{limb}", top.name, bottom.name) for limb, (top, bottom) in LIMBS) + \
+        (("Body", BODY_MOTORS[0].name, BODY_MOTORS[1].name),)
+
+    def __init__(self, backend: RobotBackend, rate_hz=TELEOP_RATE_HZ, **kwargs):
+        super().__init__(**kwargs)
+        self.backend = backend
+        self.teleop = TeleopStreamer(backend, rate_hz=rate_hz)
+
+        main_layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        main_layout.add_widget(Label(text="Teleop", font_size='48sp', color=(0,0,0,1), size_hint=(1,0.15)))
+
+        sticks_box = BoxLayout(orientation='horizontal', spacing=10, size_hint=(1,0.5))
+        for name, motor_x, motor_y in self.STICKS:
+            col = BoxLayout(orientation='vertical')
+            col.add_widget(Label(text=f"{name} ({motor_x} / {motor_y})", color=(0,0,0,1),
+                                 font_size='18sp', size_hint=(1,0.15)))
+            col.add_widget(Joystick(lambda x, y, mx=motor_x, my=motor_y: self.on_stick(mx, my, x, y)))
+            sticks_box.add_widget(col)
+        main_layout.add_widget(sticks_box)
+
+        speed_box = BoxLayout(orientation='horizontal', spacing=5, size_hint=(1,0.1))
+        speed_box.add_widget(Label(text="Key speed:", color=(0,0,0,1), font_size='20sp', size_hint=(0.2,1)))
+        self.key_speed = Slider(min=0.1, max=1.0, value=0.6, size_hint=(0.8,1))
+        speed_box.add_widget(self.key_speed)
+        main_layout.add_widget(speed_box)
+
+        main_layout.add_widget(Label(
+            text="Keys: q/a w/s e/d r/f t/g y/h u/j i/k = M1..M8 CW/CCW, o/l p/; = Body1/Body2",
+            color=(0.3,0.3,0.3,1), font_size='16sp', size_hint=(1,0.08)))
+
+        btn_stop = Button(text="STOP ALL", background_color=(1,0,0,1), color=(1,1,1,1),
+                          font_size='24sp', size_hint=(1,0.12))
+        btn_stop.bind(on_press=lambda x: self.teleop.release_all())
+        main_layout.add_widget(btn_stop)
+
+        btn_back = Button(text="<< Back to Main Menu", size_hint=(1,0.12),
+                          background_color=(0.6,0.6,0.6,1), color=(0,0,0,1), font_size='24sp')
+        btn_back.bind(on_press=lambda x: setattr(self.manager, 'current', 'main_menu'))
+        main_layout.add_widget(btn_back)
+
+        self.add_widget(main_layout)
+
+    def on_enter(self, *args):
+        print("[TeleopScreen] on_enter -> SET_MODE:INDIVIDUAL, streaming")
+        self.backend.send_command("SET_MODE:INDIVIDUAL")
+        self.teleop.start()
+        Window.bind(on_key_down=self.on_key_down, on_key_up=self.on_key_up)
+        return super().on_enter(*args)
+
+    def on_leave(self, *args):
+        Window.unbind(on_key_down=self.on_key_down, on_key_up=self.on_key_up)
+        self.teleop.stop()
+        return super().on_leave(*args)
+
+    def on_stick(self, motor_x, motor_y, x, y):
+        self.teleop.set_axis(motor_x, x)
+        self.teleop.set_axis(motor_y, y)
+
+    @staticmethod
+    def _key_char(key, codepoint=None):
+        if codepoint:
+            return codepoint.lower()
+        return chr(key) if 0 < key < 256 else None
+
+    def on_key_down(self, window, key, scancode, codepoint=None, modifiers=None):
+        binding = self.KEY_BINDINGS.get(self._key_char(key, codepoint))
+        if binding is None:
+            return False
+        motor, direction = binding
+        # Key repeat calls this again while held; the target is unchanged so nothing is sent
+        self.teleop.set_axis(motor, direction * self.key_speed.value)
+        return True
+
+    def on_key_up(self, window, key, scancode=None, *args):
+        binding = self.KEY_BINDINGS.get(self._key_char(key))
+        if binding is None:
+            return False
+        self.teleop.release(binding[0])
+        return True
+
+
+# ==========================
+# Screen: Fleet
+# ==========================
+class FleetScreen(Screen):
+    """Status and latency of every robot, and group commands with a synchronized start."""
+    BROADCASTS = ("STAND_UP", "SIT_DOWN", "SET_MODE:GAIT", "START_CRAWLING", "STOP_GAIT")
+    REFRESH_S = 0.5
+
+    def __init__(self, fleet: Fleet, **kwargs):
+        super().__init__(**kwargs)
+        self.fleet = fleet
+        self._refresh_event = None
+
+        main_layout = BoxLayout(orientation='vertical', spacing=10, padding=10)
+        main_layout.add_widget(Label(text="Fleet", font_size='48sp', color=(0,0,0,1), size_hint=(1,0.12)))
+
+        self.overview_label = Label(text="", color=(0,0,0,1), font_size='18sp', size_hint=(1,0.45),
+                                    halign='left', valign='top')
+        self.overview_label.bind(size=lambda w, size: setattr(w, 'text_size', size))
+        main_layout.add_widget(self.overview_label)
+
+        group_box = BoxLayout(orientation='horizontal', spacing=5, size_hint=(1,0.12))
+        for command in self.BROADCASTS:
+            btn = Button(text=command, background_color=(1,0.84,0,1), color=(0,0,0,1), font_size='20sp')
+            btn.bind(on_press=lambda x, c=command: self.broadcast(c))
+            group_box.add_widget(btn)
+        main_layout.add_widget(group_box)
+
+        self.skew_label = Label(text="", color=(0.3,0.3,0.3,1), font_size='16sp', size_hint=(1,0.06))
+        main_layout.add_widget(self.skew_label)
 
-    def update_status_label(self, message):
-        self.status_label.status_text = message
+        btn_stop = Button(text="STOP ALL ROBOTS", background_color=(1,0,0,1), color=(1,1,1,1),
+                          font_size='24sp', size_hint=(1,0.12))
+        btn_stop.bind(on_press=lambda x: self.fleet.stop_all())
+        main_layout.add_widget(btn_stop)
+
+        btn_back = Button(text="<< Back to Main Menu", size_hint=(1,0.12),
+                          background_color=(0.6,0.6,0.6,1), color=(0,0,0,1), font_size='24sp')
+        btn_back.bind(on_press=lambda x: setattr(self.manager, 'current', 'main_menu'))
+        main_layout.add_widget(btn_back)
+
+        self.add_widget(main_layout)
+
+    def broadcast(self, command):
+        result = self.fleet.broadcast(command)
+        # dispatch times are filled in on the link loop once the start time comes
+        Clock.schedule_once(lambda dt: self._show_skew(result), self.fleet.lead_s + 0.05)
+
+    def _show_skew(self, result):
+        self.skew_label.text = (f"{result.command} -> {len(result.futures)} robots, "
+                                f"send spread {result.dispatch_skew_ms():.1f} ms")
+
+    def refresh(self, dt=None):
+        self.overview_label.text = self.fleet.overview_text()
+
+    def on_enter(self, *args):
+        self.refresh()
+        self._refresh_event = Clock.schedule_interval(self.refresh, self.REFRESH_S)
+        return super().on_enter(*args)
+
+    def on_leave(self, *args):
+        if self._refresh_event is not None:
+            self._refresh_event.cancel()
+            self._refresh_event = None
+        return super().on_leave(*args)
 
 
 # ==========================
 # The main App
 # ==========================
-class MultiWindowRobotApp(App):
-    def __init__(self, use_wireless=False, **kwargs):
+class LazyScreenManager(ScreenManager):
+    """
+    ScreenManager that builds a screen the first time it is shown.
+    Register a factory with `register(name, factory)`; `factory(name=...)`
+    must return the Screen.
+    """
+    def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.use_wireless = use_wireless
-        self.backend = RobotBackend(use_wireless=self.use_wireless)
+        self._factories = {}
 
-    def build(self):
-        self.title = "Robot Control HMI"
+    def register(self, name, factory):
+        self._factories[name] = factory
 
-        sm = ScreenManager()
+    def on_current(self, instance, value):
+        if value and not self.has_screen(value) and value in self._factories:
+            t0 = time.perf_counter()
+            self.add_widget(self._factories.pop(value)(name=value))
+            print(f"[LazyScreenManager] built {value} in {(time.perf_counter()-t0)*1000:.1f} ms")
+        return super().on_current(instance, value)
 
-        main_menu = MainMenuScreen(self.backend, name='main_menu')
-        limb_screen = LimbControlScreen(self.backend, name='limb_screen')
-        body_screen = BodyControlScreen(self.backend, name='body_screen')
-        calib_screen = CalibGaitScreen(self.backend, name='calib_screen')
 
-        sm.add_widget(main_menu)
-        sm.add_widget(limb_screen)
-        sm.add_widget(body_screen)
-        sm.add_widget(calib_screen)
+class MultiWindowRobotApp(App):
+    def __init__(self, use_wireless=False, transport: Transport = None, teleop_rate=TELEOP_RATE_HZ,
+                 fleet_specs=(), fallbacks=None, robot="morphbot", **kwargs):
+        super().__init__(**kwargs)
+        self.robot = robot
+        self.calib_cache = CalibrationCache()
+        self.use_wireless = use_wireless
+        self.fallbacks = fallbacks  # None = unsupervised link
+        self.teleop_rate = teleop_rate
+        self.fleet = None
+        if fleet_specs:
+            # The screens drive "main"; the fleet screen drives everyone, all on one link loop.
+            # Every robot gets the supervision the single-robot path would give it
+            self.fleet = Fleet()
+            self.backend = self.fleet.add("main", transport, fallbacks=fallbacks)
+            for name, spec, robot_fallbacks in fleet_specs:
+                self.fleet.add(name, spec, fallbacks=robot_fallbacks)
+        else:
+            self.backend = RobotBackend(use_wireless=self.use_wireless, transport=transport)
 
-        threading.Thread(target=self.backend.read_serial_thread, daemon=True).start()
+    def build(self):
+        self.title = "Robot Control HMI"
 
-        return sm
+        sm = LazyScreenManager()
+        sm.add_widget(MainMenuScreen(self.backend, self.fleet, name='main_menu'))
+        sm.register('limb_screen', lambda **kw: LimbControlScreen(self.backend, **kw))
+        sm.register('body_screen', lambda **kw: BodyControlScreen(self.backend, **kw))
+        sm.register('calib_screen', lambda **kw: CalibGaitScreen(self.backend, self.calib_cache, self.robot, **kw))
+        sm.register('teleop_screen', lambda **kw: TeleopScreen(self.backend, self.teleop_rate, **kw))
+        if self.fleet is not None:
+            sm.register('fleet_screen', lambda **kw: FleetScreen(self.fleet, **kw))
+
+        # Status bar and scrollback live outside the screens, so every screen shows them
+        root = BoxLayout(orientation='vertical')
+        self.scrollback = ScrollbackView(size_hint=(1,0), opacity=0)
+        self.status_bar = StatusBar(self.backend, self.toggle_scrollback, size_hint=(1,0.07))
+        root.add_widget(sm)
+        root.add_widget(self.scrollback)
+        root.add_widget(self.status_bar)
+        # Background threads only queue status; it reaches the widgets here, once per frame
+        Clock.schedule_interval(self._drain_status, 0)
+
+        STARTUP_TIMES["build"] = time.perf_counter() - _T_START
+        Clock.schedule_once(self._on_first_frame, 0)
+        # Every frame: how long the UI thread took since the last one
+        self._frame_time = self.backend.metrics.histogram("flexibot_ui_frame_seconds",
+                                                          "Kivy frame interval")
+        Clock.schedule_interval(lambda dt: self._frame_time.observe(dt), 0)
+        return root
+
+    def toggle_scrollback(self, show):
+        if show:
+            self.scrollback.set_lines(self.backend.status.lines())
+        self.scrollback.size_hint_y = 0.3 if show else 0
+        self.scrollback.opacity = 1 if show else 0
+
+    def _drain_status(self, dt):
+        changed, lines = self.backend.status.drain()
+        if "status" in changed:
+            self.status_bar.status_label.status_text = changed["status"]
+        if "fsm" in changed:
+            self.status_bar.fsm_label.text = f"FSM: {changed['fsm']}"
+        if lines and self.scrollback.opacity:
+            self.scrollback.add_lines(lines)
+
+    def _on_first_frame(self, dt):
+        STARTUP_TIMES["first_frame"] = time.perf_counter() - _T_START
+        print(f"[Startup] import {STARTUP_TIMES['import']:.3f}s, build {STARTUP_TIMES['build']:.3f}s, "
+              f"first frame {STARTUP_TIMES['first_frame']:.3f}s")
+        # The window is up; open the link and start reading without blocking the UI
+        self.calib_cache.attach(self.backend, self.robot)
+        if self.fleet is not None:
+            self.fleet.connect()
+            return
+        if self.fallbacks is not None:
+            self.backend.supervise(self.fallbacks)
+        else:
+            self.backend.connect()
+        self.backend.start_reader()
 
     def on_stop(self):
-        if ser and ser.is_open:
-            ser.close()
-            print("Serial connection closed.")
+        if self.fleet is not None:
+            self.fleet.close()
+        else:
+            self.backend.close()
+        print("Robot link closed.")
         print("Application stopped.")
 
 
+# -----------------------------
+# Command line
+# -----------------------------
+def parse_args(argv=None):
+    """
+    Link flags are shared with `python -m flexibot` (see flexibot.cli); the rest
+    also fall back to environment variables: FLEXIBOT_TELEOP_RATE,
+    FLEXIBOT_METRICS_PORT, FLEXIBOT_FLEET.
+    """
+    parser = argparse.ArgumentParser(description="FlexiBot robot control HMI")
+    add_link_arguments(parser)
+    parser.add_argument("--fleet", default=os.environ.get("FLEXIBOT_FLEET", ""),
+                        help="more robots next to the main one, e.g. alpha=tcp:192.168.3.2|http:192.168.3.2,beta=sim "
+                             "(after '|': that robot's fallback links)")
+    parser.add_argument("--teleop-rate", type=float,
+                        default=float(os.environ.get("FLEXIBOT_TELEOP_RATE", TELEOP_RATE_HZ)),
+                        help="teleop update rate in Hz (default %(default)s)")
+    parser.add_argument("--metrics-port", type=int, default=int(os.environ.get("FLEXIBOT_METRICS_PORT", 0)),
+                        help="serve Prometheus metrics on localhost:PORT (0 = off)")
+    return parser.parse_args(argv)
+
+
+def fleet_specs_from_args(args):
+    """
+    'alpha=tcp:192.168.3.2|http:192.168.3.2,beta=sim' ->
+    [("alpha", "tcp:192.168.3.2", ["http:192.168.3.2"]), ("beta", "sim", None)]
+    Fallbacks are None for an unsupervised robot, as flexibot.cli.supervised() decides.
+    """
+    specs = []
+    for item in filter(None, (part.strip() for part in args.fleet.split(","))):
+        name, sep, chain = item.partition("=")
+        spec, *fallbacks = chain.split("|")
+        if not sep or not name or not spec:
+            raise SystemExit(f"--fleet: expected name=spec, got {item!r}")
+        supervise = not args.no_supervise and not spec.startswith("sim")
+        specs.append((name, spec, fallbacks if supervise else None))
+    return specs
+
+
 # -----------------------------
 # Run the Application
 # -----------------------------
 if __name__ == '__main__':
-    choice = input("Use wireless? (y/n): ").strip().lower()
-    use_wireless = (choice.startswith('y'))
-
-    MultiWindowRobotApp(use_wireless=use_wireless).run()
+    args = parse_args()
+    log.set_level(args.log_level)
+    app = MultiWindowRobotApp(use_wireless=(args.transport not in ("serial", "sim")),
+                              transport=transport_from_args(args),
+                              teleop_rate=args.teleop_rate,
+                              fleet_specs=fleet_specs_from_args(args),
+                              fallbacks=fallbacks_from_args(args) if supervised(args) else None,
+                              robot=args.robot)
+    if args.record:
+        app.backend.enable_recording(args.record)
+    if args.metrics_port:
+        app.backend.serve_metrics(args.metrics_port)
+    app.run()
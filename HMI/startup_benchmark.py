@@ -0,0 +1,58 @@
+"""
+Cold-start benchmark for the HMI.
+
+Imports robotControlGUI_wireless_V2, runs the app against a local pyserial
+loop:// port (no robot needed) and stops it once the first frame has been
+drawn. Reports import / build / first-frame times in seconds since process
+start and exits non-zero when first frame exceeds --budget.
+
+    python startup_benchmark.py --budget 1.5 --json startup.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+_T_START = time.perf_counter()
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="HMI startup-time benchmark")
+    parser.add_argument("--budget", type=float, default=2.0, help="first-frame budget in seconds")
+    parser.add_argument("--json", help="write results to this file")
+    args = parser.parse_args(argv)
+
+    os.environ.setdefault("KIVY_NO_ARGS", "1")
+    sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+    t0 = time.perf_counter()
+    import robotControlGUI_wireless_V2 as gui
+    from kivy.clock import Clock
+    from flexibot.transports import SerialTransport
+    import_s = time.perf_counter() - t0
+
+    app = gui.MultiWindowRobotApp(transport=SerialTransport("loop://"))
+    # _on_first_frame is scheduled from build(); stop right after it has run
+    Clock.schedule_once(lambda dt: app.stop(), 0.1)
+    app.run()
+
+    results = {
+        "module_import_s": import_s,
+        "import_s": gui.STARTUP_TIMES["import"],
+        "build_s": gui.STARTUP_TIMES.get("build"),
+        "first_frame_s": gui.STARTUP_TIMES.get("first_frame"),
+        "process_to_first_frame_s": (gui._T_START - _T_START) + gui.STARTUP_TIMES.get("first_frame", 0.0),
+        "budget_s": args.budget,
+    }
+    results["within_budget"] = results["process_to_first_frame_s"] <= args.budget
+
+    print(json.dumps(results, indent=2))
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    return 0 if results["within_budget"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
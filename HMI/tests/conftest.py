@@ -0,0 +1,5 @@
+import os
+import sys
+
+# flexibot is imported from the HMI directory, as the GUI and `python -m flexibot` do
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,81 @@
+import os
+import re
+
+import pytest
+
+from flexibot import binary_protocol as bp
+from flexibot.binary_protocol import (COMMAND_TABLE, FRAME_LEN, OP_ROTATE, can_encode, decode_frame,
+                                      encode_command, encode_frame, to_text)
+
+FIRMWARE_HEADER = os.path.join(os.path.dirname(__file__), "..", "..", "controller", "src", "binary_protocol.h")
+
+
+@pytest.mark.parametrize("name", sorted(COMMAND_TABLE))
+def test_every_command_round_trips(name):
+    frame = encode_command(name, seq=7)
+    assert len(frame) == FRAME_LEN
+    cmd = decode_frame(frame)
+    assert (cmd.opcode, cmd.target, cmd.direction) == COMMAND_TABLE[name]
+    assert cmd.seq == 7
+    expected = f"{name}:{bp.DEFAULT_DURATION}" if cmd.opcode == OP_ROTATE else name
+    assert to_text(cmd) == expected
+
+
+@pytest.mark.parametrize("command, duration", [
+    ("ROTATE_M1_CW:1500_500", 1500),  # toInt(): the leading number, like the ASCII parser
+    ("ROTATE_M8_CCW:65535", 65535),
+    ("ROTATE_BODY2_CW:500", 500),
+    ("ROTATE_M3_CW:0", bp.DEFAULT_DURATION),
+    ("ROTATE_M3_CW:-5", bp.DEFAULT_DURATION),
+    ("ROTATE_M4_CW", bp.DEFAULT_DURATION),
+])
+def test_rotate_parameters(command, duration):
+    cmd = decode_frame(encode_command(command))
+    assert (cmd.pulse, cmd.duration) == (0, duration)
+    assert decode_frame(encode_command(to_text(cmd))) == cmd
+
+
+def test_rotate_longer_than_a_frame_stays_ascii():
+    assert not can_encode("ROTATE_M1_CW:65536")
+    assert can_encode("ROTATE_M1_CW:65535")
+
+
+def test_seq_wraps_to_one_byte():
+    assert decode_frame(encode_command("STOP_MOTORS", seq=0x1FF)).seq == 0xFF
+    assert decode_frame(encode_command("STOP_MOTORS", seq=256)).seq == 0
+
+
+def test_corrupt_frames_are_rejected():
+    frame = bytearray(encode_command("ROTATE_M2_CCW:1500_500", seq=3))
+    for i in range(1, FRAME_LEN):
+        bad = bytearray(frame)
+        bad[i] ^= 0x01
+        with pytest.raises(ValueError, match="CRC"):
+            decode_frame(bytes(bad))
+    bad = bytearray(frame)
+    bad[0] = ord("R")
+    with pytest.raises(ValueError, match="sync"):
+        decode_frame(bytes(bad))
+    with pytest.raises(ValueError, match="bytes"):
+        decode_frame(bytes(frame[:-1]))
+
+
+def test_text_only_commands():
+    for command in ("POSE:1=700_500", "BATCH:STOP_MOTORS;STAND_UP", "SET_SPEED:100", "HB:250"):
+        assert not can_encode(command)
+        with pytest.raises(KeyError):
+            encode_command(command)
+    assert can_encode("ROTATE_M1_CW:500")
+    assert can_encode("SET_MODE:GAIT")
+
+
+def test_opcodes_match_firmware():
+    with open(FIRMWARE_HEADER) as f:
+        source = f.read()
+    firmware = {name: int(value, 0) for name, value in re.findall(r"\bBIN_([A-Z_]+)\s*=?\s*(0x[0-9A-F]+|\d+)", source)}
+    ops = {name[3:]: value for name, value in vars(bp).items() if name.startswith("OP_")}
+    assert ops
+    for name, value in ops.items():
+        assert firmware[name] == value, name
+    assert firmware["SYNC"] == bp.SYNC
+    assert firmware["FRAME_LEN"] == FRAME_LEN
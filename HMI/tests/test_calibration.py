@@ -0,0 +1,62 @@
+import pytest
+
+from flexibot.backend import RobotBackend
+from flexibot.calibration import (CALIBRATE_ALL_MS, CALIBRATE_LIMB_MS, CalibrationCache, blocking_ms,
+                                  neutral_command)
+from flexibot.simulator import SimTransport
+
+FULL_PROFILE = {m: 1440 + m for m in range(1, 9)}
+
+
+@pytest.fixture
+def cache(tmp_path):
+    return CalibrationCache(directory=str(tmp_path))
+
+
+@pytest.fixture
+def backend():
+    backend = RobotBackend(transport=SimTransport(speed=None, echo_pwm=False))
+    backend.connect().result(5)
+    yield backend
+    backend.close()
+
+
+@pytest.mark.parametrize("command, ms", [
+    ("CALIBRATE_ALL_LIMBS", CALIBRATE_ALL_MS), ("CALIBRATE_LIMB:2", CALIBRATE_LIMB_MS), ("STAND_UP", 0),
+])
+def test_blocking_ms(command, ms):
+    assert blocking_ms(command) == ms
+
+
+def test_neutral_command_is_sorted_by_motor():
+    assert neutral_command({3: 1460, 1: 1450}) == "SET_NEUTRAL:1=1450,3=1460"
+
+
+def test_usable_skips_drifted_stale_and_out_of_range_entries(tmp_path):
+    cache = CalibrationCache(directory=str(tmp_path), max_age_s=100)
+    cache.record("bot", {1: 1450, 2: 1460, 3: 1999}, t=1000.0)
+    cache.record("bot", {4: 1470}, t=900.0)
+    cache.mark_drifted("bot", ["M2"])
+    assert cache.usable("bot", now=1050.0) == {1: 1450}
+    assert cache.usable("other") == {}
+
+
+def test_cached_profile_is_pushed_without_calibrating(cache, backend):
+    cache.record("bot", FULL_PROFILE)
+    report = cache.restore(backend, "bot")
+    assert report.pushed == list(range(1, 9)) and report.calibrated == []
+    assert backend.transport.sim.neutrals[:8] == [FULL_PROFILE[m] for m in range(1, 9)]
+
+
+def test_drifted_motor_recalibrates_only_its_limb(cache, backend):
+    cache.record("bot", FULL_PROFILE)
+    cache.mark_drifted("bot", ["M3"])
+    cache.attach(backend, "bot")
+    try:
+        report = cache.restore(backend, "bot")
+    finally:
+        cache.detach(backend)
+    assert report.calibrated == [2]
+    profile = cache.load("bot")
+    assert not profile[3]["drifted"] and profile[3]["neutral"] == 1450  # what the sweep parked it at
+    assert profile[1]["neutral"] == FULL_PROFILE[1]
@@ -0,0 +1,28 @@
+from flexibot.coalesce import CommandCoalescer, coalesce_key
+
+
+def test_coalesce_key():
+    assert coalesce_key("SET_SPEED:120") == "speed"
+    assert coalesce_key("ROTATE_M3_CW:1500_200") == "M3"
+    assert coalesce_key("STOP_M3") == "M3"
+    assert coalesce_key("ROTATE_BODY1_CCW:500") == "BODY1"
+    assert coalesce_key("SET_MODE:GAIT") == "SET_MODE"
+
+
+def test_latest_value_wins():
+    sent = []
+    coalescer = CommandCoalescer(sent.append, interval=60.0)
+    try:
+        for speed in range(5):
+            coalescer.submit(f"SET_SPEED:{speed}")
+        coalescer.submit("ROTATE_M1_CW:500")
+        # First of each key goes out at once, the rest wait for the interval
+        assert sent == ["SET_SPEED:0", "ROTATE_M1_CW:500"]
+        stats = coalescer.stats()
+        assert stats["pending"] == 1
+        assert stats["dropped_per_key"] == {"speed": 3}
+        coalescer.flush()
+        assert sent[-1] == "SET_SPEED:4"
+        assert coalescer.stats()["pending"] == 0
+    finally:
+        coalescer.close()
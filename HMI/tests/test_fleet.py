@@ -0,0 +1,151 @@
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from flexibot.fleet import Fleet, transport_from_spec
+from flexibot.latency import LatencyTracker
+from flexibot.simulator import SimTransport
+from flexibot.status_queue import StatusQueue
+from flexibot.transports import HttpTransport, SerialTransport, TcpTransport
+
+
+def _done(result=None):
+    fut = Future()
+    fut.set_result(result)
+    return fut
+
+
+class StubBackend:
+    """What Fleet uses of RobotBackend; records when each command was handed over."""
+
+    def __init__(self, transport, link, name):
+        self.transport = transport
+        self.link = link
+        self.name = name
+        self.latency = LatencyTracker()
+        self.status = StatusQueue()
+        self.sent = []
+        self.closed = False
+        self.supervised_with = None
+        self.reader = False
+
+    def send_command(self, command, priority=None, deadline_s=None):
+        self.sent.append((command, time.perf_counter()))
+        return _done(len(command))
+
+    def connect(self):
+        return _done()
+
+    def supervise(self, fallbacks=()):
+        self.supervised_with = list(fallbacks)
+        return self
+
+    def start_reader(self):
+        self.reader = True
+
+    def queue_depth(self):
+        return 0
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fleet(monkeypatch):
+    monkeypatch.setattr("flexibot.fleet.RobotBackend", StubBackend)
+    fleet = Fleet()
+    yield fleet
+    fleet.close()
+
+
+@pytest.mark.parametrize("spec, cls, attrs", [
+    ("serial:/dev/ttyACM0", SerialTransport, {"port": "/dev/ttyACM0"}),
+    ("http:192.168.3.2", HttpTransport, {"host": "192.168.3.2", "port": 80}),
+    ("tcp:192.168.3.2:9000", TcpTransport, {"host": "192.168.3.2", "port": 9000}),
+    ("sim:5", SimTransport, {"speed": 5.0}),
+])
+def test_transport_from_spec(spec, cls, attrs):
+    transport = transport_from_spec(spec)
+    assert isinstance(transport, cls)
+    assert {key: getattr(transport, key) for key in attrs} == attrs
+
+
+def test_bad_spec_is_rejected():
+    with pytest.raises(ValueError):
+        transport_from_spec("udp:10.0.0.1")
+
+
+def test_every_robot_shares_the_loop_and_http_robots_the_pool(fleet):
+    alpha = fleet.add("alpha", "http:127.0.0.1")
+    bravo = fleet.add("bravo", "sim")
+    assert alpha.link is bravo.link is fleet.link
+    assert alpha.transport.dispatch_opts["executor"] is fleet.http_pool
+    with pytest.raises(ValueError):
+        fleet.add("alpha", "sim")
+
+
+def test_robots_with_fallbacks_are_supervised_like_a_single_robot(fleet):
+    main = fleet.add("main", "serial:/dev/ttyACM0", fallbacks=["http:192.168.3.1"])
+    alpha = fleet.add("alpha", "tcp:192.168.3.2", fallbacks=[])
+    bravo = fleet.add("bravo", "sim")
+    started = fleet.connect()
+    (http,) = main.supervised_with
+    assert isinstance(http, HttpTransport) and http.dispatch_opts["executor"] is fleet.http_pool
+    assert started["main"] is main and started["alpha"] is alpha
+    assert alpha.supervised_with == [] and bravo.supervised_with is None
+    assert started["bravo"].done()
+    assert (main.reader, alpha.reader, bravo.reader) == (True, False, False)
+    fleet.remove("main")
+    assert "main" not in fleet.fallbacks
+
+
+def test_select_by_name_and_group(fleet):
+    for name, groups in (("a", ("front",)), ("b", ("front", "left")), ("c", ())):
+        fleet.add(name, "sim", groups=groups)
+    assert [n for n, _ in fleet.select()] == ["a", "b", "c"]
+    assert [n for n, _ in fleet.select(group="front")] == ["a", "b"]
+    assert [n for n, _ in fleet.select(names=["c"], group="left")] == ["c", "b"]
+    with pytest.raises(KeyError):
+        fleet.select(names=["zulu"])
+    fleet.remove("b")
+    assert fleet.groups == {"front": ["a"], "left": []}
+
+
+def test_broadcast_reaches_every_robot_once(fleet):
+    for name in ("a", "b", "c"):
+        fleet.add(name, "sim", groups=("all",) if name != "c" else ())
+    result = fleet.broadcast("STAND_UP", group="all", lead_s=0.02)
+    assert result.wait(2) == {"a": 8, "b": 8}
+    assert [c for c, _ in fleet.robots["a"].sent] == ["STAND_UP"]
+    assert fleet.robots["c"].sent == []
+    assert result.dispatch_skew_ms() < 20
+
+
+def test_broadcast_sends_early_by_half_the_round_trip(fleet):
+    near, far = fleet.add("near", "sim"), fleet.add("far", "sim")
+    far.latency.sent(1, "STAND_UP", "sim", t=1.0)
+    far.latency.acked(1, t=1.080)  # 80 ms round trip: send 40 ms early
+    result = fleet.broadcast("STAND_UP", lead_s=0.1)
+    result.wait(2)
+    early = result.dispatched["near"] - result.dispatched["far"]
+    assert 0.030 < early < 0.050
+    assert abs(result.dispatched["near"] - result.t_start) < 0.010
+
+
+def test_stop_all_goes_out_right_away_uncompensated(fleet):
+    for name in ("a", "b"):
+        fleet.add(name, "sim")
+    fleet.robots["b"].latency.sent(1, "STOP_MOTORS", "sim", t=1.0)
+    fleet.robots["b"].latency.acked(1, t=1.200)
+    t0 = time.perf_counter()
+    assert fleet.stop_all().wait(2) == {"a": 11, "b": 11}
+    assert all(t - t0 < 0.05 for b in fleet.robots.values() for _, t in b.sent)
+
+
+def test_close_closes_every_backend(monkeypatch):
+    monkeypatch.setattr("flexibot.fleet.RobotBackend", StubBackend)
+    fleet = Fleet()
+    backends = [fleet.add(name, "sim") for name in ("a", "b")]
+    fleet.close()
+    assert all(b.closed for b in backends)
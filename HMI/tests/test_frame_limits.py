@@ -0,0 +1,115 @@
+import os
+import re
+
+import pytest
+import requests
+
+from benchmarks import fake_robot
+from benchmarks.fake_robot import FakeSerialDevice, FakeTcpRobot, FakeWebServer, process_stream
+from flexibot import simulator
+from flexibot.backend import RobotBackend
+from flexibot.pose import MAX_FRAME_LEN, pack_batch
+from flexibot.simulator import MorphBotSim, SimTransport
+from flexibot.transports import HttpTransport, SerialTransport, TcpTransport
+
+HEADER = os.path.join(os.path.dirname(__file__), "..", "..", "controller", "src", "WebServerControl.h")
+
+# "GET /" + command + "@255" + " HTTP/1.1"
+HTTP_OVERHEAD = len("GET /") + len("@255") + len(" HTTP/1.1")
+
+
+def _defines():
+    """Numeric #defines of WebServerControl.h, with the arithmetic evaluated."""
+    values = {}
+    with open(HEADER) as f:
+        for match in re.finditer(r"^#define\s+(\w+)\s+([^/\n]+)", f.read(), re.M):
+            name, expr = match.group(1), match.group(2).strip()
+            expr = re.sub(r"\b[A-Z_]+\b", lambda m: str(values.get(m.group(0), m.group(0))), expr)
+            if re.fullmatch(r"[\d\s+\-*()]+", expr):
+                values[name] = eval(expr)
+    return values
+
+
+def _full_frame():
+    commands = [f"ROTATE_M{n}_CW:1500_500" for n in range(1, 9)]
+    commands += ["ROTATE_M1_CCW:1000", "ROTATE_M2_CCW:10000", "ROTATE_M3_CCW:10000"]
+    (frame,) = pack_batch(commands)
+    assert len(frame) == MAX_FRAME_LEN
+    return frame
+
+
+def test_line_buffers_fit_the_longest_tagged_frame():
+    defines = _defines()
+    # The serial/TCP buffer keeps "\r" and needs a NUL; the HTTP one only a NUL
+    assert defines["TCP_LINE_MAX"] - 1 >= MAX_FRAME_LEN + len("@255") + 1
+    assert defines["HTTP_LINE_MAX"] - 1 >= MAX_FRAME_LEN + HTTP_OVERHEAD
+
+
+@pytest.mark.parametrize("name", ["MAX_COMMAND_LEN", "ACK_TAG_MAX", "TCP_LINE_MAX", "HTTP_LINE_MAX"])
+def test_fake_robot_limits_match_the_firmware(name):
+    assert getattr(fake_robot, name) == _defines()[name]
+
+
+def test_sim_serial_limit_matches_the_firmware():
+    defines = _defines()
+    assert simulator.MAX_COMMAND_LEN == defines["MAX_COMMAND_LEN"]
+    assert simulator.SERIAL_LINE_MAX == defines["TCP_LINE_MAX"] - 1
+
+
+@pytest.fixture(params=["serial", "http", "tcp", "sim"])
+def backend(request):
+    robot = None
+    if request.param == "serial":
+        robot = FakeSerialDevice()
+        transport = SerialTransport(robot.port)
+    elif request.param == "http":
+        robot = FakeWebServer()
+        transport = HttpTransport(robot.host, robot.port)
+    elif request.param == "tcp":
+        robot = FakeTcpRobot()
+        transport = TcpTransport(robot.host, robot.port)
+    else:
+        transport = SimTransport(speed=None, echo_pwm=False)
+    backend = RobotBackend(transport=transport)
+    backend.start_reader()  # acks come back through the serial reader on serial
+    yield backend
+    backend.close()
+    if robot is not None:
+        robot.close()
+
+
+def test_full_batch_with_the_longest_tag_is_acked(backend):
+    backend.connect().result(5)
+    backend.latency._next_seq = 254  # the next command goes out as "@255"
+    assert isinstance(backend.send_command(_full_frame(), ack=True).result(5), int)
+    assert backend.latency.counters["unmatched"] == 0
+
+
+@pytest.mark.parametrize("extra, accepted", [(0, True), (1, False)])
+def test_serial_and_tcp_drop_lines_past_the_buffer(extra, accepted):
+    line = "ROTATE_M1_CW:" + "0" * (fake_robot.LINE_MAX - len("ROTATE_M1_CW:500@7") + extra) + "500@7"
+    out, _ = process_stream(bytearray(line.encode() + b"\n"))
+    assert (out == ["[ERROR] Command too long"]) != accepted
+
+
+@pytest.mark.parametrize("extra, accepted", [(0, True), (1, False)])
+def test_sim_drops_lines_past_the_buffer(extra, accepted):
+    lines = []
+    sim = MorphBotSim(on_line=lines.append, echo_pwm=False)
+    sim.boot()
+    lines.clear()
+    sim.write("ROTATE_M1_CW:" + "0" * (simulator.SERIAL_LINE_MAX - len("ROTATE_M1_CW:500") + extra) + "500")
+    sim.process_pending()
+    assert ("[ERROR] Command too long" in lines) != accepted
+    assert sim.running_motors() == ([1] if accepted else [])
+
+
+def test_http_answers_an_overlong_request_without_running_it():
+    robot = FakeWebServer()
+    try:
+        command = "ROTATE_M1_CW:" + "0" * fake_robot.HTTP_LINE_MAX + "@9"
+        response = requests.get(f"http://{robot.host}:{robot.port}/{command}", timeout=2)
+        assert response.text == "ERR Command too long\n"
+        assert "X-Ack" not in response.headers
+    finally:
+        robot.close()
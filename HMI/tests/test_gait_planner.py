@@ -0,0 +1,73 @@
+import threading
+
+import pytest
+
+np = pytest.importorskip("numpy")
+
+from flexibot import gait_planner  # noqa: E402
+from flexibot.pose import STOP_PULSE, Pose  # noqa: E402
+
+
+def test_plans_are_cached_per_parameter_set():
+    gait_planner.clear_cache()
+    first = gait_planner.plan("crawl", period_ms=8000)
+    assert gait_planner.plan("crawl", period_ms=8000.0) is first  # normalised to the same key
+    gait_planner.plan("crawl", period_ms=9000)
+    info = gait_planner.cache_info()
+    assert (info.hits, info.misses) == (1, 2)
+
+
+def test_crawl_lifts_one_limb_at_a_time():
+    traj = gait_planner.plan("crawl")
+    assert traj.pulses.shape == (16, gait_planner.NUM_MOTORS)
+    assert not traj.pulses.flags.writeable
+    top = traj.pulses[:, 0::2] != STOP_PULSE  # swing: top tendon pulls
+    bottom = traj.pulses[:, 1::2] != STOP_PULSE  # stance: bottom tendon pulls
+    assert (top ^ bottom).all()
+    assert (top.sum(axis=1) == 1).all()
+    assert list(top.sum(axis=0)) == [4, 4, 4, 4]  # 25 % swing each
+
+
+def test_frames_are_pose_commands_held_past_the_next_keyframe():
+    traj = gait_planner.plan("fastcrawl", period_ms=6000, keyframes=12)
+    assert traj.step_ms == 500 and traj.duration_ms == 550
+    pose = Pose.from_command(traj.commands[0])
+    assert sorted(pose.targets) == list(range(1, 9))
+    for pulse, duration in pose.targets.values():
+        assert duration == (0 if pulse == STOP_PULSE else 550)
+
+
+@pytest.mark.parametrize("overrides", [
+    {"duty": 1.0}, {"phase_offsets": (0.0, 0.5)}, {"keyframes": 1}, {"period_ms": 0},
+])
+def test_bad_parameters_are_rejected(overrides):
+    with pytest.raises(ValueError):
+        gait_planner.make_params("crawl", **overrides)
+
+
+class RecordingBackend:
+    def __init__(self):
+        self.commands = []
+        self.poses = []
+        self.done = threading.Event()
+
+    def send_command(self, command, *args, **kwargs):
+        self.commands.append(command)
+
+    def send_pose(self, pose):
+        self.poses.append(pose)
+        self.done.set()
+
+
+def test_streamer_sends_each_keyframe_then_stops_every_motor():
+    backend = RecordingBackend()
+    params = gait_planner.make_params("crawl", period_ms=80, keyframes=4)
+    streamer = gait_planner.GaitStreamer(backend, params, cycles=2)
+    streamer.start()
+    assert backend.done.wait(2)
+    streamer.stop()
+    traj = gait_planner.plan(params)
+    assert backend.commands == ["SET_MODE:INDIVIDUAL"] + list(traj.commands) * 2
+    assert streamer.frames_sent == 8 and streamer.cycles_done == 2
+    (stop,) = backend.poses
+    assert stop.targets == {m: (STOP_PULSE, 0) for m in range(1, 9)}
@@ -0,0 +1,72 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from flexibot.http_dispatch import DispatchQueueFull, HttpDispatcher
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.paths.append(self.path)
+        self.server.entered.set()
+        self.server.gate.wait(5)
+        self.send_response(200)
+        self.send_header("Content-Length", "3")
+        self.end_headers()
+        self.wfile.write(b"OK\n")
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.paths, server.entered, server.gate = [], threading.Event(), threading.Event()
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server
+    server.gate.set()
+    server.shutdown()
+    server.server_close()
+
+
+def _url(server):
+    return f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_commands_go_out_in_order(server):
+    server.gate.set()
+    dispatcher = HttpDispatcher(_url(server))
+    try:
+        futures = [dispatcher.submit(c) for c in ("STAND_UP", "ROTATE_M1_CW:300", "STOP_MOTORS")]
+        timings = [f.result(5) for f in futures]
+    finally:
+        dispatcher.close()
+    assert server.paths == ["/STAND_UP", "/ROTATE_M1_CW:300", "/STOP_MOTORS"]
+    assert [t.status_code for t in timings] == [200, 200, 200]
+    assert dispatcher.stats()["ok"] == 3
+
+
+@pytest.mark.parametrize("overflow, dropped", [("drop_oldest", "B"), ("drop_newest", "D")])
+def test_full_queue_drops_by_policy(server, overflow, dropped):
+    dispatcher = HttpDispatcher(_url(server), queue_limit=2, overflow=overflow)
+    try:
+        futures = {"A": dispatcher.submit("A")}
+        assert server.entered.wait(5)  # the worker is stuck on A
+        for command in "BCD":
+            futures[command] = dispatcher.submit(command)
+        with pytest.raises(DispatchQueueFull):
+            futures[dropped].result(1)
+        server.gate.set()
+        sent = [c for c, f in futures.items() if c != dropped]
+        assert all(futures[c].result(5).status_code == 200 for c in sent)
+    finally:
+        dispatcher.close()
+    assert server.paths == [f"/{c}" for c in sent]
+    assert dispatcher.counters["dropped"] == 1
+
+
+def test_unknown_overflow_policy_is_rejected():
+    with pytest.raises(ValueError):
+        HttpDispatcher("http://127.0.0.1:1", overflow="drop_everything")
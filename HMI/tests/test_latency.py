@@ -0,0 +1,135 @@
+import pytest
+import requests
+import serial
+
+from benchmarks.fake_robot import FakeWebServer
+from flexibot import binary_protocol
+from flexibot.backend import RobotBackend
+from flexibot.latency import LatencyTracker, command_type, split_tag, tag_command
+from flexibot.serial_events import AckEvent, parse_line
+from flexibot.transports import HttpTransport, LinkLoop, SerialTransport, Transport, TransportTimeout
+
+
+@pytest.mark.parametrize("command, seq", [("ROTATE_M1_CW:500", 42), ("STOP_MOTORS", 0), ("HB", 255)])
+def test_tag_round_trip(command, seq):
+    assert split_tag(tag_command(command, seq)) == (command, seq)
+
+
+def test_untagged_commands_split_to_none():
+    assert split_tag("POSE:1=700_500") == ("POSE:1=700_500", None)
+    assert split_tag("user@host") == ("user@host", None)
+
+
+@pytest.mark.parametrize("command, ctype", [
+    ("ROTATE_M3_CCW:1500_200", "ROTATE_Mx_CCW"),
+    ("STOP_M1_M2_MOTORS", "STOP_Mx_Mx_MOTORS"),
+    ("STOP_BODY2", "STOP_Mx"),
+    ("SET_MODE:GAIT", "SET_MODE"),
+    ("CALIBRATE_LIMB:2", "CALIBRATE_LIMB"),
+    ("START_CRAWLING", "START_CRAWLING"),
+])
+def test_command_type(command, ctype):
+    assert command_type(command) == ctype
+
+
+def test_ack_line_parses_to_an_event():
+    assert parse_line("ACK:17:1234", t=0) == AckEvent(0, 17, 1234)
+
+
+def test_tracker_matches_acks_to_sends():
+    tracker = LatencyTracker()
+    seqs = [tracker.next_seq() for _ in range(3)]
+    assert seqs == [1, 2, 3]
+    for seq, command in zip(seqs, ("ROTATE_M1_CW:500", "ROTATE_M2_CW:500", "SET_MODE:GAIT")):
+        tracker.sent(seq, command, "serial", t=10.0)
+    assert tracker.acked(1, t=10.010) == pytest.approx(0.010)
+    assert tracker.acked(2, t=10.030) == pytest.approx(0.030)
+    assert tracker.acked(2, t=10.040) is None  # already matched
+    assert tracker.in_flight() == 1
+    assert tracker.counters == {"sent": 3, "acked": 2, "lost": 0, "unmatched": 1}
+    stats = tracker.summary()["ROTATE_Mx_CW/serial"]
+    assert stats["n"] == 2
+    assert stats["p50_ms"] == pytest.approx(10.0) and stats["p99_ms"] == pytest.approx(30.0)
+
+
+def test_unanswered_and_reused_ids_count_as_lost():
+    tracker = LatencyTracker(ack_timeout=2.0)
+    tracker.sent(5, "STOP_MOTORS", "http", t=1.0)
+    tracker.sent(5, "STOP_MOTORS", "http", t=1.5)  # ID wrapped before the ack came
+    tracker.sent(6, "STOP_MOTORS", "http", t=3.0)
+    assert tracker.expire(now=4.0) == 1
+    assert tracker.in_flight() == 1
+    assert tracker.counters["lost"] == 2
+
+
+def test_lost_only_drops_the_send_it_was_scheduled_for():
+    tracker = LatencyTracker()
+    first = tracker.sent(7, "STOP_MOTORS", "serial", t=1.0)
+    second = tracker.sent(7, "STOP_MOTORS", "serial", t=2.0)  # ID reused: first counted lost
+    assert not tracker.lost(7, first)
+    assert tracker.lost(7, second) and not tracker.lost(7, second)
+    assert tracker.counters["lost"] == 2 and tracker.in_flight() == 0
+
+
+def test_seq_wraps_at_eight_bits():
+    tracker = LatencyTracker()
+    tracker._next_seq = 254
+    assert [tracker.next_seq() for _ in range(3)] == [255, 0, 1]
+
+
+def test_binary_frames_carry_the_tag_in_their_seq_byte():
+    link = LinkLoop(name="test-link")
+    port = serial.serial_for_url("loop://", timeout=0.5)
+    try:
+        transport = SerialTransport(ser=port, binary=True)
+        link.submit(transport.send(tag_command("ROTATE_M4_CCW:300", 77))).result(2)
+        frame = port.read(binary_protocol.FRAME_LEN)
+    finally:
+        link.stop()
+    cmd = binary_protocol.decode_frame(frame)
+    assert cmd.seq == 77
+    assert binary_protocol.to_text(cmd) == "ROTATE_M4_CCW:300"
+
+
+def test_http_acks_come_back_on_the_request_that_carried_the_command():
+    robot = FakeWebServer()
+    backend = RobotBackend(transport=HttpTransport(robot.host, robot.port))
+    try:
+        backend.connect().result(5)
+        acks = [backend.send_command(f"ROTATE_M{m}_CW:300", ack=True) for m in (1, 2, 3)]
+        assert all(isinstance(fut.result(5), int) for fut in acks)
+        backend.send_command("STOP_MOTORS").result(5)  # every send is tagged
+        assert backend.latency.counters["acked"] == 4
+        assert backend.latency.counters["unmatched"] == 0
+        # Requests that ran no tagged command carry no X-Ack
+        response = requests.get(f"http://{robot.host}:{robot.port}/status", timeout=2)
+        assert "X-Ack" not in response.headers
+    finally:
+        backend.close()
+        robot.close()
+
+
+class SilentTransport(Transport):
+    """Takes every command and never acks."""
+    name = "silent"
+
+    async def send(self, command):
+        return None
+
+    @property
+    def connected(self):
+        return True
+
+
+def test_unanswered_ack_expires_on_the_link_loop():
+    backend = RobotBackend(transport=SilentTransport())
+    backend.latency.ack_timeout = 0.05
+    try:
+        fut = backend.send_command("ROTATE_M1_CW:300", ack=True)
+        with pytest.raises(TransportTimeout):
+            fut.result(2)
+        assert backend.latency.counters["lost"] == 1
+        assert backend.latency.in_flight() == 0
+        assert not backend._ack_waiters and not backend._sent_on
+    finally:
+        backend.close()
@@ -0,0 +1,89 @@
+import urllib.error
+import urllib.request
+
+import pytest
+
+from flexibot import log
+from flexibot.metrics import MetricsServer, Registry
+
+
+@pytest.fixture
+def registry():
+    registry = Registry()
+    sent = registry.counter("flexibot_commands_sent_total", "Commands sent", ("type", "transport"))
+    sent.inc(type="ROTATE_Mx_CW", transport="serial")
+    sent.inc(2, type="STOP_MOTORS", transport="serial")
+    registry.gauge("flexibot_queue_depth", "Commands waiting", fn=lambda: 3)
+    frames = registry.histogram("flexibot_ui_frame_seconds", "UI frame time", buckets=(0.016, 0.05))
+    for seconds in (0.010, 0.020, 0.020, 0.5):
+        frames.observe(seconds)
+    return registry
+
+
+def test_render_is_prometheus_text(registry):
+    assert registry.render().splitlines() == [
+        "# HELP flexibot_commands_sent_total Commands sent",
+        "# TYPE flexibot_commands_sent_total counter",
+        'flexibot_commands_sent_total{type="ROTATE_Mx_CW",transport="serial"} 1',
+        'flexibot_commands_sent_total{type="STOP_MOTORS",transport="serial"} 2',
+        "# HELP flexibot_queue_depth Commands waiting",
+        "# TYPE flexibot_queue_depth gauge",
+        "flexibot_queue_depth 3",
+        "# HELP flexibot_ui_frame_seconds UI frame time",
+        "# TYPE flexibot_ui_frame_seconds histogram",
+        'flexibot_ui_frame_seconds_bucket{le="0.016"} 1',
+        'flexibot_ui_frame_seconds_bucket{le="0.05"} 3',
+        'flexibot_ui_frame_seconds_bucket{le="+Inf"} 4',
+        "flexibot_ui_frame_seconds_sum 0.55",
+        "flexibot_ui_frame_seconds_count 4",
+    ]
+
+
+def test_label_values_are_escaped_and_checked():
+    registry = Registry()
+    errors = registry.counter("errors_total", "Errors", ("kind",))
+    errors.inc(kind='say "hi"\n')
+    assert 'errors_total{kind="say \\"hi\\"\\n"} 1' in registry.render()
+    with pytest.raises(ValueError):
+        errors.inc(reason="x")
+
+
+def test_registering_a_name_twice_returns_the_first_metric():
+    registry = Registry()
+    first = registry.counter("x_total", "X")
+    assert registry.counter("x_total", "X again") is first
+
+
+def test_failing_gauge_does_not_break_the_scrape():
+    registry = Registry()
+    registry.gauge("broken", "Raises", fn=lambda: 1 / 0)
+    registry.gauge("fine", "Works", fn=lambda: 1)
+    text = registry.render()
+    assert text.startswith("# broken: division by zero")
+    assert "fine 1" in text
+
+
+def test_server_serves_metrics_on_localhost(registry):
+    server = MetricsServer(registry, port=0)
+    try:
+        url = f"http://{server.host}:{server.port}"
+        with urllib.request.urlopen(f"{url}/metrics", timeout=2) as response:
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert response.read().decode() == registry.render()
+        with pytest.raises(urllib.error.HTTPError) as err:
+            urllib.request.urlopen(f"{url}/other", timeout=2)
+        assert err.value.code == 404
+    finally:
+        server.close()
+
+
+def test_log_skips_lines_below_the_level(capsys):
+    level = log.get_level()
+    try:
+        log.set_level("WARNING")
+        log.info("[Test] %s", "hidden")
+        log.warning("[Test] %s", "shown")
+        assert not log.enabled(log.DEBUG)
+    finally:
+        log.set_level(level)
+    assert capsys.readouterr().out == "[Test] shown\n"
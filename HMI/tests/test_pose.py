@@ -0,0 +1,46 @@
+import os
+import re
+
+import pytest
+
+from flexibot.pose import MAX_FRAME_LEN, Pose, motor_number, pack_batch
+
+FIRMWARE_HEADER = os.path.join(os.path.dirname(__file__), "..", "..", "controller", "src", "WebServerControl.h")
+
+
+def test_motor_number():
+    assert motor_number("m3") == 3
+    assert motor_number("BODY2") == 10
+    assert motor_number(9) == 9
+    for bad in ("M11", "LEG1", 0, 11):
+        with pytest.raises(ValueError):
+            motor_number(bad)
+
+
+def test_pose_round_trip():
+    pose = Pose({"M2": (700, 500), 9: (2000, 300)}).stop("M1")
+    command = pose.to_command()
+    assert command == "POSE:1=0_0;2=700_500;9=2000_300"
+    assert Pose.from_command(command) == pose
+    with pytest.raises(ValueError):
+        Pose().set("M1", 3000, 100)
+    with pytest.raises(ValueError):
+        Pose.from_command("BATCH:STOP_MOTORS")
+
+
+def test_pack_batch():
+    commands = [f"ROTATE_M{n % 8 + 1}_CW:1500_500" for n in range(40)]
+    frames = pack_batch(commands)
+    assert len(frames) > 1
+    assert all(len(f) <= MAX_FRAME_LEN for f in frames)
+    unpacked = [c for f in frames for c in f[len("BATCH:"):].split(";")]
+    assert unpacked == commands
+    assert pack_batch(["STOP_MOTORS"]) == ["STOP_MOTORS"]
+    with pytest.raises(ValueError):
+        pack_batch(["BATCH:STOP_MOTORS;STAND_UP"])
+
+
+def test_max_frame_len_matches_firmware():
+    with open(FIRMWARE_HEADER) as f:
+        (value,) = re.findall(r"#define\s+MAX_COMMAND_LEN\s+(\d+)", f.read())
+    assert int(value) == MAX_FRAME_LEN
@@ -0,0 +1,38 @@
+import os
+
+from flexibot import gait_planner
+from flexibot.binary_protocol import MOTOR_INDEX
+from flexibot.registry import (LIMB_MOTORS, MOTOR_COMMANDS, MOTORS, NUM_LIMBS, NUM_MOTORS,
+                               firmware_header)
+
+COMMAND_TABLE_H = os.path.join(os.path.dirname(__file__), "..", "..", "controller", "src", "command_table.h")
+
+
+def test_committed_command_table_is_up_to_date():
+    with open(COMMAND_TABLE_H) as f:
+        committed = f.read()
+    # Regenerate with: python -m flexibot header -o ../controller/src/command_table.h
+    assert committed == firmware_header()
+
+
+def test_command_table_sorted_for_binary_search():
+    names = [c.name for c in sorted(MOTOR_COMMANDS.values())]
+    assert names == sorted(names, key=lambda n: n.encode())
+    assert len(set(names)) == len(names)
+
+
+def test_motor_layout():
+    assert NUM_MOTORS == len(MOTORS) == 2 * NUM_LIMBS + 2
+    assert [m.index for m in MOTORS] == list(range(NUM_MOTORS))
+    assert [m.number for m in MOTORS] == list(range(1, NUM_MOTORS + 1))
+    assert MOTOR_INDEX == {m.name: m.index for m in MOTORS}
+    for motor in MOTORS:
+        assert f"ROTATE_{motor.name}_CW" in MOTOR_COMMANDS
+        assert f"ROTATE_{motor.name}_CCW" in MOTOR_COMMANDS
+
+
+def test_gait_planner_follows_the_registry():
+    assert gait_planner.NUM_MOTORS == len(LIMB_MOTORS)
+    traj = gait_planner.plan("crawl")
+    assert traj.pulses.shape == (traj.params.keyframes, len(LIMB_MOTORS))
+    assert len(traj.params.neutrals) == len(LIMB_MOTORS)
@@ -0,0 +1,212 @@
+import asyncio
+
+import pytest
+
+from flexibot.scheduler import (PRIO_MODE, PRIO_MOTION, PRIO_STOP, PRIO_TUNING, CommandDropped,
+                                CommandScheduler, classify, command_targets)
+
+
+class InlineLink:
+    """Stands in for LinkLoop: callbacks run at once, timers are only recorded."""
+
+    def __init__(self):
+        self.loop = self
+        self.timers = []
+
+    def call_soon(self, fn, *args):
+        fn(*args)
+
+    def call_later(self, delay, fn, *args):
+        self.timers.append((delay, fn, args))
+
+    def create_task(self, coro):
+        coro.close()  # counted as in flight, never finishes
+
+    def in_loop(self):
+        return True
+
+
+async def _never_sent(command):
+    raise AssertionError(f"{command} reached the transport")
+
+
+@pytest.fixture
+def scheduler():
+    # No send window: everything but stops stays in the heap
+    return CommandScheduler(InlineLink(), _never_sent, max_in_flight=0)
+
+
+def _dropped_reason(fut):
+    assert fut.done()
+    exc = fut.exception()
+    assert isinstance(exc, CommandDropped)
+    return str(exc).split(":", 1)[0]
+
+
+# --------------------------------------------------------------------
+# classify / command_targets
+# --------------------------------------------------------------------
+@pytest.mark.parametrize("command, priority", [
+    ("STOP_MOTORS", PRIO_STOP),
+    ("STOP_M1_M2_MOTORS", PRIO_STOP),
+    ("STOP_BODY1", PRIO_STOP),
+    ("POSE:1=0_0;2=0_0", PRIO_STOP),
+    ("POSE:1=0_0;2=700_500", PRIO_MOTION),
+    ("BATCH:ROTATE_M1_CW:500;STOP_M3_M4_MOTORS", PRIO_STOP),
+    ("BATCH:ROTATE_M1_CW:500;SET_MODE:GAIT", PRIO_MODE),
+    ("BATCH:ROTATE_M1_CW:500", PRIO_MOTION),
+    ("SET_MODE:INDIVIDUAL", PRIO_MODE),
+    ("START_CRAWLING", PRIO_MODE),
+    ("CALIBRATE_LIMB:2", PRIO_MODE),
+    ("ROTATE_M3_CCW:1500_200", PRIO_MOTION),
+    ("HB:0", PRIO_MOTION),
+    ("SET_SPEED:128", PRIO_TUNING),
+])
+def test_classify(command, priority):
+    assert classify(command) == priority
+
+
+def test_command_targets():
+    assert command_targets("ROTATE_M3_CW:500") == {3}
+    assert command_targets("STOP_M1_M2_MOTORS") == {1, 2}
+    assert command_targets("STOP_BODY2") == {10}
+    assert command_targets("POSE:1=700_500;9=0_0") == {1, 9}
+    assert command_targets("BATCH:ROTATE_M1_CW:500;ROTATE_M5_CCW:500") == {1, 5}
+    assert command_targets("STOP_MOTORS") is None
+    assert command_targets("BATCH:ROTATE_M1_CW:500;STOP_MOTORS") is None
+
+
+# --------------------------------------------------------------------
+# Stops supersede queued motion and skip the send window
+# --------------------------------------------------------------------
+def test_stop_supersedes_motion_for_its_motors(scheduler):
+    m1 = scheduler.submit("ROTATE_M1_CW:500")
+    m2 = scheduler.submit("ROTATE_M2_CCW:500")
+    m3 = scheduler.submit("ROTATE_M3_CW:500")
+    pose = scheduler.submit("POSE:2=700_500;5=700_500")
+    mode = scheduler.submit("SET_MODE:GAIT")
+    stop = scheduler.submit("STOP_M1_M2_MOTORS")
+
+    assert _dropped_reason(m1) == "superseded"
+    assert _dropped_reason(m2) == "superseded"
+    assert _dropped_reason(pose) == "superseded"  # shares M2 with the stop
+    assert stop.running()  # sent although the window is full
+    assert not m3.done() and not mode.done()
+    assert scheduler.queue_depth() == 2
+    assert scheduler.counters["superseded"] == 3
+
+
+def test_stop_all_supersedes_every_motion(scheduler):
+    motion = [scheduler.submit(f"ROTATE_M{n}_CW:500") for n in range(1, 9)]
+    tuning = scheduler.submit("SET_SPEED:100")
+    scheduler.submit("STOP_MOTORS")
+    assert all(_dropped_reason(f) == "superseded" for f in motion)
+    assert not tuning.done()
+
+
+def test_stop_jumps_the_queue(scheduler):
+    queued = [scheduler.submit(c) for c in ("SET_SPEED:100", "SET_MODE:INDIVIDUAL", "ROTATE_M5_CW:500")]
+    stop = scheduler.submit("STOP_BODY1")
+    assert stop.running()
+    assert not any(f.running() for f in queued)
+    assert len(scheduler.stop_waits) == 1
+
+
+# --------------------------------------------------------------------
+# Deadlines
+# --------------------------------------------------------------------
+def test_expire_drops_only_overdue_commands(scheduler):
+    stale = scheduler.submit("ROTATE_M1_CW:500", deadline_s=-1.0)
+    fresh = scheduler.submit("ROTATE_M2_CW:500", deadline_s=60.0)
+    mode = scheduler.submit("SET_MODE:GAIT")
+    scheduler._expire()
+    assert _dropped_reason(stale) == "expired"
+    assert not fresh.done() and not mode.done()
+    assert scheduler.counters["expired"] == 1
+
+
+def test_deadlines_by_priority(scheduler):
+    scheduler.submit("ROTATE_M1_CW:500")
+    scheduler.submit("SET_MODE:GAIT")
+    scheduler.submit("SET_SPEED:100")
+    # Only motion and mode commands arm an expiry timer
+    delays = sorted(round(delay) for delay, _, _ in scheduler.link.timers)
+    assert delays == [1, 5]
+    deadlines = {item.command: item.deadline for item in scheduler._heap}
+    assert deadlines["SET_SPEED:100"] is None
+
+
+def test_expired_motion_is_not_sent_when_the_window_opens(scheduler):
+    stale = scheduler.submit("ROTATE_M1_CW:500", deadline_s=-1.0)
+    scheduler.max_in_flight = 1
+    scheduler._pump()
+    assert _dropped_reason(stale) == "expired"
+    assert scheduler.queue_depth() == 0
+
+
+def test_close_fails_everything_queued(scheduler):
+    futures = [scheduler.submit(c) for c in ("ROTATE_M1_CW:500", "SET_MODE:GAIT", "SET_SPEED:100")]
+    scheduler.close()
+    assert [_dropped_reason(f) for f in futures] == ["closed"] * 3
+    late = scheduler.submit("ROTATE_M1_CW:500")
+    assert _dropped_reason(late) == "closed"
+
+
+# --------------------------------------------------------------------
+# Pause / requeue after a failed send (failover)
+# --------------------------------------------------------------------
+def test_paused_scheduler_holds_stops_too():
+    sched = CommandScheduler(InlineLink(), _never_sent, max_in_flight=2)
+    sched.pause()
+    stop = sched.submit("STOP_MOTORS")
+    stale = sched.submit("ROTATE_M1_CW:500", deadline_s=-1.0)
+    assert not stop.running() and sched.queue_depth() == 2
+    sched.resume()
+    assert stop.running()
+    assert _dropped_reason(stale) == "expired"
+
+
+class LoopLink(InlineLink):
+    def __init__(self, loop):
+        super().__init__()
+        self.loop = loop
+
+
+def _run_link_down_once(command, deadline_s=None, outage_s=0.01):
+    """First send fails and pauses the scheduler (link down); it resumes after `outage_s`."""
+    attempts = []
+
+    async def main():
+        async def send(cmd):
+            attempts.append(cmd)
+            if len(attempts) == 1:
+                sched.pause()
+                raise ConnectionError("link lost")
+            return "ok"
+
+        sched = CommandScheduler(LoopLink(asyncio.get_running_loop()), send,
+                                 requeue=lambda exc, cmd: isinstance(exc, ConnectionError))
+        fut = sched.submit(command, deadline_s=deadline_s)
+        await asyncio.sleep(outage_s)
+        depth = sched.queue_depth()
+        sched.resume()
+        await asyncio.wait([asyncio.wrap_future(fut)])
+        return sched, fut, depth
+
+    sched, fut, depth = asyncio.run(main())
+    return sched, fut, attempts, depth
+
+
+def test_failed_stop_is_requeued_and_resent():
+    sched, fut, attempts, depth = _run_link_down_once("STOP_M1_M2_MOTORS", outage_s=0.05)
+    assert depth == 1  # kept while no link is up
+    assert fut.result() == "ok"
+    assert attempts == ["STOP_M1_M2_MOTORS"] * 2
+    assert sched.counters["requeued"] == 1 and sched.counters["failed"] == 0
+
+
+def test_requeued_motion_still_expires():
+    sched, fut, attempts, depth = _run_link_down_once("ROTATE_M1_CW:500", deadline_s=0.01, outage_s=0.05)
+    assert depth == 0  # its deadline timer fired during the outage
+    assert _dropped_reason(fut) == "expired"
+    assert attempts == ["ROTATE_M1_CW:500"]
@@ -0,0 +1,80 @@
+import time
+
+import pytest
+
+from flexibot.backend import RobotBackend
+from flexibot.script import ScriptError, ScriptRunner, parse
+from flexibot.simulator import SimTransport
+
+
+@pytest.fixture
+def backend():
+    backend = RobotBackend(transport=SimTransport(speed=None, echo_pwm=False))
+    backend.connect().result(5)
+    yield backend
+    backend.close()
+
+
+def test_parse_unrolls_repeats_and_keeps_timeouts():
+    steps = parse("timeout 800\n@100 STAND_UP ack\nrepeat 2\n  ROTATE_M1_CW:300\n  wait 50\nend\nwait fsm gait\n")
+    assert [(s.op, s.arg) for s in steps] == [
+        ("at", 100), ("send", "STAND_UP"),
+        ("send", "ROTATE_M1_CW:300"), ("sleep", 50), ("send", "ROTATE_M1_CW:300"), ("sleep", 50),
+        ("fsm", "GAIT"),
+    ]
+    assert steps[1].ack and all(s.timeout_ms == 800 for s in steps)
+
+
+@pytest.mark.parametrize("text, lineno", [
+    ("ROTATE_M1_CW:600\nROTATE_M1_SIDEWAYS", 2),
+    ("end", 1),
+    ("repeat 2\nSTAND_UP", 1),
+    ("repeat 2\n@10 STAND_UP\nend", 2),
+    ("wait -5", 1),
+    ("wait stop left", 1),
+    ("STAND_UP now", 1),
+])
+def test_bad_scripts_fail_at_load_time(text, lineno):
+    with pytest.raises(ScriptError) as err:
+        parse(text)
+    assert err.value.lineno == lineno
+
+
+def test_waits_run_on_the_virtual_clock(backend):
+    steps = parse("SET_MODE:INDIVIDUAL ack\n"
+                  "ROTATE_M1_CW:600 ack\n"
+                  "wait stop M1\n"
+                  "wait 250\n"
+                  "@2000 ROTATE_M2_CCW:400\n"
+                  "wait line \"Motor 1 auto-stopped\"\n")
+    report = ScriptRunner(backend, steps).run()
+    assert report.virtual
+    by_line = {r.step.lineno: r for r in report.results}
+    assert 600 <= by_line[3].done_ms < 610           # M1 stops 600 virtual ms after its send
+    assert by_line[4].planned_ms == by_line[3].done_ms + 250
+    assert by_line[5].actual_ms == pytest.approx(2000, abs=1)
+    assert 2400 <= by_line[6].done_ms < 2420
+    assert report.max_late_ms < 2
+
+
+def test_timeouts_are_virtual_too(backend):
+    with pytest.raises(ScriptError, match="timed out after 3000 ms"):
+        ScriptRunner(backend, parse("wait fsm GAIT 3000"), stop_on_error=False).run()
+
+
+def test_waits_follow_a_free_running_sim_clock():
+    backend = RobotBackend(transport=SimTransport(speed=20, echo_pwm=False))
+    try:
+        backend.connect().result(5)
+        steps = parse("ROTATE_M1_CW:600 ack\nwait stop M1\nwait 1000\n")
+        t0 = time.perf_counter()
+        report = ScriptRunner(backend, steps).run()
+        wall_s = time.perf_counter() - t0
+    finally:
+        backend.close()
+    assert report.virtual
+    by_line = {r.step.lineno: r for r in report.results}
+    assert 600 <= by_line[2].done_ms < 1000         # virtual ms, not wall ms
+    assert by_line[3].planned_ms == by_line[2].done_ms + 1000
+    assert report.elapsed_ms >= 1600
+    assert wall_s < 0.8                              # 1.6 virtual s at 20x is 80 ms
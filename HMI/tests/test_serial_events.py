@@ -0,0 +1,55 @@
+import queue
+
+import pytest
+import serial
+
+from flexibot.serial_events import (CommandEvent, ErrorEvent, FsmEvent, LineEvent, LineFramer,
+                                    LinkEvent, MotorStopEvent, SerialReader, StatusEvent, parse_line)
+
+
+@pytest.mark.parametrize("line, expected", [
+    ("STATUS: Motor 3 rotating CW", StatusEvent(0, "Motor 3 rotating CW")),
+    ("[FSM] => STATE_GAIT", FsmEvent(0, "GAIT")),
+    ("[Timer] Motor 4 auto-stopped", MotorStopEvent(0, 4, True)),
+    ("[stopMotor] Motor 2 manually stopped", MotorStopEvent(0, 2, False)),
+    ("[Cmd] => STATE_INDIVIDUAL", CommandEvent(0, "=> STATE_INDIVIDUAL")),
+    ("[ERROR] Unknown command", ErrorEvent(0, "Unknown command")),
+    ("[FSM] something new", LineEvent(0, "[FSM] something new")),
+    ("Web Server initialized.", LineEvent(0, "Web Server initialized.")),
+])
+def test_parse_line(line, expected):
+    assert parse_line(line, t=0) == expected
+
+
+def test_framer_reassembles_lines_across_chunks():
+    framer = LineFramer()
+    assert framer.feed(b"STATUS: id") == []
+    assert framer.feed(b"le\r\n[FSM] => STA") == [b"STATUS: idle"]
+    assert framer.feed(b"TE_GAIT\r\n\r\nX") == [b"[FSM] => STATE_GAIT", b""]
+    assert bytes(framer.buf) == b"X"
+
+
+def test_framer_bounds_a_runaway_line():
+    framer = LineFramer(max_line=16)
+    assert framer.feed(b"\xff" * 100) == []
+    assert len(framer.buf) == 16
+    assert framer.feed(b"\n") == [b"\xff" * 16]
+
+
+def test_reader_publishes_typed_events_from_the_port():
+    port = serial.serial_for_url("loop://", timeout=0.05)
+    reader = SerialReader(lambda: port, retry_interval=0.01)
+    events = queue.Queue()
+    reader.subscribe(events.put, StatusEvent, FsmEvent, LinkEvent)
+    reader.start()
+    try:
+        up = events.get(timeout=2)
+        assert isinstance(up, LinkEvent) and up.up
+        port.write(b"[Cmd] ignored\r\nSTATUS: ready\r\n[FSM] => STATE_IDLE\r\n")
+        assert events.get(timeout=2).text == "ready"
+        assert events.get(timeout=2).state == "IDLE"
+        port.close()
+        assert events.get(timeout=2).up is False
+    finally:
+        reader.stop()
+    assert reader.lines == 3
@@ -0,0 +1,140 @@
+import pytest
+
+from flexibot import binary_protocol
+from flexibot.registry import DEFAULT_NEUTRAL_PULSE
+from flexibot.simulator import MorphBotSim, SimTransport, VirtualClock, to_int
+from flexibot.transports import LinkLoop, make_transport
+
+
+def _sim():
+    lines = []
+    sim = MorphBotSim(on_line=lines.append, echo_pwm=False)
+    sim.boot()
+    lines.clear()
+    return sim, lines
+
+
+@pytest.mark.parametrize("text, value", [
+    ("600", 600), ("1500_500", 1500), ("  -7x", -7), ("", 0), ("abc", 0),
+])
+def test_to_int_matches_arduino(text, value):
+    assert to_int(text) == value
+
+
+def test_clock_only_moves_when_advanced():
+    clock = VirtualClock()
+    clock.advance(1500)
+    clock.delay(2)
+    assert (clock.micros(), clock.millis()) == (3500, 3)
+
+
+@pytest.mark.parametrize("command, duration", [
+    ("ROTATE_M3_CW:600", 600), ("ROTATE_M3_CW", 200), ("ROTATE_M3_CW:0", 200),
+])
+def test_rotate_auto_stops_on_the_virtual_clock(command, duration):
+    sim, lines = _sim()
+    start = sim.clock.millis()
+    sim.write(command)
+    sim.process_pending()
+    assert sim.running_motors() == [3]
+    sim.advance(duration - 2)
+    assert sim.running_motors() == [3]
+    sim.advance(5)
+    assert sim.running_motors() == [] and sim.pulses[2] == DEFAULT_NEUTRAL_PULSE
+    assert lines[-1] == "[Timer] Motor 2 auto-stopped"
+    assert sim.tasks[2].end_ms == start + duration
+
+
+def test_idle_passes_are_skipped():
+    sim, _ = _sim()
+    sim.write("ROTATE_M1_CW:60000")
+    sim.process_pending()
+    loops = sim.counters["loops"]
+    sim.advance(120000)
+    assert sim.counters["loops"] - loops < 5  # not one pass per idle millisecond
+
+
+def test_same_input_gives_the_same_output():
+    def run():
+        sim, lines = _sim()
+        for command in ("SET_MODE:GAIT", "START_CRAWLING"):
+            sim.write(command)
+        sim.advance(20000)
+        return lines, sim.snapshot()
+
+    first, second = run(), run()
+    assert first == second
+    assert any(line.startswith("[Crawl] Step") for line in first[0])
+
+
+def test_binary_frame_and_ack_tag():
+    sim, lines = _sim()
+    sim.write(binary_protocol.encode_command("ROTATE_M2_CCW:400", 7))
+    sim.write("STOP_MOTORS@9")
+    sim.process_pending()
+    assert sim.counters["frames"] == 1
+    assert sim.tasks[1].end_ms == 400
+    assert lines[-1].startswith("ACK:9:")
+
+
+def test_sim_transport_in_lockstep():
+    link = LinkLoop(name="test-sim")
+    try:
+        lines = []
+        transport = make_transport("sim", speed=None, echo_pwm=False)
+        assert isinstance(transport, SimTransport)
+        transport.on_line = lines.append
+        link.submit(transport.connect()).result(5)
+        link.submit(transport.send("ROTATE_M5_CW:1000")).result(5)
+        assert transport.sim.running_motors() == [5]
+        link.submit(transport.advance(990)).result(5)
+        assert transport.sim.running_motors() == [5]  # nothing moves the clock but advance()
+        link.submit(transport.advance(20)).result(5)
+        assert transport.sim.running_motors() == []
+        assert transport.sim.clock.millis() == 1011
+        assert "[Timer] Motor 4 auto-stopped" in lines
+        link.submit(transport.close()).result(5)
+    finally:
+        link.stop()
+
+
+@pytest.mark.parametrize("heartbeat, end_ms", [("HB:0", 600), ("HB:300", 800), ("HB:50", 600)])
+def test_heartbeat_only_extends_running_motors(heartbeat, end_ms):
+    sim, _ = _sim()
+    sim.write("ROTATE_M1_CW:600")
+    sim.process_pending()
+    sim.advance(500 - sim.clock.millis())
+    sim.write(heartbeat)  # HB:0 is the supervisor's link probe: a no-op
+    sim.process_pending()
+    assert sim.tasks[0].end_ms == end_ms
+
+
+@pytest.mark.parametrize("command", [
+    "ROTATE_M1_CW:1500_500", "ROTATE_M8_CCW:700", "ROTATE_BODY2_CW", "ROTATE_M3_CW:0", "ROTATE_M2_CCW:-5",
+])
+def test_binary_rotate_runs_like_the_ascii_command(command):
+    runs = []
+    for data in (command, binary_protocol.encode_command(command)):
+        sim, _ = _sim()
+        sim.write(data)
+        sim.process_pending()
+        runs.append((list(sim.pulses), [(task.active, task.end_ms) for task in sim.tasks]))
+    assert runs[0] == runs[1]
+    assert any(active for active, _ in runs[0][1])
+
+
+@pytest.mark.parametrize("command, size", [
+    ("ROTATE_M2_CW:300@5", binary_protocol.FRAME_LEN),
+    ("STOP_MOTORS", binary_protocol.FRAME_LEN),
+    ("HB:1500@6", len("HB:1500@6\n")),  # no binary form
+])
+def test_binary_sim_transport_frames_like_serial(command, size):
+    link = LinkLoop(name="test-sim")
+    try:
+        transport = SimTransport(speed=None, binary=True, echo_pwm=False)
+        link.submit(transport.connect()).result(5)
+        assert link.submit(transport.send(command)).result(5) == size
+        assert transport.bytes_out == size
+        assert transport.sim.counters["frames"] == (size == binary_protocol.FRAME_LEN)
+    finally:
+        link.stop()
@@ -0,0 +1,46 @@
+import threading
+
+from flexibot.status_queue import StatusQueue
+
+
+def _text(line):
+    return line.split("  ", 1)[1]  # drop the HH:MM:SS stamp
+
+
+def test_drain_returns_only_the_latest_value_per_field():
+    queue = StatusQueue()
+    for i in range(5):
+        queue.put("status", f"Motor 1 step {i}")
+    queue.put("fsm", "GAIT", log_line=False)
+    changed, lines = queue.drain()
+    assert changed == {"status": "Motor 1 step 4", "fsm": "GAIT"}
+    assert [_text(line) for line in lines] == [f"Motor 1 step {i}" for i in range(5)]
+    assert queue.drain() == ({}, [])
+    assert queue.latest("fsm") == "GAIT" and queue.latest("missing", "?") == "?"
+
+
+def test_scrollback_is_bounded_and_counts_lines_never_drained():
+    queue = StatusQueue(scrollback=3)
+    for i in range(5):
+        queue.append(f"[Cmd] {i}")
+    _, lines = queue.drain()
+    assert [_text(line) for line in lines] == ["[Cmd] 2", "[Cmd] 3", "[Cmd] 4"]
+    assert queue.overflowed == 2
+    assert [_text(line) for line in queue.lines()] == ["[Cmd] 2", "[Cmd] 3", "[Cmd] 4"]
+
+
+def test_puts_from_many_threads_are_all_counted():
+    queue = StatusQueue(scrollback=10000)
+
+    def produce(n):
+        for i in range(500):
+            queue.put(f"field{n}", f"{n}:{i}")
+
+    threads = [threading.Thread(target=produce, args=(n,)) for n in range(4)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    changed, lines = queue.drain()
+    assert queue.puts == 2000 and len(lines) == 2000
+    assert changed == {f"field{n}": f"{n}:499" for n in range(4)}
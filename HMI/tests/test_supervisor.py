@@ -0,0 +1,96 @@
+import time
+
+import pytest
+
+from flexibot.metrics import Registry
+from flexibot.supervisor import LinkSupervisor, TransportTimeout
+
+
+class StubTransport:
+    def __init__(self, name):
+        self.name = name
+        self.on_line = None
+
+
+class StubScheduler:
+    def __init__(self):
+        self.paused = False
+
+    def pause(self):
+        self.paused = True
+
+    def resume(self):
+        self.paused = False
+
+
+class StubBackend:
+    def __init__(self):
+        self.metrics = Registry()
+        self.scheduler = StubScheduler()
+        self.transport = None
+        self.status = []
+
+    def use_link(self, transport):
+        self.transport = transport
+
+    def update_status(self, text):
+        self.status.append(text)
+
+    def _link_up(self, transport):
+        pass
+
+    def _on_link_line(self, line):
+        pass
+
+
+@pytest.fixture
+def supervisor():
+    backend = StubBackend()
+    sup = LinkSupervisor(backend, [StubTransport("serial"), StubTransport("tcp")], failback_s=0.05)
+    for link in sup.links:
+        sup._mark_up(link)
+    assert backend.transport is None  # already on the preferred link
+    return sup
+
+
+def test_fails_over_to_the_next_link_that_is_up(supervisor):
+    serial, tcp = supervisor.links
+    supervisor.link_failed(serial.transport, ConnectionError("unplugged"))
+    assert supervisor.active is tcp
+    assert supervisor.backend.transport is tcp.transport
+    assert not supervisor.backend.scheduler.paused
+
+    supervisor.acked(tcp.transport)
+    assert [(lost, to) for lost, to, _ in supervisor.failovers] == [("serial", "tcp")]
+
+
+def test_pauses_the_scheduler_with_no_link_up(supervisor):
+    serial, tcp = supervisor.links
+    supervisor.link_failed(serial.transport, ConnectionError("unplugged"))
+    supervisor.link_failed(tcp.transport, ConnectionError("reset"))
+    assert supervisor.backend.scheduler.paused
+    assert not supervisor.wait_up(0)
+
+    supervisor._mark_up(tcp)
+    assert supervisor.active is tcp
+    assert not supervisor.backend.scheduler.paused
+
+
+def test_fails_back_once_the_preferred_link_has_settled(supervisor):
+    serial, tcp = supervisor.links
+    supervisor.link_failed(serial.transport, ConnectionError("unplugged"))
+    supervisor._mark_up(serial)
+    assert supervisor.active is tcp  # not settled yet
+    supervisor._choose(serial.t_up + supervisor.failback_s)
+    assert supervisor.active is serial
+    assert supervisor.backend.transport is serial.transport
+
+
+def test_timeouts_while_the_robot_is_busy_are_not_link_failures(supervisor):
+    serial, _ = supervisor.links
+    supervisor.robot_busy(1.0)
+    supervisor.link_failed(serial.transport, TransportTimeout("no ACK"))
+    assert serial.up and supervisor.active is serial
+    supervisor._busy_until = time.monotonic() - 1
+    supervisor.link_failed(serial.transport, TransportTimeout("no ACK"))
+    assert not serial.up
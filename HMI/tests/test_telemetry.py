@@ -0,0 +1,71 @@
+import importlib.util
+import os
+
+import pytest
+
+from flexibot.telemetry import KIND_RX, KIND_TX, TEXT_MAX, TelemetryRecorder, read_records
+
+REPLAY_SESSION = os.path.join(os.path.dirname(__file__), "..", "..", "Analysis", "replay_session.py")
+
+
+def _load_replay():
+    pytest.importorskip("numpy")
+    spec = importlib.util.spec_from_file_location("replay_session", REPLAY_SESSION)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def _record_session(path, n, capacity):
+    recorder = TelemetryRecorder(str(path), capacity=capacity)
+    for i in range(n):
+        kind = KIND_TX if i % 2 == 0 else KIND_RX
+        recorder.record(kind, f"line {i}", t=1000.0 + i)
+    recorder.close()
+
+
+@pytest.mark.parametrize("n, capacity", [(5, 8), (8, 8), (21, 8)])
+def test_ring_keeps_the_newest_records_in_order(tmp_path, n, capacity):
+    path = tmp_path / "session.fbtl"
+    _record_session(path, n, capacity)
+    records = list(read_records(str(path)))
+    first = max(0, n - capacity)
+    assert [text for _, _, text in records] == [f"line {i}" for i in range(first, n)]
+    assert [t for t, _, _ in records] == [1000.0 + i for i in range(first, n)]
+    assert records[0][1] == (KIND_TX if first % 2 == 0 else KIND_RX)
+
+
+def test_long_lines_are_truncated(tmp_path):
+    path = tmp_path / "session.fbtl"
+    recorder = TelemetryRecorder(str(path), capacity=4)
+    recorder.record_rx("x" * 500)
+    recorder.close()
+    recorder.record_rx("after close")  # ignored, no error
+    (record,) = read_records(str(path))
+    assert record[2] == "x" * TEXT_MAX
+
+
+def test_replay_loads_a_wrapped_ring_like_read_records(tmp_path):
+    replay = _load_replay()
+    path = tmp_path / "session.fbtl"
+    _record_session(path, 21, 8)
+    records = replay.load_session(str(path))
+    assert list(records["t"]) == [t for t, _, _ in read_records(str(path))]
+    assert list(replay.texts(records)) == [f"line {i}" for i in range(13, 21)]
+
+
+def test_replay_finds_auto_stops_and_fsm_transitions(tmp_path):
+    replay = _load_replay()
+    path = tmp_path / "session.fbtl"
+    recorder = TelemetryRecorder(str(path), capacity=16)
+    for t, kind, text in [(1.0, KIND_TX, "ROTATE_M3_CW:500@1"), (1.2, KIND_RX, "[FSM] => STATE_INDIVIDUAL"),
+                          (1.5, KIND_RX, "[Timer] Motor 3 auto-stopped"), (2.5, KIND_TX, "STOP_MOTORS@2")]:
+        recorder.record(kind, text, t=t)
+    recorder.close()
+    records = replay.load_session(str(path))
+    lines = replay.texts(records)
+    stops = replay.auto_stops(records, lines)
+    assert list(stops["motor"]) == [3] and list(stops["t"]) == [1.5]
+    assert list(replay.fsm_transitions(records, lines)["state"]) == ["INDIVIDUAL"]
+    _, rate = replay.command_rate(records)
+    assert rate.sum() == 2
@@ -0,0 +1,105 @@
+import time
+from concurrent.futures import Future
+
+import pytest
+
+from flexibot.http_dispatch import DispatchQueueFull
+from flexibot.pose import STOP_PULSE, Pose
+from flexibot.scheduler import CommandDropped
+from flexibot.teleop import TeleopStreamer, axis_to_pulse
+from flexibot.transports import TransportError
+
+
+class RecordingBackend:
+    """send_command() records the command and returns an already finished future."""
+
+    def __init__(self):
+        self.commands = []
+        self.poses = []
+        self.fail_with = None
+
+    def send_command(self, command, priority=None, deadline_s=None):
+        self.commands.append(command)
+        fut = Future()
+        if self.fail_with is not None:
+            fut.set_exception(self.fail_with)
+        else:
+            fut.set_result(None)
+        return fut
+
+    def send_pose(self, pose):
+        self.poses.append(pose)
+
+    def frames(self):
+        return [Pose.from_command(c).targets for c in self.commands if c.startswith("POSE:")]
+
+
+@pytest.mark.parametrize("value, pulse", [
+    (0.0, STOP_PULSE), (0.05, STOP_PULSE), (-0.05, STOP_PULSE),
+    (1.0, 500), (2.0, 500), (-1.0, 2500), (0.5, 975), (-0.5, 2025),
+])
+def test_axis_to_pulse(value, pulse):
+    assert axis_to_pulse(value) == pulse
+
+
+def test_tick_sends_only_changed_motors():
+    backend = RecordingBackend()
+    teleop = TeleopStreamer(backend, hold_ms=250)
+    teleop.set_target("M1", 700)
+    teleop.set_target("M2", 1463)  # quantised to 25 us
+    teleop._tick()
+    teleop.set_target("M1", 710)  # same quantum: no change
+    teleop._tick()
+    teleop.release("M2")
+    teleop._tick()
+    assert backend.frames() == [{1: (700, 250), 2: (1475, 250)}, {2: (STOP_PULSE, 0)}]
+    assert teleop.counters["frames"] == 2 and teleop.counters["motors_sent"] == 3
+
+
+@pytest.mark.parametrize("error", [
+    CommandDropped("expired", "POSE:3=800_250"),
+    TransportError("Serial not connected."),
+    DispatchQueueFull("POSE:3=800_250"),
+])
+def test_failed_frame_is_sent_again_on_the_next_tick(error):
+    backend = RecordingBackend()
+    teleop = TeleopStreamer(backend)
+    teleop.set_target("M3", 800)
+    backend.fail_with = error
+    teleop._tick()
+    backend.fail_with = None
+    teleop._tick()
+    teleop._tick()
+    assert backend.frames() == [{3: (800, 250)}] * 2
+    assert teleop.counters["resent"] == 1
+
+
+def test_heartbeat_only_while_a_motor_runs():
+    backend = RecordingBackend()
+    teleop = TeleopStreamer(backend, hold_ms=300)
+    teleop._heartbeat()
+    teleop.set_target("M1", 700)
+    teleop._tick()
+    teleop._heartbeat()
+    teleop.release_all()
+    teleop._tick()
+    teleop._heartbeat()
+    assert [c for c in backend.commands if c.startswith("HB:")] == ["HB:300"]
+
+
+def test_stream_rate_is_capped_whatever_the_input_rate():
+    backend = RecordingBackend()
+    teleop = TeleopStreamer(backend, rate_hz=50, heartbeat_s=10)
+    teleop.start()
+    t_end = time.perf_counter() + 0.3
+    i = 0
+    while time.perf_counter() < t_end:  # joystick noise far faster than 50 Hz
+        teleop.set_axis("M1", 0.2 + 0.6 * (i % 97) / 97)
+        i += 1
+        time.sleep(0.0002)
+    teleop.stop()
+    frames = len(backend.frames())
+    assert i > 300
+    assert 5 <= frames <= teleop.counters["ticks"] <= 0.3 * 50 + 3
+    (stop,) = backend.poses
+    assert stop.targets == {1: (STOP_PULSE, 0)}
@@ -0,0 +1,226 @@
+import asyncio
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, HTTPServer
+
+import pytest
+import serial
+
+from benchmarks.fake_robot import FakeTcpRobot
+from flexibot.transports import (HttpTransport, LinkLoop, SerialTransport, TcpTransport, TransportError,
+                                 TransportTimeout, make_transport)
+
+@pytest.fixture
+def link():
+    link = LinkLoop(name="test-link")
+    yield link
+    link.stop()
+
+
+def _run(link, coro, timeout=5):
+    return link.submit(coro).result(timeout)
+
+
+@pytest.mark.parametrize("kind, opts, cls", [
+    ("serial", {"port": "loop://"}, SerialTransport),
+    ("http", {"host": "127.0.0.1"}, HttpTransport),
+    ("tcp", {"host": "127.0.0.1"}, TcpTransport),
+])
+def test_make_transport(kind, opts, cls):
+    transport = make_transport(kind, **opts)
+    assert isinstance(transport, cls) and transport.name == kind
+    assert not transport.connected
+
+
+def test_make_transport_rejects_unknown_kinds():
+    with pytest.raises(ValueError):
+        make_transport("carrier-pigeon")
+
+
+def test_link_loop_runs_coroutines_on_its_thread(link):
+    async def where():
+        return link.in_loop()
+
+    assert _run(link, where())
+    assert not link.in_loop()
+
+
+def test_serial_sends_newline_terminated_commands(link):
+    transport = SerialTransport("loop://")
+    _run(link, transport.connect())
+    assert _run(link, transport.send("ROTATE_M1_CW:500")) == len("ROTATE_M1_CW:500\n")
+    assert transport.ser.read(17) == b"ROTATE_M1_CW:500\n"
+    _run(link, transport.close())
+    with pytest.raises(TransportError):
+        _run(link, transport.send("STOP_MOTORS"))
+
+
+def test_concurrent_connects_share_one_serial_open_and_settle(link):
+    transport = SerialTransport("loop://", settle=0.2)
+    t0 = time.perf_counter()
+    connects = [link.submit(transport.connect()) for _ in range(3)]
+    _run(link, asyncio.sleep(0))
+    assert time.perf_counter() - t0 < 0.1  # settling does not hold up the loop
+    for fut in connects:
+        fut.result(5)
+    assert 0.2 <= time.perf_counter() - t0 < 0.4  # one settle, not three
+    assert _run(link, transport.send("STOP_MOTORS")) == len("STOP_MOTORS\n")
+    assert transport.ser.read(12) == b"STOP_MOTORS\n"
+    _run(link, transport.close())
+
+
+def test_serial_open_failure_is_a_transport_error(link):
+    with pytest.raises(TransportError):
+        _run(link, SerialTransport("/dev/does-not-exist").connect())
+
+
+class StuckPort:
+    """A serial port whose write() blocks, like a full OS buffer or a hung adapter."""
+    is_open = True
+
+    def __init__(self, block_s=0.3, error=None):
+        self.block_s = block_s
+        self.error = error
+        self.write_thread = None
+
+    def write(self, data):
+        self.write_thread = threading.current_thread()
+        time.sleep(self.block_s)
+        if self.error is not None:
+            raise self.error
+        return len(data)
+
+
+def test_serial_write_does_not_block_the_link_loop(link):
+    port = StuckPort()
+    transport = SerialTransport(ser=port)
+    send = link.submit(transport.send("STOP_MOTORS"))
+    time.sleep(0.05)
+    t0 = time.perf_counter()
+    _run(link, asyncio.sleep(0))
+    assert time.perf_counter() - t0 < 0.1  # the loop keeps ticking while write() is stuck
+    assert not send.done()
+    assert send.result(2) == len("STOP_MOTORS\n")
+    assert port.write_thread is not link._thread
+
+
+def test_serial_write_timeout_is_a_transport_timeout(link):
+    transport = SerialTransport(ser=StuckPort(0.0, serial.SerialTimeoutException("Write timeout")))
+    with pytest.raises(TransportTimeout):
+        _run(link, transport.send("STOP_MOTORS"))
+
+
+def test_tcp_keeps_one_socket_for_every_command(link):
+    server = socket.create_server(("127.0.0.1", 0))
+    received, accepted = bytearray(), []
+
+    def serve():
+        client, _ = server.accept()
+        accepted.append(client)
+        with client:
+            while data := client.recv(4096):
+                received.extend(data)
+
+    thread = threading.Thread(target=serve, daemon=True)
+    thread.start()
+    transport = TcpTransport("127.0.0.1", server.getsockname()[1])
+    for command in ("SET_MODE:INDIVIDUAL", "ROTATE_M2_CCW:300", "STOP_MOTORS"):
+        _run(link, transport.send(command))  # connects on first use
+    _run(link, transport.close())
+    thread.join(2)
+    server.close()
+    assert len(accepted) == 1
+    assert received == b"SET_MODE:INDIVIDUAL\nROTATE_M2_CCW:300\nSTOP_MOTORS\n"
+
+
+def _wait_for(predicate, timeout=2):
+    deadline = time.perf_counter() + timeout
+    while not predicate() and time.perf_counter() < deadline:
+        time.sleep(0.01)
+    return predicate()
+
+
+@pytest.mark.parametrize("binary, sent", [(False, len("ROTATE_M1_CW:300@5\n")), (True, 9)])
+def test_tcp_robot_output_comes_back_on_the_same_socket(link, binary, sent):
+    robot = FakeTcpRobot()
+    lines = []
+    transport = TcpTransport(robot.host, robot.port, binary=binary)
+    transport.on_line = lines.append
+    try:
+        assert _run(link, transport.send("ROTATE_M1_CW:300@5")) == sent
+        assert _wait_for(lambda: any(line.startswith("ACK:5:") for line in lines))
+        assert lines[:2] == ["STATUS: STATE_IDLE", "[processCommand] ROTATE_M1_CW:300"]
+    finally:
+        _run(link, transport.close())
+        robot.close()
+
+
+def test_tcp_reconnects_after_the_robot_drops_the_socket(link):
+    robot = FakeTcpRobot()
+    transport = TcpTransport(robot.host, robot.port)
+    try:
+        _run(link, transport.send("STOP_MOTORS"))
+        assert _wait_for(lambda: robot.commands == 1)
+        robot.drop_client()
+        assert _wait_for(lambda: not transport.connected)
+        _run(link, transport.send("STOP_MOTORS"))
+        assert robot.clients == 2 and _wait_for(lambda: robot.commands == 2)
+    finally:
+        _run(link, transport.close())
+        robot.close()
+
+
+def test_tcp_send_failure_stops_the_old_reader(link):
+    robot = FakeTcpRobot()
+    lines = []
+    transport = TcpTransport(robot.host, robot.port)
+    transport.on_line = lines.append
+    try:
+        _run(link, transport.connect())
+        old_reader = transport._read_task
+
+        async def broken_drain():
+            raise ConnectionResetError("link dropped")
+
+        transport.writer.drain = broken_drain
+        with pytest.raises(TransportError):
+            _run(link, transport.send("STOP_MOTORS"))
+        assert old_reader.done() and transport._read_task is None
+        _run(link, transport.send("STOP_MOTORS@3"))  # reconnects with one new reader
+        assert _wait_for(lambda: any(line.startswith("ACK:3:") for line in lines))
+        assert robot.clients == 2
+    finally:
+        _run(link, transport.close())
+        robot.close()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    paths = []
+
+    def do_GET(self):
+        self.paths.append(self.path)
+        code = 500 if self.path == "/BROKEN" else 200
+        self.send_response(code)
+        self.send_header("Content-Length", "3")
+        self.end_headers()
+        self.wfile.write(b"OK\n")
+
+    def log_message(self, *args):
+        pass
+
+
+def test_http_sends_get_per_command_and_reports_errors(link):
+    server = HTTPServer(("127.0.0.1", 0), _Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    transport = HttpTransport("127.0.0.1", server.server_port)
+    try:
+        timing = _run(link, transport.send("ROTATE_M1_CW:500"))
+        assert timing.status_code == 200 and timing.error is None
+        with pytest.raises(TransportError):
+            _run(link, transport.send("BROKEN"))
+        assert _Handler.paths == ["/ROTATE_M1_CW:500", "/BROKEN"]
+    finally:
+        _run(link, transport.close())
+        server.shutdown()
+        server.server_close()
@@ -6,15 +6,18 @@
 #include "gait_control.h"
 #include "calibration.h"
 #include "WebServerControl.h"
+#include "binary_protocol.h"
+#include "command_table.h"   // generated: python -m flexibot header
 
 
 Adafruit_PWMServoDriver pwm = Adafruit_PWMServoDriver(0x40, Wire2);
 
 const uint8_t motorChannels[] = {0, 1, 2, 3, 4, 5, 6, 7, 8, 9};
 const int numMotors = sizeof(motorChannels)/sizeof(motorChannels[0]);
-const int numLimbs = 4;
+const int numLimbs = REGISTRY_NUM_LIMBS;
+static_assert(numMotors == REGISTRY_NUM_MOTORS, "motorChannels[] does not match command_table.h");
 
-WebServerControl webServer(80);
+WebServerControl webServer(80, 8081);  // HTTP + raw TCP command channel
 
 int   motorSpeed       = 1500;  // PWM stop frq.
 const int pulseMin     = 500;   // CW max
@@ -53,6 +56,10 @@ MotorTask motorTasks[numMotors];
 // -----------------------------
 String inputString    = "";
 bool   stringComplete = false;
+bool   inputOverflow  = false;  // the line grew past MAX_COMMAND_LEN; dropped at its newline
+
+uint8_t binFrame[BIN_FRAME_LEN];
+uint8_t binLen        = 0;     // >0 while a binary frame is being received
 
 // -----------------------------
 // Finite State Machine (FSM)
@@ -77,9 +84,17 @@ static bool retractStarted  = false;
 
 
 void serialEvent();
+void report(const char* line);
 void displayMessage(const char* msg);
 void processCommand(String cmd);
-void controlMotor(int motorIndex, uint16_t pulse, int duration);
+void processBinaryFrame(const uint8_t* frame);
+void sendAck(long id, unsigned long tUs);
+void processBatch(const String& list);
+void applyPose(const String& targets);
+void keepAlive(int holdMs);
+void setNeutrals(const String& list);
+void reportNeutral(const char* kind, int first, int count);
+void controlMotor(int motorIndex, uint16_t pulse, int duration, unsigned long startMs = 0);
 void stopMotor(int motorIndex);
 void stopMotors();
 void fullyElongate();
@@ -125,6 +140,7 @@ void setup() {
   const char* password = "portentaconnect"; // Password
   webServer.setControlModeCallback(onControlModeChange);
   webServer.setCommandCallback(onGeneralCommand);
+  webServer.setBinaryCallback(processBinaryFrame);
   webServer.begin(ssid, password);
   Serial.println("Web Server initialized. Connect to Wi-Fi AP to control the robot.");
 
@@ -169,9 +185,7 @@ void loop(){
     if (motorTasks[i].active && now >= motorTasks[i].endMs) {
       limbs[i].stopMotor();
       motorTasks[i].active = false;
-      Serial.print("[Timer] Motor ");
-      Serial.print(i);
-      Serial.println(" auto-stopped");
+      report(("[Timer] Motor " + String(i) + " auto-stopped").c_str());
     }
   }
 }
@@ -204,10 +218,7 @@ void onGeneralCommand(const char* command) {
   Serial.print("[WebServer] Received general command: ");
   Serial.println(command);
 
-  String cmdStr = String(command);
-  Serial.println("Before processCommand");
-  processCommand(cmdStr);
-  Serial.println("Finished in [onGeneralCommand]");
+  processCommand(String(command));
 }
 
 // --------------------------------------------------------------------
@@ -223,28 +234,31 @@ void setState(MainState newState){
   }
   mainState = newState;
 
+  const char* name = "STATE_IDLE";
   switch(mainState){
-    case STATE_IDLE:        Serial.println("[FSM] => STATE_IDLE"); break;
-    case STATE_INDIVIDUAL:  Serial.println("[FSM] => STATE_INDIVIDUAL"); break;
-    case STATE_BODY:        Serial.println("[FSM] => STATE_BODY"); break;
-    case STATE_GAIT:        Serial.println("[FSM] => STATE_GAIT"); break;
+    case STATE_IDLE:        name = "STATE_IDLE";       break;
+    case STATE_INDIVIDUAL:  name = "STATE_INDIVIDUAL"; break;
+    case STATE_BODY:        name = "STATE_BODY";       break;
+    case STATE_GAIT:        name = "STATE_GAIT";       break;
     case STATE_STAND_UP:
-      Serial.println("[FSM] => STATE_STAND_UP");
+      name = "STATE_STAND_UP";
       standUpStarted = false;
       break;
     case STATE_SIT_DOWN:
-      Serial.println("[FSM] => STATE_SIT_DOWN");
+      name = "STATE_SIT_DOWN";
       sitDownStarted = false;
       break;
     case STATE_ELONGATE:
-      Serial.println("[FSM] => STATE_ELONGATE");
+      name = "STATE_ELONGATE";
       elongateStarted = false;
       break;
     case STATE_RETRACT:
-      Serial.println("[FSM] => STATE_RETRACT");
+      name = "STATE_RETRACT";
       retractStarted = false;
       break;
   }
+  report((String("[FSM] => ") + name).c_str());
+  webServer.setStatus(name);
 }
 
 // --------------------------------------------------------------------
@@ -368,12 +382,33 @@ void doRetractState(){
 // --------------------------------------------------------------------
 void serialEvent(){
   while(Serial.available()){
-    char inChar=(char)Serial.read();
+    int inByte=Serial.read();
+    // Binary frames start with BIN_SYNC at the beginning of a line
+    if(binLen>0 || (inByte==BIN_SYNC && inputString.length()==0)){
+      binFrame[binLen++]=(uint8_t)inByte;
+      if(binLen==BIN_FRAME_LEN){
+        processBinaryFrame(binFrame);
+        binLen=0;
+      }
+      continue;
+    }
+    char inChar=(char)inByte;
     if(inChar=='\n'){
+      if(inputOverflow){
+        report("[ERROR] Command too long");
+        inputString="";
+        inputOverflow=false;
+        continue;
+      }
       stringComplete=true;
       break;
     }
-    inputString+=inChar;
+    // Same limit as the TCP channel: command, ack tag and "\r"
+    if(inputString.length() < MAX_COMMAND_LEN + ACK_TAG_MAX + 1){
+      inputString+=inChar;
+    }else{
+      inputOverflow=true;
+    }
   }
 }
 
@@ -382,8 +417,20 @@ void serialEvent(){
 // --------------------------------------------------------------------
 void processCommand(String cmd){
   cmd.trim();
-  Serial.print("[processCommand] ");
-  Serial.println(cmd);
+  // Teleop heartbeats arrive many times a second; don't echo them
+  if(!cmd.startsWith("HB")){
+    Serial.print("[processCommand] ");
+    Serial.println(cmd);
+  }
+
+  // Optional sequence tag "<cmd>@<id>" -> answered with ACK:<id>:<t_us> when done
+  unsigned long t0 = micros();
+  long ackId = -1;
+  int atIndex = cmd.lastIndexOf('@');
+  if(atIndex != -1){
+    ackId = cmd.substring(atIndex+1).toInt();
+    cmd   = cmd.substring(0, atIndex);
+  }
 
   // optional parse :duration
   int colonIndex=cmd.indexOf(':');
@@ -395,7 +442,20 @@ void processCommand(String cmd){
     if(dur>0) duration=dur;
   }
 
-  if(cmd.startsWith("SET_MODE:INDIVIDUAL")){
+  // Multi-command frames (one loop() pass for all of them)
+  if(baseCmd == "BATCH"){
+    processBatch(param);
+  }
+  else if(baseCmd == "POSE"){
+    applyPose(param);
+  }
+  else if(baseCmd == "HB"){
+    // Not `duration`: that defaults to 200, and HB:0 (the host's link probe) must not touch motorTasks
+    int holdMs = param.toInt();
+    if(holdMs > 0) keepAlive(holdMs);
+  }
+
+  else if(cmd.startsWith("SET_MODE:INDIVIDUAL")){
     Serial.println("[Cmd] => STATE_INDIVIDUAL");
     setState(STATE_INDIVIDUAL);
   }
@@ -432,7 +492,7 @@ void processCommand(String cmd){
       gaitControl.setState(GaitControl::CRAWLING_STATE);
       Serial.println("[Cmd] Gait => CRAWLING");
     } else {
-      Serial.println("[ERROR] Must be in STATE_GAIT for crawling");
+      report("[ERROR] Must be in STATE_GAIT for crawling");
     }
   }
   else if(cmd.startsWith("START_WALKING")){
@@ -440,7 +500,7 @@ void processCommand(String cmd){
       gaitControl.setState(GaitControl::WALKING_STATE);
       Serial.println("[Cmd] Gait => WALKING");
     } else {
-      Serial.println("[ERROR] Must be in STATE_GAIT for walking");
+      report("[ERROR] Must be in STATE_GAIT for walking");
     }
   }
   else if(cmd.startsWith("STOP_GAIT")){
@@ -448,7 +508,7 @@ void processCommand(String cmd){
       gaitControl.setState(GaitControl::STOP_STATE);
       Serial.println("[Cmd] Gait => STOPPED");
     } else {
-      Serial.println("[ERROR] Not in GAIT state");
+      report("[ERROR] Not in GAIT state");
     }
   }
 
@@ -457,140 +517,218 @@ void processCommand(String cmd){
       gaitControl.setState(GaitControl::FASTCRAWL_STATE);
       Serial.println("[Cmd] Gait => FASTCRAWL");
     } else {
-      Serial.println("[ERROR] Must be in STATE_GAIT for FASTCRAWL");
+      report("[ERROR] Must be in STATE_GAIT for FASTCRAWL");
     }
   }
 
   // INDIVIDUAL commands
-  else if(cmd.startsWith("ROTATE_") || cmd.startsWith("STOP_")){
-    if (cmd.startsWith("ROTATE_M1_CW")) {
-      controlMotor(0, pulseMin, duration);
-    }
-    else if (cmd.startsWith("ROTATE_M1_CCW")) {
-      controlMotor(0, pulseMax, duration);
-    }
-    else if (cmd.startsWith("ROTATE_M2_CW")) {
-      controlMotor(1, pulseMin, duration);
-    }
-    else if (cmd.startsWith("ROTATE_M2_CCW")) {
-      controlMotor(1, pulseMax, duration);
-    }
-    else if (cmd.startsWith("ROTATE_M3_CW")) {
-      controlMotor(2, pulseMin, duration);
-    }
-    else if (cmd.startsWith("ROTATE_M3_CCW")) {
-      controlMotor(2, pulseMax, duration);
-    }
-    else if (cmd.startsWith("ROTATE_M4_CW")) {
-      controlMotor(3, pulseMin, duration);
-    }
-    else if (cmd.startsWith("ROTATE_M4_CCW")) {
-      controlMotor(3, pulseMax, duration);
-    }
-    else if (cmd.startsWith("ROTATE_M5_CW")) {
-      controlMotor(4, pulseMin, duration);
-    }
-    else if (cmd.startsWith("ROTATE_M5_CCW")) {
-      controlMotor(4, pulseMax, duration);
-    }
-    else if (cmd.startsWith("ROTATE_M6_CW")) {
-      controlMotor(5, pulseMin, duration);
-    }
-    else if (cmd.startsWith("ROTATE_M6_CCW")) {
-      controlMotor(5, pulseMax, duration);
-    }
-    else if (cmd.startsWith("ROTATE_M7_CW")) {
-      controlMotor(6, pulseMin, duration);
-    }
-    else if (cmd.startsWith("ROTATE_M7_CCW")) {
-      controlMotor(6, pulseMax, duration);
-    }
-    else if (cmd.startsWith("ROTATE_M8_CW")) {
-      controlMotor(7, pulseMin, duration);
-    }
-    else if (cmd.startsWith("ROTATE_M8_CCW")) {
-      controlMotor(7, pulseMax, duration);
-    }
-
-    else if (cmd.startsWith("STOP_M1_M2_MOTORS")) {
-      stopMotor(0);
-      stopMotor(1);
-    }
-    else if (cmd.startsWith("STOP_M3_M4_MOTORS")) {
-      stopMotor(2);
-      stopMotor(3);
-    }
-    else if (cmd.startsWith("STOP_M5_M6_MOTORS")) {
-      stopMotor(4);
-      stopMotor(5);
-    }
-    else if (cmd.startsWith("STOP_M7_M8_MOTORS")) {
-      stopMotor(6);
-      stopMotor(7);
-    }
-    else if(cmd.startsWith("STOP_MOTORS")){
-      stopMotors();
+  else if(cmd.startsWith("STOP_MOTORS")){
+    stopMotors();
+  }
+  // Per-motor ROTATE_ / STOP_ commands: one lookup in the generated table
+  else if(const MotorCommand* mc = findMotorCommand(baseCmd.c_str())){
+    switch(mc->kind){
+      case MC_ROTATE_CW:  controlMotor(mc->motor, pulseMin, duration); break;
+      case MC_ROTATE_CCW: controlMotor(mc->motor, pulseMax, duration); break;
+      case MC_STOP:       stopMotor(mc->motor); break;
+      case MC_STOP_PAIR:  stopMotor(mc->motor); stopMotor(mc->motor+1); break;
     }
   }
 
-  else if (cmd.startsWith("ROTATE_BODY1_CW")) {
-    controlMotor(8, pulseMin, duration); 
+  // Calibration
+  else if(baseCmd == "CALIBRATE_LIMB"){
+    int limbIndex = param.toInt()-1; 
+    calibration.calibrateLimb(limbIndex);
+    if(limbIndex >= 0 && limbIndex < numLimbs) reportNeutral("CALIBRATED", limbIndex*2, 2);
+  }
+  else if(baseCmd == "CALIBRATE_ALL_LIMBS"){
+    calibration.calibrateAllLimbs();
+    reportNeutral("CALIBRATED", 0, numLimbs*2);
   }
-  else if (cmd.startsWith("ROTATE_BODY1_CCW")) {
-      controlMotor(8, pulseMax, duration); 
+  else if(baseCmd == "SET_NEUTRAL"){
+    setNeutrals(param);
   }
-  else if (cmd.startsWith("STOP_BODY1")) {
-      stopMotor(8);
+  else if(baseCmd == "GET_NEUTRAL"){
+    reportNeutral("CURRENT", 0, numMotors);
   }
 
-  else if (cmd.startsWith("ROTATE_BODY2_CW")) {
-      controlMotor(9, pulseMin, duration);
+  else {
+    Serial.println("[Cmd] Unknown or unhandled command");
   }
-  else if (cmd.startsWith("ROTATE_BODY2_CCW")) {
-      controlMotor(9, pulseMax, duration);
+
+  if(ackId >= 0){
+    sendAck(ackId, micros() - t0);
   }
-  else if (cmd.startsWith("STOP_BODY2")) {
-      stopMotor(9);
+}
+
+// --------------------------------------------------------------------
+// ACK:<id>:<t_us> on serial and the TCP channel, and as X-Ack when the
+// command came in over HTTP (WebServerControl ignores it otherwise)
+// --------------------------------------------------------------------
+void sendAck(long id, unsigned long tUs){
+  String ack = String(id) + ":" + String(tUs);
+  report(("ACK:" + ack).c_str());
+  webServer.setAck(ack);
+}
+
+// --------------------------------------------------------------------
+// Binary frame: O(1) switch on the opcode instead of the startsWith chain
+// --------------------------------------------------------------------
+void processBinaryFrame(const uint8_t* frame){
+  unsigned long t0 = micros();
+  BinaryCommand c;
+  if(!decodeBinaryFrame(frame, c)){
+    report("[ERROR] Bad binary frame");
+    return;
   }
+  int duration = c.duration > 0 ? c.duration : 200;
 
+  switch(c.opcode){
+    case BIN_ROTATE: {
+      uint16_t pulse = c.pulse ? c.pulse : (c.ccw ? pulseMax : pulseMin);
+      controlMotor(c.target, pulse, duration);
+      break;
+    }
+    case BIN_STOP_MOTOR:
+      stopMotor(c.target);
+      break;
+    case BIN_STOP_LIMB:
+      stopMotor(c.target * 2);
+      stopMotor(c.target * 2 + 1);
+      break;
+    case BIN_STOP_ALL:
+      stopMotors();
+      break;
+    case BIN_SET_MODE:
+      switch(c.target){
+        case BIN_MODE_INDIVIDUAL: setState(STATE_INDIVIDUAL); break;
+        case BIN_MODE_BODY:       setState(STATE_BODY);       break;
+        case BIN_MODE_GAIT:
+          gaitControl.setState(GaitControl::STOP_STATE);
+          setState(STATE_GAIT);
+          break;
+        default: report("[ERROR] Unknown mode"); break;
+      }
+      break;
+    case BIN_GAIT:
+      if(mainState!=STATE_GAIT && c.target!=BIN_GAIT_STOP){
+        report("[ERROR] Must be in STATE_GAIT for gait commands");
+        break;
+      }
+      switch(c.target){
+        case BIN_GAIT_STOP:      gaitControl.setState(GaitControl::STOP_STATE);      break;
+        case BIN_GAIT_CRAWLING:  gaitControl.setState(GaitControl::CRAWLING_STATE);  break;
+        case BIN_GAIT_WALKING:   gaitControl.setState(GaitControl::WALKING_STATE);   break;
+        case BIN_GAIT_FASTCRAWL: gaitControl.setState(GaitControl::FASTCRAWL_STATE); break;
+        default: report("[ERROR] Unknown gait"); break;
+      }
+      break;
+    case BIN_STAND_UP:        setState(STATE_STAND_UP); break;
+    case BIN_SIT_DOWN:        setState(STATE_SIT_DOWN); break;
+    case BIN_ELONGATE:        setState(STATE_ELONGATE); break;
+    case BIN_RETRACT:         setState(STATE_RETRACT);  break;
+    case BIN_CALIBRATE_LIMB:
+      calibration.calibrateLimb(c.target);
+      if(c.target < numLimbs) reportNeutral("CALIBRATED", c.target*2, 2);
+      break;
+    case BIN_CALIBRATE_ALL:
+      calibration.calibrateAllLimbs();
+      reportNeutral("CALIBRATED", 0, numLimbs*2);
+      break;
+    default:
+      Serial.println("[Cmd] Unknown or unhandled command");
+      break;
+  }
+  sendAck(c.seq, micros() - t0);
+}
 
-  // Calibration
-  else if(baseCmd == "CALIBRATE_LIMB"){
-    int limbIndex = param.toInt()-1; 
-    calibration.calibrateLimb(limbIndex);
+// --------------------------------------------------------------------
+// BATCH:<cmd>;<cmd>;...  -> each command processed in this same pass
+// --------------------------------------------------------------------
+void processBatch(const String& list){
+  int start = 0;
+  while(start < (int)list.length()){
+    int sep = list.indexOf(';', start);
+    if(sep == -1) sep = list.length();
+    if(sep > start){
+      processCommand(list.substring(start, sep));
+    }
+    start = sep + 1;
   }
-  else if(baseCmd == "CALIBRATE_ALL_LIMBS"){
-    calibration.calibrateAllLimbs();
+}
+
+// --------------------------------------------------------------------
+// HB:<hold_ms>  teleop heartbeat: every running motor keeps going for at
+// least hold_ms more. If the host stream stalls the heartbeats stop and
+// the timer check in loop() stops the motors when their time runs out.
+// HB:0 is a no-op the host uses to probe the link.
+// --------------------------------------------------------------------
+void keepAlive(int holdMs){
+  unsigned long until = millis() + holdMs;
+  for(int i=0; i<numMotors; i++){
+    if(motorTasks[i].active && motorTasks[i].endMs < until){
+      motorTasks[i].endMs = until;
+    }
   }
+}
 
-  else {
-    Serial.println("[Cmd] Unknown or unhandled command");
+// --------------------------------------------------------------------
+// POSE:<n>=<pulse>_<duration>;...  (n = 1..10, pulse 0 = stop)
+// All targets share one start time so limbs moving together stay in step.
+// --------------------------------------------------------------------
+void applyPose(const String& targets){
+  unsigned long startMs = millis();
+  int applied = 0;
+  int start = 0;
+  while(start < (int)targets.length()){
+    int sep = targets.indexOf(';', start);
+    if(sep == -1) sep = targets.length();
+    String entry = targets.substring(start, sep);
+    start = sep + 1;
+
+    int eq  = entry.indexOf('=');
+    int und = entry.indexOf('_', eq + 1);
+    if(eq <= 0){
+      continue;
+    }
+    int motorIndex = entry.substring(0, eq).toInt() - 1;
+    int pulse      = (und != -1) ? entry.substring(eq + 1, und).toInt() : entry.substring(eq + 1).toInt();
+    int duration   = (und != -1) ? entry.substring(und + 1).toInt() : 200;
+
+    if(pulse == 0){
+      stopMotor(motorIndex);
+    } else {
+      controlMotor(motorIndex, pulse, duration, startMs);
+    }
+    applied++;
   }
+  Serial.print("[Cmd] Pose applied to ");
+  Serial.print(applied);
+  Serial.println(" motors");
 }
 
 // --------------------------------------------------------------------
 // Motor control
 // --------------------------------------------------------------------
-void controlMotor(int motorIndex, uint16_t pulse, int duration){
+void controlMotor(int motorIndex, uint16_t pulse, int duration, unsigned long startMs){
   if(motorIndex<0 || motorIndex>=numMotors){
-    Serial.println("[ERROR] Invalid motor index!");
+    report("[ERROR] Invalid motor index!");
     return;
   }
+  if(startMs == 0) startMs = millis();
   limbs[motorIndex].setPulse(pulse);
   motorTasks[motorIndex].active = true;
-  motorTasks[motorIndex].endMs  = millis() + duration;
+  motorTasks[motorIndex].endMs  = startMs + duration;
 }
 
 void stopMotor(int motorIndex){
   if(motorIndex<0 || motorIndex>=numMotors){
-    Serial.println("[ERROR] Invalid motor index!");
+    report("[ERROR] Invalid motor index!");
     return;
   }
   limbs[motorIndex].stopMotor();
   motorTasks[motorIndex].active = false;
-  Serial.print("[stopMotor] Motor ");
-  Serial.print(motorIndex);
-  Serial.println(" manually stopped");
+  report(("[stopMotor] Motor " + String(motorIndex) + " manually stopped").c_str());
 }
 
 void stopMotors(){
@@ -619,6 +757,15 @@ void fullyRetract(){
   displayMessage("Fully Retracted");
 }
 
+// --------------------------------------------------------------------
+// Lines the host acts on (ACK:, [FSM], [Timer], [stopMotor], [ERROR])
+// go to Serial and to the TCP client; chatter stays on Serial only
+// --------------------------------------------------------------------
+void report(const char* line){
+  Serial.println(line);
+  webServer.sendLine(line);
+}
+
 void displayMessage(const char* msg){
   Serial.println(msg);
 }
@@ -637,4 +784,47 @@ void motorSweepTest(int motorIndex){
   }
   limbs[motorIndex].stopMotor();
   Serial.println("[motorSweepTest] done.");
-}
\ No newline at end of file
+}
+
+// --------------------------------------------------------------------
+// SET_NEUTRAL:<m>=<us>,<m>=<us>,...  the host's cached calibration
+// profile, all motors in one command instead of a CALIBRATE_* run.
+// Motors are 1-based; the ones applied are echoed as [Calib] LOADED.
+// --------------------------------------------------------------------
+void setNeutrals(const String& list){
+  String applied = "";
+  int start = 0;
+  while(start < (int)list.length()){
+    int sep = list.indexOf(',', start);
+    if(sep == -1) sep = list.length();
+    String item = list.substring(start, sep);
+    int eq = item.indexOf('=');
+    int motor = (eq > 0) ? item.substring(0, eq).toInt() : 0;
+    int pulse = (eq > 0) ? item.substring(eq+1).toInt() : 0;
+    if(motor >= 1 && motor <= numMotors && pulse >= NEUTRAL_PULSE_MIN && pulse <= NEUTRAL_PULSE_MAX){
+      limbs[motor-1].setNeutral(pulse);
+      // A motor at rest moves to its new stop pulse now; running ones (timers, gait) get it when they stop
+      if(!motorTasks[motor-1].active && mainState != STATE_GAIT) limbs[motor-1].stopMotor();
+      if(applied.length() > 0) applied += ",";
+      applied += String(motor) + "=" + String(pulse);
+    } else {
+      report(("[ERROR] Bad neutral " + item).c_str());
+    }
+    start = sep + 1;
+  }
+  report(("[Calib] LOADED " + applied).c_str());
+}
+
+// --------------------------------------------------------------------
+// [Calib] <kind> <m>=<us>,...  neutral pulses of motors first+1 ..
+// first+count. CALIBRATED (what a calibration found) is what the host
+// caches; CURRENT answers GET_NEUTRAL.
+// --------------------------------------------------------------------
+void reportNeutral(const char* kind, int first, int count){
+  String line = String("[Calib] ") + kind + " ";
+  for(int i=first; i<first+count && i<numMotors; i++){
+    if(i > first) line += ",";
+    line += String(i+1) + "=" + String(limbs[i].getNeutral());
+  }
+  report(line.c_str());
+}
@@ -1,10 +1,17 @@
 #include "WebServerControl.h"
 
-WebServerControl::WebServerControl(int port)
-    : server(port), 
+WebServerControl::WebServerControl(int port, int tcpPort)
+    : server(port),
+      tcpServer(tcpPort),
       controlModeCallback(nullptr),
       commandCallback(nullptr),
-      currentMode("INDIVIDUAL")
+      binaryCallback(nullptr),
+      currentMode("INDIVIDUAL"),
+      inHttpRequest(false),
+      status("STATE_IDLE"),
+      tcpLineLen(0),
+      tcpLineOverflow(false),
+      tcpFrameLen(0)
 {
 }
 
@@ -30,32 +37,136 @@ void WebServerControl::begin(const char* ssid, const char* password) {
     }
 
     server.begin();
+    tcpServer.begin();
 }
 
 void WebServerControl::handleClient() {
-    WiFiClient client = server.available();
-    if (client) {
-        Serial.println("New Client Connected");
-        String request = "";
-        while (client.connected()) {
-            if (client.available()) {
-                char c = client.read();
-                request += c;
-
-                // Check for end of request
-                if (c == '\n') {
-                    if (request.endsWith("\r\n\r\n")) {
-                        break;
-                    }
-                }
+    handleTcp();
+    handleHttp();
+}
+
+// --------------------------------------------------------------------
+// Raw TCP channel: never blocks, reads at most TCP_READ_BUDGET bytes
+// --------------------------------------------------------------------
+void WebServerControl::handleTcp() {
+    WiFiClient incoming = tcpServer.available();
+    if (incoming) {
+        if (tcpClient) tcpClient.stop();
+        tcpClient = incoming;
+        tcpLineLen = 0;
+        tcpLineOverflow = false;
+        tcpFrameLen = 0;
+        Serial.println("[TCP] Client connected");
+        sendLine(("STATUS: " + status).c_str());
+    }
+    if (!tcpClient) return;
+    if (!tcpClient.connected()) {
+        tcpClient.stop();
+        Serial.println("[TCP] Client disconnected");
+        return;
+    }
+
+    int budget = TCP_READ_BUDGET;
+    while (budget-- > 0 && tcpClient.available()) {
+        int inByte = tcpClient.read();
+        if (inByte < 0) break;
+
+        // Binary frames start with BIN_SYNC at the beginning of a line
+        if (tcpFrameLen > 0 || (inByte == BIN_SYNC && tcpLineLen == 0 && !tcpLineOverflow)) {
+            tcpFrame[tcpFrameLen++] = (uint8_t)inByte;
+            if (tcpFrameLen == BIN_FRAME_LEN) {
+                if (binaryCallback) binaryCallback(tcpFrame);
+                tcpFrameLen = 0;
             }
+            continue;
         }
-        parseRequest(client, request);
-        sendWebPage(client);
+        if (inByte == '\n') {
+            if (tcpLineOverflow) {
+                sendLine("[ERROR] Command too long");
+            } else if (tcpLineLen > 0) {
+                if (tcpLine[tcpLineLen - 1] == '\r') tcpLineLen--;
+                tcpLine[tcpLineLen] = '\0';
+                if (tcpLineLen > 0 && commandCallback) commandCallback(tcpLine);
+            }
+            tcpLineLen = 0;
+            tcpLineOverflow = false;
+            continue;
+        }
+        if (tcpLineLen < TCP_LINE_MAX - 1) {
+            tcpLine[tcpLineLen++] = (char)inByte;
+        } else {
+            tcpLineOverflow = true;
+        }
+    }
+}
+
+void WebServerControl::sendLine(const char* line) {
+    if (!tcpClient || !tcpClient.connected()) return;
+    // One write per line, so a line never straddles two TCP segments
+    String out = String(line) + "\n";
+    tcpClient.write((const uint8_t*)out.c_str(), out.length());
+}
+
+bool WebServerControl::tcpConnected() {
+    return tcpClient && tcpClient.connected();
+}
+
+// --------------------------------------------------------------------
+// HTTP: keep only the request line; give up on slow clients
+// --------------------------------------------------------------------
+void WebServerControl::handleHttp() {
+    WiFiClient client = server.available();
+    if (!client) return;
+
+    char requestLine[HTTP_LINE_MAX];
+    int len = 0;
+    bool lineDone = false;
+    bool tooLong = false;
+    int newlines = 0;  // consecutive "\n" (ignoring "\r"): 2 = end of headers
+    unsigned long deadline = millis() + HTTP_READ_TIMEOUT;
 
-        client.stop();
-        Serial.println("Client Disconnected");
+    while (client.connected() && newlines < 2 && (long)(millis() - deadline) < 0) {
+        if (!client.available()) continue;
+        char c = client.read();
+        if (c == '\r') continue;
+        if (c == '\n') {
+            lineDone = true;
+            newlines++;
+            continue;
+        }
+        newlines = 0;
+        if (lineDone) continue;
+        if (len < HTTP_LINE_MAX - 1) {
+            requestLine[len++] = c;
+        } else {
+            tooLong = true;
+        }
+    }
+    requestLine[len] = '\0';
+
+    if (lineDone && tooLong) {
+        // Never run a command that was cut short
+        sendText(client, "ERR Command too long\n");
+    } else if (lineDone) {
+        parseRequest(client, requestLine);
+    }
+    client.stop();
+}
+
+void WebServerControl::sendText(WiFiClient& client, const char* body) {
+    // Headers and body in one write: one TCP segment for the whole answer
+    String out = "HTTP/1.1 200 OK\r\n"
+                 "Content-Type: text/plain\r\n"
+                 "Access-Control-Allow-Origin: *\r\n"
+                 "Connection: close\r\n";
+    out += "Content-Length: " + String(strlen(body)) + "\r\n";
+    if (pendingAck.length() > 0) {
+        out += "X-Ack: " + pendingAck + "\r\n";
+        pendingAck = "";
     }
+    out += "\r\n";
+    out += body;
+    client.write((const uint8_t*)out.c_str(), out.length());
 }
 
 void WebServerControl::sendWebPage(WiFiClient& client) {
@@ -112,22 +223,36 @@ void WebServerControl::sendWebPage(WiFiClient& client) {
     client.println("</body></html>");
 }
 
-void WebServerControl::parseRequest(WiFiClient& client, const String& request) {
-    if (request.indexOf("GET /INDIVIDUAL") >= 0) {
-        currentMode = "INDIVIDUAL";
-        if (controlModeCallback) controlModeCallback("INDIVIDUAL");
-    } 
-    else if (request.indexOf("GET /GAIT") >= 0) {
-        currentMode = "GAIT";
-        if (controlModeCallback) controlModeCallback("GAIT");
+void WebServerControl::parseRequest(WiFiClient& client, const char* requestLine) {
+    pendingAck = "";
+    String request(requestLine);
+    if (!request.startsWith("GET /")) {
+        sendText(client, "ERR\n");
+        return;
     }
-    else if (request.startsWith("GET /")) {
-        int spaceIdx = request.indexOf(' ', 5);
-        if (spaceIdx < 0) return; 
-        String command = request.substring(5, spaceIdx);
-        if (command.length() > 0 && commandCallback) {
-            commandCallback(command.c_str());
-        }
+    int spaceIdx = request.indexOf(' ', 5);
+    String path = request.substring(5, spaceIdx < 0 ? request.length() : spaceIdx);
+
+    if (path.length() == 0 || path == "index.html") {
+        sendWebPage(client);
+    }
+    else if (path == "status") {
+        sendText(client, ("STATUS: " + status + "\n").c_str());
+    }
+    else if (path == "INDIVIDUAL" || path == "GAIT") {
+        currentMode = path;
+        if (controlModeCallback) controlModeCallback(path.c_str());
+        sendText(client, "OK\n");
+    }
+    else if (path == "favicon.ico") {
+        sendText(client, "");
+    }
+    else {
+        // Only this command's ACK belongs on this response, not one from serial / TCP
+        inHttpRequest = true;
+        if (commandCallback) commandCallback(path.c_str());
+        inHttpRequest = false;
+        sendText(client, "OK\n");
     }
 }
 
@@ -135,6 +260,19 @@ void WebServerControl::setControlModeCallback(void (*callback)(const char* mode)
     controlModeCallback = callback;
 }
 
+void WebServerControl::setAck(const String& ack) {
+    if (inHttpRequest) pendingAck = ack;
+}
+
+void WebServerControl::setStatus(const String& newStatus) {
+    status = newStatus;
+    sendLine(("STATUS: " + status).c_str());
+}
+
 void WebServerControl::setCommandCallback(void (*callback)(const char* command)) {
     commandCallback = callback;
 }
+
+void WebServerControl::setBinaryCallback(void (*callback)(const uint8_t* frame)) {
+    binaryCallback = callback;
+}
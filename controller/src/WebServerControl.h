@@ -5,26 +5,77 @@
 #include <WiFiClient.h>
 #include <WiFiServer.h>
 
+#include "binary_protocol.h"
+
+// --------------------------------------------------------------------
+// Two ways in over Wi-Fi:
+//
+//   port 80    HTTP, one request per connection
+//              GET /              control page (for browsers)
+//              GET /status        "STATUS: <status>" as text/plain
+//              GET /<command>     runs the command; 3-byte "OK" body,
+//                                 ack in the X-Ack header
+//   port 8081  raw TCP command channel, one long-lived client
+//              in:  the same framing as Serial (newline-terminated
+//                   commands, or 9-byte binary frames starting with
+//                   BIN_SYNC at the start of a line)
+//              out: ACK:, STATUS:, [FSM], [Timer], [stopMotor] and
+//                   [ERROR] lines, newline-terminated
+//
+// A new TCP client replaces the old one, so a host that reconnects is
+// never locked out by a half-open socket.
+//
+// Every link takes commands up to MAX_COMMAND_LEN plus an ack tag. A
+// longer one is dropped whole, never run cut short: "[ERROR] Command
+// too long" on serial and TCP, an "ERR Command too long" body over HTTP.
+// --------------------------------------------------------------------
+#define MAX_COMMAND_LEN     240   // longest command on any link (flexibot.pose.MAX_FRAME_LEN)
+#define ACK_TAG_MAX         4     // "@255" after the command
+#define TCP_LINE_MAX        (MAX_COMMAND_LEN + ACK_TAG_MAX + 2)   // + "\r" and NUL
+#define TCP_READ_BUDGET     256   // bytes read per handleClient() call
+#define HTTP_READ_TIMEOUT   50    // ms to wait for a request's headers
+#define HTTP_LINE_MAX       (MAX_COMMAND_LEN + ACK_TAG_MAX + 16)  // + "GET /", " HTTP/1.1" and NUL
+
 class WebServerControl {
 public:
-    WebServerControl(int port = 80);
+    WebServerControl(int port = 80, int tcpPort = 8081);
 
     void begin(const char* ssid, const char* password);
     void handleClient();
     void setControlModeCallback(void (*callback)(const char* mode));
     void setCommandCallback(void (*callback)(const char* command));
+    void setBinaryCallback(void (*callback)(const uint8_t* frame));
+    void setAck(const String& ack);      // X-Ack on the HTTP response being built; ignored otherwise
+    void setStatus(const String& status); // served on /status, pushed to the TCP client
+    void sendLine(const char* line);     // to the TCP client, if one is connected
+    bool tcpConnected();
 
 private:
 
     WiFiServer server;
+    WiFiServer tcpServer;
+    WiFiClient tcpClient;
 
     void (*controlModeCallback)(const char* mode);
     void (*commandCallback)(const char* command);
+    void (*binaryCallback)(const uint8_t* frame);
 
     String currentMode;
+    String pendingAck;
+    bool   inHttpRequest;                // an HTTP request's command is running
+    String status;
+
+    char    tcpLine[TCP_LINE_MAX];
+    int     tcpLineLen;
+    bool    tcpLineOverflow;
+    uint8_t tcpFrame[BIN_FRAME_LEN];
+    uint8_t tcpFrameLen;
 
+    void handleHttp();
+    void handleTcp();
     void sendWebPage(WiFiClient& client);
-    void parseRequest(WiFiClient& client, const String& request);
+    void sendText(WiFiClient& client, const char* body);
+    void parseRequest(WiFiClient& client, const char* requestLine);
 };
 
 #endif // WEBSERVERCONTROL_H
@@ -0,0 +1,83 @@
+#ifndef BINARY_PROTOCOL_H
+#define BINARY_PROTOCOL_H
+
+#include <Arduino.h>
+
+// --------------------------------------------------------------------
+// Compact binary command frame (9 bytes, little endian)
+//
+//   0  sync      0xA5
+//   1  opcode    BinOpcode
+//   2  target    bits 0-6: motor / limb / mode / gait index, bit 7: 1 = CCW
+//   3  pulse     uint16 us (0 = default pulse for the direction)
+//   5  duration  uint16 ms
+//   7  seq       uint8
+//   8  crc       CRC-8 (poly 0x07) over bytes 1..7
+//
+// Must stay in sync with HMI/flexibot/binary_protocol.py
+// --------------------------------------------------------------------
+#define BIN_SYNC      0xA5
+#define BIN_FRAME_LEN 9
+
+enum BinOpcode : uint8_t {
+  BIN_ROTATE          = 1,
+  BIN_STOP_MOTOR      = 2,
+  BIN_STOP_LIMB       = 3,
+  BIN_STOP_ALL        = 4,
+  BIN_SET_MODE        = 5,
+  BIN_GAIT            = 6,
+  BIN_STAND_UP        = 7,
+  BIN_SIT_DOWN        = 8,
+  BIN_ELONGATE        = 9,
+  BIN_RETRACT         = 10,
+  BIN_CALIBRATE_LIMB  = 11,
+  BIN_CALIBRATE_ALL   = 12
+};
+
+enum BinMode : uint8_t {
+  BIN_MODE_INDIVIDUAL = 1,
+  BIN_MODE_BODY       = 2,
+  BIN_MODE_GAIT       = 3
+};
+
+enum BinGait : uint8_t {
+  BIN_GAIT_STOP      = 0,
+  BIN_GAIT_CRAWLING  = 1,
+  BIN_GAIT_WALKING   = 2,
+  BIN_GAIT_FASTCRAWL = 3
+};
+
+struct BinaryCommand {
+  uint8_t  opcode;
+  uint8_t  target;
+  bool     ccw;
+  uint16_t pulse;
+  uint16_t duration;
+  uint8_t  seq;
+};
+
+inline uint8_t binCrc8(const uint8_t* data, uint8_t len) {
+  uint8_t crc = 0;
+  for (uint8_t i = 0; i < len; i++) {
+    crc ^= data[i];
+    for (uint8_t b = 0; b < 8; b++) {
+      crc = (crc & 0x80) ? (uint8_t)((crc << 1) ^ 0x07) : (uint8_t)(crc << 1);
+    }
+  }
+  return crc;
+}
+
+// Returns false on bad sync or CRC
+inline bool decodeBinaryFrame(const uint8_t* f, BinaryCommand& out) {
+  if (f[0] != BIN_SYNC) return false;
+  if (binCrc8(f + 1, BIN_FRAME_LEN - 2) != f[BIN_FRAME_LEN - 1]) return false;
+  out.opcode   = f[1];
+  out.target   = f[2] & 0x7F;
+  out.ccw      = (f[2] & 0x80) != 0;
+  out.pulse    = (uint16_t)f[3] | ((uint16_t)f[4] << 8);
+  out.duration = (uint16_t)f[5] | ((uint16_t)f[6] << 8);
+  out.seq      = f[7];
+  return true;
+}
+
+#endif // BINARY_PROTOCOL_H
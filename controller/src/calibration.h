@@ -9,6 +9,7 @@ private:
     int numLimbs;
     const int calibrationPulseIncrement = 10; 
     const int calibrationDelay = 50;          
+    const int calibrationNeutral = 1450;  // the sweep parks the motor here; it becomes its stop pulse
 
 public:
     Calibration(LimbControl* limbsArray, int limbsCount)
@@ -46,7 +47,7 @@ public:
 private:
     void calibrateMotor(int limbIndex, int motorOffset) {
         int motorIndex = limbIndex * 2 + motorOffset;
-        if (motorIndex >= numLimbs) {
+        if (motorIndex >= numLimbs * 2) {
             Serial.println("Motor index out of range during calibration!");
             return;
         }
@@ -63,7 +64,8 @@ private:
             delay(calibrationDelay);
         }
 
-        limbs[motorIndex].setPulse(1450);
+        limbs[motorIndex].setPulse(calibrationNeutral);
+        limbs[motorIndex].setNeutral(calibrationNeutral);
         delay(500);
 
         Serial.print("Motor ");
@@ -0,0 +1,62 @@
+// Generated from HMI/flexibot/registry.py by `python -m flexibot header`; do not edit.
+#ifndef COMMAND_TABLE_H
+#define COMMAND_TABLE_H
+
+#include <stdint.h>
+#include <string.h>
+
+#define REGISTRY_NUM_LIMBS  4
+#define REGISTRY_NUM_MOTORS 10
+
+enum MotorCommandKind : uint8_t { MC_ROTATE_CW, MC_ROTATE_CCW, MC_STOP, MC_STOP_PAIR };
+
+struct MotorCommand {
+  const char* name;
+  uint8_t     kind;
+  uint8_t     motor;   // index into limbs[]; MC_STOP_PAIR stops motor and motor + 1
+};
+
+// Sorted by name (strcmp order)
+static const MotorCommand MOTOR_COMMANDS[] = {
+  {"ROTATE_BODY1_CCW", MC_ROTATE_CCW, 8},
+  {"ROTATE_BODY1_CW", MC_ROTATE_CW, 8},
+  {"ROTATE_BODY2_CCW", MC_ROTATE_CCW, 9},
+  {"ROTATE_BODY2_CW", MC_ROTATE_CW, 9},
+  {"ROTATE_M1_CCW", MC_ROTATE_CCW, 0},
+  {"ROTATE_M1_CW", MC_ROTATE_CW, 0},
+  {"ROTATE_M2_CCW", MC_ROTATE_CCW, 1},
+  {"ROTATE_M2_CW", MC_ROTATE_CW, 1},
+  {"ROTATE_M3_CCW", MC_ROTATE_CCW, 2},
+  {"ROTATE_M3_CW", MC_ROTATE_CW, 2},
+  {"ROTATE_M4_CCW", MC_ROTATE_CCW, 3},
+  {"ROTATE_M4_CW", MC_ROTATE_CW, 3},
+  {"ROTATE_M5_CCW", MC_ROTATE_CCW, 4},
+  {"ROTATE_M5_CW", MC_ROTATE_CW, 4},
+  {"ROTATE_M6_CCW", MC_ROTATE_CCW, 5},
+  {"ROTATE_M6_CW", MC_ROTATE_CW, 5},
+  {"ROTATE_M7_CCW", MC_ROTATE_CCW, 6},
+  {"ROTATE_M7_CW", MC_ROTATE_CW, 6},
+  {"ROTATE_M8_CCW", MC_ROTATE_CCW, 7},
+  {"ROTATE_M8_CW", MC_ROTATE_CW, 7},
+  {"STOP_BODY1", MC_STOP, 8},
+  {"STOP_BODY2", MC_STOP, 9},
+  {"STOP_M1_M2_MOTORS", MC_STOP_PAIR, 0},
+  {"STOP_M3_M4_MOTORS", MC_STOP_PAIR, 2},
+  {"STOP_M5_M6_MOTORS", MC_STOP_PAIR, 4},
+  {"STOP_M7_M8_MOTORS", MC_STOP_PAIR, 6},
+};
+static const int NUM_MOTOR_COMMANDS = sizeof(MOTOR_COMMANDS) / sizeof(MOTOR_COMMANDS[0]);
+
+// Command name without parameters -> its entry, or nullptr
+static inline const MotorCommand* findMotorCommand(const char* name) {
+  int lo = 0, hi = NUM_MOTOR_COMMANDS - 1;
+  while (lo <= hi) {
+    int mid = (lo + hi) / 2;
+    int c = strcmp(name, MOTOR_COMMANDS[mid].name);
+    if (c == 0) return &MOTOR_COMMANDS[mid];
+    if (c < 0) hi = mid - 1; else lo = mid + 1;
+  }
+  return nullptr;
+}
+
+#endif // COMMAND_TABLE_H
@@ -7,21 +7,35 @@
 #define PCA9685_FREQ 400
 #endif
 
+#define DEFAULT_NEUTRAL_PULSE 1550  // stop pulse until a calibration or SET_NEUTRAL sets one
+#define NEUTRAL_PULSE_MIN     1300  // SET_NEUTRAL rejects anything outside this window
+#define NEUTRAL_PULSE_MAX     1700
+
 class LimbControl {
 private:
     Adafruit_PWMServoDriver &pwmDriver; 
     uint8_t pwmChannel;               
+    uint16_t neutralPulse;
 
 public:
     LimbControl(Adafruit_PWMServoDriver &pwm, uint8_t channel)
-      : pwmDriver(pwm), pwmChannel(channel) {}
+      : pwmDriver(pwm), pwmChannel(channel), neutralPulse(DEFAULT_NEUTRAL_PULSE) {}
 
     void init() {
         stopMotor(); 
     }
 
     void stopMotor() {
-        setPulse(1550);
+        setPulse(neutralPulse);
+    }
+
+    // Pulse at which this motor stands still (from calibration or the host's cached profile)
+    void setNeutral(uint16_t pulseWidth) {
+        neutralPulse = pulseWidth;
+    }
+
+    uint16_t getNeutral() const {
+        return neutralPulse;
     }
 
 